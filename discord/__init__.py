@@ -32,12 +32,15 @@ from .asset import *
 from .audit_logs import *
 from .automod import *
 from .bot import *
+from .cache import *
 from .channel import *
 from .client import *
+from .cluster import *
 from .cog import *
 from .colour import *
 from .commands import *
 from .components import *
+from .dispatch import *
 from .embeds import *
 from .emoji import *
 from .enums import *
@@ -52,6 +55,7 @@ from .invite import *
 from .member import *
 from .mentions import *
 from .message import *
+from .metrics import *
 from .monetization import *
 from .object import *
 from .onboarding import *
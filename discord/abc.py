@@ -733,11 +733,10 @@ class GuildChannel:
         if self.guild.owner_id == obj.id:
             return Permissions.all()
 
-        default = self.guild.default_role
-        base = Permissions(default.permissions.value if default else 0)
-
         # Handle the role case first
         if isinstance(obj, Role):
+            default = self.guild.default_role
+            base = Permissions(default.permissions.value if default else 0)
             base.value |= obj._permissions
 
             if base.administrator:
@@ -762,6 +761,18 @@ class GuildChannel:
 
             return base
 
+        cache = self._state._permission_cache
+        if cache is not None:
+            value = cache._get(self.id, self._overwrites, obj)
+            if value is None:
+                value = self._resolve_member_permissions(obj).value
+                cache._set(self.id, self._overwrites, obj, value)
+            return Permissions(value)
+        return self._resolve_member_permissions(obj)
+
+    def _resolve_member_permissions(self, obj: Member, /) -> Permissions:
+        default = self.guild.default_role
+        base = Permissions(default.permissions.value if default else 0)
         roles = obj._roles
         get_role = self.guild.get_role
 
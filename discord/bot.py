@@ -1125,6 +1125,8 @@ class ApplicationCommandMixin(ABC):
             The invocation context to invoke.
         """
         self._bot.dispatch("application_command", ctx)
+        if ctx.guild is not None and self._bot._connection._lazy_chunking:
+            self._bot._connection._chunk_lazily(ctx.guild)
         try:
             if await self._bot.can_run(ctx, call_once=True):
                 await ctx.command.invoke(ctx)
@@ -0,0 +1,819 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import bisect
+import collections.abc
+import itertools
+import time
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Collection,
+    Iterable,
+    Iterator,
+    MutableMapping,
+    TypeVar,
+    overload,
+)
+
+if TYPE_CHECKING:
+    from .member import Member
+    from .message import Message
+
+__all__ = (
+    "CacheBackend",
+    "CachePolicy",
+    "PermissionCache",
+)
+
+K = TypeVar("K")
+V = TypeVar("V")
+CB = TypeVar("CB", bound="CacheBackend")
+
+
+class LRUCache(MutableMapping[K, V]):
+    """A mapping that evicts its least recently used entries past ``maxsize``.
+
+    Keys in ``pinned`` are never evicted. An ``expire_after`` may be given
+    to additionally drop entries that were not written to for that many
+    seconds. ``on_evict`` is called with every value dropped by either
+    policy, but not with values removed explicitly.
+    """
+
+    __slots__ = (
+        "maxsize",
+        "expire_after",
+        "_data",
+        "_expires",
+        "_pinned",
+        "_on_evict",
+    )
+
+    def __init__(
+        self,
+        maxsize: int | None = None,
+        *,
+        expire_after: float | None = None,
+        pinned: Collection[K] = (),
+        on_evict: Callable[[V], Any] | None = None,
+    ) -> None:
+        self.maxsize: int | None = maxsize
+        self.expire_after: float | None = expire_after
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._expires: dict[K, float] = {}
+        self._pinned: Collection[K] = pinned
+        self._on_evict: Callable[[V], Any] | None = on_evict
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} maxsize={self.maxsize}"
+            f" expire_after={self.expire_after} len={len(self._data)}>"
+        )
+
+    def __getitem__(self, key: K) -> V:
+        if self.expire_after is not None:
+            self._expire()
+        value = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        data = self._data
+        data[key] = value
+        data.move_to_end(key)
+        if self.expire_after is not None:
+            self._expires.pop(key, None)
+            self._expires[key] = time.monotonic() + self.expire_after
+            self._expire()
+
+        if self.maxsize is not None and len(data) > self.maxsize:
+            self._evict(len(data) - self.maxsize)
+
+    def __delitem__(self, key: K) -> None:
+        del self._data[key]
+        self._expires.pop(key, None)
+
+    def __contains__(self, key: Any) -> bool:
+        if self.expire_after is not None:
+            self._expire()
+        return key in self._data
+
+    def __iter__(self) -> Iterator[K]:
+        if self.expire_after is not None:
+            self._expire()
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # these are overridden so that iterating the cache does not refresh the
+    # recency of every entry (which would also mutate it while iterating)
+
+    def values(self):
+        if self.expire_after is not None:
+            self._expire()
+        return self._data.values()
+
+    def items(self):
+        if self.expire_after is not None:
+            self._expire()
+        return self._data.items()
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._expires.clear()
+
+    def _evict(self, count: int) -> None:
+        pinned = self._pinned
+        evicted = []
+        for key in self._data:
+            if key not in pinned:
+                evicted.append(key)
+                if len(evicted) >= count:
+                    break
+
+        for key in evicted:
+            self._drop(key)
+
+    def _drop(self, key: K) -> None:
+        self._expires.pop(key, None)
+        value = self._data.pop(key, None)
+        if value is not None and self._on_evict is not None:
+            self._on_evict(value)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        expires = self._expires
+        # keys are always re-inserted at the end when written, so the
+        # insertion order of _expires is also the expiry order
+        while expires:
+            key = next(iter(expires))
+            if expires[key] > now:
+                break
+            if key in self._pinned:
+                del expires[key]
+                expires[key] = now + self.expire_after  # type: ignore
+                continue
+            self._drop(key)
+
+
+class MessageCache(collections.abc.Sequence):
+    """A bounded, insertion ordered store of :class:`~discord.Message` objects.
+
+    This behaves like the ``deque(maxlen=...)`` that used to back the message
+    cache, i.e. the oldest message is evicted once ``maxlen`` is reached, but
+    messages are additionally indexed by their ID so that lookups and removals
+    are constant time.
+
+    If ``channel_index`` is enabled, a secondary index by channel ID is kept so
+    that the cached messages of a single channel can be retrieved without
+    walking the whole cache. If ``expire_after`` is given, messages are also
+    dropped that many seconds after they were added.
+    """
+
+    __slots__ = ("maxlen", "expire_after", "_messages", "_expires", "_channels")
+
+    def __init__(
+        self,
+        maxlen: int | None,
+        iterable: Iterable[Message] = (),
+        *,
+        channel_index: bool = False,
+        expire_after: float | None = None,
+    ) -> None:
+        self.maxlen: int | None = maxlen
+        self.expire_after: float | None = expire_after
+        self._messages: OrderedDict[int, Message] = OrderedDict()
+        self._expires: dict[int, float] = {}
+        self._channels: dict[int, dict[int, Message]] | None = (
+            {} if channel_index else None
+        )
+        for message in iterable:
+            self.append(message)
+
+    def __repr__(self) -> str:
+        return f"<MessageCache maxlen={self.maxlen} len={len(self._messages)}>"
+
+    def __len__(self) -> int:
+        if self.expire_after is not None:
+            self._expire()
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[Message]:
+        if self.expire_after is not None:
+            self._expire()
+        return iter(self._messages.values())
+
+    def __reversed__(self) -> Iterator[Message]:
+        if self.expire_after is not None:
+            self._expire()
+        return reversed(self._messages.values())
+
+    def __contains__(self, item: Any) -> bool:
+        message_id = getattr(item, "id", None)
+        return self._messages.get(message_id) is item  # type: ignore
+
+    @overload
+    def __getitem__(self, idx: int) -> Message: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> list[Message]: ...
+
+    def __getitem__(self, idx: int | slice) -> Message | list[Message]:
+        if isinstance(idx, slice):
+            return list(self._messages.values())[idx]
+
+        size = len(self._messages)
+        if idx < 0:
+            idx += size
+        if not 0 <= idx < size:
+            raise IndexError("message cache index out of range")
+
+        # walk from whichever end is closer, mirroring deque indexing
+        if idx < size // 2:
+            return next(itertools.islice(self._messages.values(), idx, None))
+        return next(
+            itertools.islice(reversed(self._messages.values()), size - idx - 1, None)
+        )
+
+    def get(self, message_id: int | None) -> Message | None:
+        """Returns the cached message with the given ID, or ``None``."""
+        if self.expire_after is not None:
+            self._expire()
+        return self._messages.get(message_id)  # type: ignore
+
+    def append(self, message: Message) -> None:
+        """Adds a message to the cache, evicting the oldest one if it is full."""
+        message_id = message.id
+        messages = self._messages
+        if message_id in messages:
+            self.pop(message_id)
+        elif self.maxlen is not None and len(messages) >= self.maxlen:
+            self.pop(next(iter(messages)))
+
+        messages[message_id] = message
+        if self.expire_after is not None:
+            self._expires[message_id] = time.monotonic() + self.expire_after
+            self._expire()
+        if self._channels is not None:
+            self._channels.setdefault(message.channel.id, {})[message_id] = message
+
+    def pop(self, message_id: int | None) -> Message | None:
+        """Removes and returns the message with the given ID, or ``None``."""
+        message = self._messages.pop(message_id, None)  # type: ignore
+        if message is not None:
+            self._expires.pop(message_id, None)  # type: ignore
+            self._unindex(message)
+        return message
+
+    def remove(self, message: Message) -> None:
+        """Removes the given message.
+
+        Raises :exc:`ValueError` if the message is not cached, like
+        :meth:`collections.deque.remove`.
+        """
+        if message not in self:
+            raise ValueError("message is not in the cache")
+        self.pop(message.id)
+
+    def remove_where(self, predicate: Callable[[Message], Any]) -> list[Message]:
+        """Removes every message matching ``predicate`` and returns them."""
+        removed = [m for m in self._messages.values() if predicate(m)]
+        for message in removed:
+            self.pop(message.id)
+        return removed
+
+    def clear(self) -> None:
+        self._messages.clear()
+        self._expires.clear()
+        if self._channels is not None:
+            self._channels.clear()
+
+    def channel_messages(self, channel_id: int) -> list[Message]:
+        """Returns the cached messages of a channel, oldest first."""
+        if self.expire_after is not None:
+            self._expire()
+        if self._channels is not None:
+            return list(self._channels.get(channel_id, {}).values())
+        return [m for m in self._messages.values() if m.channel.id == channel_id]
+
+    def _unindex(self, message: Message) -> None:
+        if self._channels is None:
+            return
+
+        channel_id = message.channel.id
+        bucket = self._channels.get(channel_id)
+        if bucket is not None:
+            bucket.pop(message.id, None)
+            if not bucket:
+                del self._channels[channel_id]
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        expires = self._expires
+        while expires:
+            message_id = next(iter(expires))
+            if expires[message_id] > now:
+                break
+            self.pop(message_id)
+
+
+class MemberNameIndex:
+    """A case-insensitive index of the names of a guild's members.
+
+    Every member is indexed by their username, global name and nickname,
+    case-folded, so that exact lookups are constant time and prefix searches
+    only walk the matching range of a sorted list of the indexed names.
+
+    Only member IDs are stored, callers resolve them through the member cache
+    and do the exact comparison themselves.
+
+    If ``user_guilds`` is given, it maps the ID of every indexed member to a
+    set that ``guild_id`` is kept in, which is shared by the indexes of all
+    guilds so that a renamed user is only reindexed where they are a member.
+    """
+
+    __slots__ = ("_ids", "_keys", "_added", "_names", "_guild_id", "_user_guilds")
+
+    def __init__(
+        self,
+        guild_id: int = 0,
+        user_guilds: dict[int, set[int]] | None = None,
+    ) -> None:
+        self._guild_id: int = guild_id
+        self._user_guilds: dict[int, set[int]] | None = user_guilds
+        # case-folded name -> IDs of the members using it, in insertion order
+        self._ids: dict[str, dict[int, None]] = {}
+        # the keys of _ids, sorted for prefix searches
+        self._keys: list[str] = []
+        # keys of _ids that are not in _keys yet. They are merged by the next
+        # search, so that filling the index while chunking does not insert
+        # into the sorted list for every member.
+        self._added: set[str] = set()
+        # member ID -> (username, global name, nickname)
+        self._names: dict[int, tuple[str | None, str | None, str | None]] = {}
+
+    def __repr__(self) -> str:
+        return f"<MemberNameIndex members={len(self._names)} names={len(self._ids)}>"
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, member_id: int) -> bool:
+        return member_id in self._names
+
+    def _link(self, member_id: int, names: Iterable[str | None]) -> None:
+        for name in set(filter(None, names)):
+            key = name.casefold()
+            try:
+                self._ids[key][member_id] = None
+            except KeyError:
+                self._ids[key] = {member_id: None}
+                self._added.add(key)
+
+    def _unlink(self, member_id: int, names: Iterable[str | None]) -> None:
+        for name in set(filter(None, names)):
+            key = name.casefold()
+            ids = self._ids.get(key)
+            if ids is None:
+                continue
+            ids.pop(member_id, None)
+            if not ids:
+                del self._ids[key]
+                if key in self._added:
+                    self._added.discard(key)
+                else:
+                    index = bisect.bisect_left(self._keys, key)
+                    if index < len(self._keys) and self._keys[index] == key:
+                        del self._keys[index]
+
+    def add(
+        self,
+        member_id: int,
+        name: str | None,
+        global_name: str | None,
+        nick: str | None,
+    ) -> None:
+        """Indexes a member, replacing the names it was indexed with before."""
+        names = (name, global_name, nick)
+        old = self._names.get(member_id)
+        if old == names:
+            return
+        if old is not None:
+            self._unlink(member_id, old)
+        elif self._user_guilds is not None:
+            self._user_guilds.setdefault(member_id, set()).add(self._guild_id)
+        self._names[member_id] = names
+        self._link(member_id, names)
+
+    def rename(self, member_id: int, name: str | None, global_name: str | None) -> None:
+        """Updates the user names of an indexed member, keeping the nickname."""
+        old = self._names.get(member_id)
+        if old is not None:
+            self.add(member_id, name, global_name, old[2])
+
+    def remove(self, member_id: int) -> None:
+        """Removes a member from the index."""
+        old = self._names.pop(member_id, None)
+        if old is not None:
+            self._unlink(member_id, old)
+            self._forget_guild(member_id)
+
+    def clear(self) -> None:
+        """Removes every member from the index."""
+        for member_id in self._names:
+            self._forget_guild(member_id)
+        self.__init__(self._guild_id, self._user_guilds)
+
+    def _forget_guild(self, member_id: int) -> None:
+        user_guilds = self._user_guilds
+        if user_guilds is not None:
+            guild_ids = user_guilds.get(member_id)
+            if guild_ids is not None:
+                guild_ids.discard(self._guild_id)
+                if not guild_ids:
+                    del user_guilds[member_id]
+
+    def _sorted_keys(self) -> list[str]:
+        added = self._added
+        if added:
+            keys = self._keys
+            if len(added) < 64:
+                for key in added:
+                    bisect.insort(keys, key)
+            else:
+                # timsort merges the sorted keys with the new ones without
+                # sorting everything again
+                keys.extend(added)
+                keys.sort()
+            added.clear()
+        return self._keys
+
+    def get(self, name: str) -> list[int]:
+        """Returns the IDs of the members using a name, ignoring case."""
+        return list(self._ids.get(name.casefold(), ()))
+
+    def search(self, prefix: str) -> Iterator[int]:
+        """Yields the IDs of the members with a name starting with ``prefix``,
+        ignoring case, ordered by the matching name.
+        """
+        prefix = prefix.casefold()
+        keys = self._sorted_keys()
+        seen: set[int] = set()
+        for index in range(bisect.bisect_left(keys, prefix), len(keys)):
+            key = keys[index]
+            if not key.startswith(prefix):
+                break
+            for member_id in self._ids[key]:
+                if member_id not in seen:
+                    seen.add(member_id)
+                    yield member_id
+
+
+class PermissionCache:
+    """Caches the permissions resolved by :meth:`abc.GuildChannel.permissions_for`
+    for members.
+
+    Entries are stored per channel and member. They are dropped when the
+    channel, a role of the member or the member itself is updated, and are
+    additionally checked against the channel's overwrites and the member's
+    roles so that objects updated outside of gateway events never return
+    stale permissions. Past ``maxsize`` entries, the least recently used
+    ones are evicted.
+
+    This is enabled through :attr:`CachePolicy.cache_permissions` and can be
+    accessed through :attr:`Client.permission_cache`.
+
+    .. versionadded:: 2.6
+
+    Attributes
+    ----------
+    maxsize: Optional[:class:`int`]
+        The maximum number of entries kept, or ``None`` for no limit.
+    hits: :class:`int`
+        The number of resolutions answered from the cache.
+    misses: :class:`int`
+        The number of resolutions that had to be computed.
+    """
+
+    __slots__ = ("maxsize", "hits", "misses", "_channels", "_recent")
+
+    def __init__(self, maxsize: int | None = None) -> None:
+        self.maxsize: int | None = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        # channel ID -> (overwrites, member ID -> (roles, permissions value))
+        self._channels: dict[int, tuple[list[Any], dict[int, tuple[Any, int]]]] = {}
+        # (channel ID, member ID) of every entry, to evict the oldest ones
+        self._recent: LRUCache[tuple[int, int], tuple[int, int]] | None = (
+            None if maxsize is None else LRUCache(maxsize, on_evict=self._evict)
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"<PermissionCache len={len(self)} hits={self.hits} misses={self.misses}>"
+        )
+
+    def __len__(self) -> int:
+        return sum(len(members) for _, members in self._channels.values())
+
+    @property
+    def hit_ratio(self) -> float:
+        """:class:`float`: The share of resolutions answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        """Drops every entry, keeping the statistics."""
+        self._channels.clear()
+        if self._recent is not None:
+            self._recent.clear()
+
+    def _evict(self, key: tuple[int, int]) -> None:
+        bucket = self._channels.get(key[0])
+        if bucket is not None:
+            bucket[1].pop(key[1], None)
+            if not bucket[1]:
+                del self._channels[key[0]]
+
+    def _forget(self, channel_id: int, member_ids: Iterable[int]) -> None:
+        recent = self._recent
+        if recent is not None:
+            for member_id in member_ids:
+                recent.pop((channel_id, member_id), None)
+
+    def _get(
+        self, channel_id: int, overwrites: list[Any], member: Member
+    ) -> int | None:
+        bucket = self._channels.get(channel_id)
+        if bucket is not None and bucket[0] is overwrites:
+            entry = bucket[1].get(member.id)
+            # the roles list is replaced whenever the member's roles change
+            if entry is not None and entry[0] is member._roles:
+                self.hits += 1
+                if self._recent is not None:
+                    self._recent[channel_id, member.id]  # refresh its recency
+                return entry[1]
+        self.misses += 1
+        return None
+
+    def _set(
+        self, channel_id: int, overwrites: list[Any], member: Member, value: int
+    ) -> None:
+        bucket = self._channels.get(channel_id)
+        if bucket is None or bucket[0] is not overwrites:
+            if bucket is not None:
+                self._forget(channel_id, bucket[1])
+            bucket = self._channels[channel_id] = (overwrites, {})
+        bucket[1][member.id] = (member._roles, value)
+        if self._recent is not None:
+            key = (channel_id, member.id)
+            self._recent[key] = key
+
+    def _invalidate_channels(self, channel_ids: Iterable[int]) -> None:
+        for channel_id in channel_ids:
+            bucket = self._channels.pop(channel_id, None)
+            if bucket is not None:
+                self._forget(channel_id, bucket[1])
+
+    def _invalidate_members(
+        self, channel_ids: Iterable[int], member_ids: Iterable[int]
+    ) -> None:
+        member_ids = tuple(member_ids)
+        for channel_id in channel_ids:
+            bucket = self._channels.get(channel_id)
+            if bucket is not None:
+                for member_id in member_ids:
+                    bucket[1].pop(member_id, None)
+                self._forget(channel_id, member_ids)
+
+
+class CacheBackend:
+    """Describes how a single kind of entity is cached by the library.
+
+    Instances should be created through the factory classmethods and
+    passed to a :class:`CachePolicy`.
+
+    .. versionadded:: 2.6
+
+    Attributes
+    ----------
+    maxsize: Optional[:class:`int`]
+        The maximum number of entries kept, or ``None`` for no limit.
+        Once exceeded, the least recently used entries are evicted.
+    expire_after: Optional[:class:`float`]
+        The number of seconds after which an entry that was not updated
+        is evicted, or ``None`` if entries do not expire.
+    """
+
+    __slots__ = ("maxsize", "expire_after")
+
+    def __init__(
+        self, *, maxsize: int | None = None, expire_after: float | None = None
+    ) -> None:
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize cannot be negative")
+        if expire_after is not None and expire_after <= 0:
+            raise ValueError("expire_after must be greater than 0")
+
+        self.maxsize: int | None = maxsize
+        self.expire_after: float | None = expire_after
+
+    def __repr__(self) -> str:
+        return f"<CacheBackend maxsize={self.maxsize} expire_after={self.expire_after}>"
+
+    @classmethod
+    def unbounded(cls: type[CB]) -> CB:
+        """A factory method that returns a :class:`CacheBackend` that caches
+        everything forever. This is the default for every entity.
+        """
+        return cls()
+
+    @classmethod
+    def lru(cls: type[CB], maxsize: int) -> CB:
+        """A factory method that returns a :class:`CacheBackend` that keeps
+        at most ``maxsize`` entries, evicting the least recently used ones.
+        """
+        return cls(maxsize=maxsize)
+
+    @classmethod
+    def ttl(cls: type[CB], expire_after: float, *, maxsize: int | None = None) -> CB:
+        """A factory method that returns a :class:`CacheBackend` that evicts
+        entries ``expire_after`` seconds after they were last stored,
+        optionally also capped to ``maxsize`` entries.
+        """
+        return cls(maxsize=maxsize, expire_after=expire_after)
+
+    @classmethod
+    def none(cls: type[CB]) -> CB:
+        """A factory method that returns a :class:`CacheBackend` that
+        caches nothing.
+        """
+        return cls(maxsize=0)
+
+    @property
+    def is_unbounded(self) -> bool:
+        """:class:`bool`: Whether this backend caches everything forever."""
+        return self.maxsize is None and self.expire_after is None
+
+    def _create(
+        self,
+        *,
+        pinned: Collection[Any] = (),
+        on_evict: Callable[[Any], Any] | None = None,
+    ) -> MutableMapping[Any, Any]:
+        if self.is_unbounded:
+            return {}
+        return LRUCache(
+            self.maxsize,
+            expire_after=self.expire_after,
+            pinned=pinned,
+            on_evict=on_evict,
+        )
+
+    def _create_message_cache(self, *, channel_index: bool) -> MessageCache | None:
+        if self.maxsize == 0:
+            return None
+        return MessageCache(
+            self.maxsize,
+            channel_index=channel_index,
+            expire_after=self.expire_after,
+        )
+
+
+class CachePolicy:
+    """Controls how the library stores the entities it receives from Discord.
+
+    Each entity kind is given a :class:`CacheBackend` which bounds how many
+    of them are kept in memory and for how long. This can be passed to
+    :class:`Client` through the ``cache_policy`` parameter.
+
+    This complements :class:`MemberCacheFlags`, which decides *which* members
+    are cached at all, whereas this class decides how many are kept.
+
+    .. warning::
+
+        Entities that are evicted from the cache are not re-fetched
+        automatically. Events referencing an evicted guild are discarded and
+        getters such as :meth:`Client.get_user` return ``None`` for evicted
+        entries.
+
+    .. versionadded:: 2.6
+
+    Attributes
+    ----------
+    users: :class:`CacheBackend`
+        The backend for the global user cache.
+    guilds: :class:`CacheBackend`
+        The backend for the guild cache. This cannot cache nothing.
+    emojis: :class:`CacheBackend`
+        The backend for the global emoji cache.
+    stickers: :class:`CacheBackend`
+        The backend for the global sticker cache.
+    members: :class:`CacheBackend`
+        The backend for the member cache. This applies to every guild
+        separately, so a ``maxsize`` is a per-guild cap. The client's own
+        member is never evicted.
+    messages: Optional[:class:`CacheBackend`]
+        The backend for the message cache. If ``None``, the ``max_messages``
+        parameter of :class:`Client` is used instead.
+    index_messages_by_channel: :class:`bool`
+        Whether to additionally index cached messages by channel ID.
+    compact_members: :class:`bool`
+        Whether to store the members of each guild in packed arrays instead of
+        :class:`Member` objects, which greatly reduces the memory used by very
+        large guilds. Members are turned back into objects when they are looked
+        up, and the most recently used ones are kept as objects. Iterating over
+        :attr:`Guild.members` creates new objects for the other members, which do
+        not receive later updates. This cannot be combined with a bounded
+        ``members`` backend. Pair it with a bounded ``users`` backend, since the
+        global user cache otherwise still holds every member's user.
+    index_member_names: :class:`bool`
+        Whether to index the usernames, global names and nicknames of the cached
+        members of each guild. This makes :meth:`Guild.get_member_named`, and
+        with it the member converters, constant time instead of scanning every
+        member, and speeds up :meth:`Guild.search_members`.
+    cache_permissions: :class:`bool`
+        Whether to cache the permissions resolved for members in guild channels,
+        see :class:`PermissionCache`.
+    permission_cache_size: Optional[:class:`int`]
+        The maximum number of permissions kept by the :class:`PermissionCache`,
+        or ``None`` for no limit. Defaults to ``100000``.
+    """
+
+    __slots__ = (
+        "users",
+        "guilds",
+        "emojis",
+        "stickers",
+        "members",
+        "messages",
+        "index_messages_by_channel",
+        "compact_members",
+        "index_member_names",
+        "cache_permissions",
+        "permission_cache_size",
+    )
+
+    def __init__(
+        self,
+        *,
+        users: CacheBackend | None = None,
+        guilds: CacheBackend | None = None,
+        emojis: CacheBackend | None = None,
+        stickers: CacheBackend | None = None,
+        members: CacheBackend | None = None,
+        messages: CacheBackend | None = None,
+        index_messages_by_channel: bool = False,
+        compact_members: bool = False,
+        index_member_names: bool = False,
+        cache_permissions: bool = False,
+        permission_cache_size: int | None = 100_000,
+    ) -> None:
+        self.users: CacheBackend = users or CacheBackend.unbounded()
+        self.guilds: CacheBackend = guilds or CacheBackend.unbounded()
+        self.emojis: CacheBackend = emojis or CacheBackend.unbounded()
+        self.stickers: CacheBackend = stickers or CacheBackend.unbounded()
+        self.members: CacheBackend = members or CacheBackend.unbounded()
+        self.messages: CacheBackend | None = messages
+        self.index_messages_by_channel: bool = index_messages_by_channel
+        self.compact_members: bool = compact_members
+        self.index_member_names: bool = index_member_names
+        self.cache_permissions: bool = cache_permissions
+        self.permission_cache_size: int | None = permission_cache_size
+
+        if self.guilds.maxsize == 0:
+            raise ValueError("guilds cannot use a backend that caches nothing")
+        if permission_cache_size is not None and permission_cache_size < 1:
+            raise ValueError("permission_cache_size must be at least 1")
+        if compact_members and not self.members.is_unbounded:
+            raise ValueError("compact_members cannot be used with a bounded members")
+
+    def __repr__(self) -> str:
+        attrs = " ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"<CachePolicy {attrs}>"
@@ -41,6 +41,7 @@ from .appinfo import AppInfo, PartialAppInfo
 from .application_role_connection import ApplicationRoleConnectionMetadata
 from .backoff import ExponentialBackoff
 from .channel import PartialMessageable, _threaded_channel_factory
+from .dispatch import DispatchLimits, DispatchStats, _EventLimiter
 from .emoji import Emoji
 from .enums import ChannelType, Status
 from .errors import *
@@ -67,9 +68,11 @@ from .widget import Widget
 
 if TYPE_CHECKING:
     from .abc import GuildChannel, PrivateChannel, Snowflake, SnowflakeTime
+    from .cache import PermissionCache
     from .channel import DMChannel
     from .member import Member
     from .message import Message
+    from .metrics import HTTPRecorder
     from .voice_client import VoiceProtocol
 
 __all__ = ("Client",)
@@ -115,6 +118,59 @@ def _cleanup_loop(loop: asyncio.AbstractEventLoop) -> None:
         loop.close()
 
 
+def _author_id(message: Message) -> int:
+    return message.author.id
+
+
+def _reaction_keys() -> dict[str, Callable[..., Any]]:
+    return {
+        "message_id": lambda reaction, user: reaction.message.id,
+        "channel_id": lambda reaction, user: reaction.message.channel.id,
+        "user_id": lambda reaction, user: user.id,
+        "emoji": lambda reaction, user: str(reaction.emoji),
+    }
+
+
+def _raw_reaction_keys() -> dict[str, Callable[..., Any]]:
+    return {
+        "message_id": lambda payload: payload.message_id,
+        "channel_id": lambda payload: payload.channel_id,
+        "user_id": lambda payload: payload.user_id,
+        "emoji": lambda payload: str(payload.emoji),
+    }
+
+
+# event -> key -> how to read the key from the event arguments
+_WAIT_FOR_KEYS: dict[str, dict[str, Callable[..., Any]]] = {
+    "message": {
+        "message_id": lambda message: message.id,
+        "channel_id": lambda message: message.channel.id,
+        "user_id": _author_id,
+    },
+    "message_edit": {
+        "message_id": lambda before, after: after.id,
+        "channel_id": lambda before, after: after.channel.id,
+        "user_id": lambda before, after: after.author.id,
+    },
+    "message_delete": {
+        "message_id": lambda message: message.id,
+        "channel_id": lambda message: message.channel.id,
+        "user_id": _author_id,
+    },
+    "reaction_add": _reaction_keys(),
+    "reaction_remove": _reaction_keys(),
+    "raw_reaction_add": _raw_reaction_keys(),
+    "raw_reaction_remove": _raw_reaction_keys(),
+    "interaction": {
+        "custom_id": lambda interaction: interaction.custom_id,
+        "message_id": lambda interaction: interaction.message
+        and interaction.message.id,
+        "channel_id": lambda interaction: interaction.channel_id,
+        "user_id": lambda interaction: interaction.user and interaction.user.id,
+    },
+}
+
+
 class Client:
     r"""Represents a client connection that connects to Discord.
     This class is used to interact with the Discord WebSocket and API.
@@ -157,13 +213,49 @@ class Client:
         currently selected intents.
 
         .. versionadded:: 1.5
+    cache_policy: :class:`CachePolicy`
+        Controls how many users, guilds, emojis, stickers, members and messages
+        are kept in the internal cache and for how long. If not given, everything
+        is cached without limits, except for messages which are bounded by
+        ``max_messages``.
+
+        .. versionadded:: 2.6
     chunk_guilds_at_startup: :class:`bool`
         Indicates if :func:`.on_ready` should be delayed to chunk all guilds
         at start-up if necessary. This operation is incredibly slow for large
         amounts of guilds. The default is ``True`` if :attr:`Intents.members`
-        is ``True``.
+        is ``True``, unless ``lazy_chunking`` is enabled.
 
         .. versionadded:: 1.5
+    lazy_chunking: :class:`bool`
+        Whether to chunk each guild in the background the first time it is needed
+        instead of at start-up, which means when :attr:`Guild.members` or
+        :meth:`Guild.get_member_named` is used or when a command is invoked in it.
+        Guilds that are never used are never chunked, and concurrent requests for the
+        same guild are coalesced. Results may be incomplete until the chunking is done,
+        use :meth:`Guild.chunk` to wait for it. Requires :attr:`Intents.members`.
+        Defaults to ``False``.
+
+        .. versionadded:: 2.6
+    cache_snapshot: Optional[:class:`str`]
+        The path of a file to save the cache to when the client is closed and to
+        restore it from when it starts. Guilds, channels, roles, members and users
+        are then available as soon as the client connects, instead of after their
+        ``GUILD_CREATE`` and member chunks. Restored guilds are reconciled with
+        their ``GUILD_CREATE``, and their restored members are only provisional:
+        the guild is always chunked again in the background, the members are
+        replaced as the chunks arrive and the ones missing from them are removed.
+        Without :attr:`Intents.members`, restored members are dropped. The snapshot
+        is encoded with msgpack if ``msgspec`` is installed. See also
+        :meth:`save_snapshot`.
+
+        .. versionadded:: 2.6
+    gateway_compression: :class:`str`
+        The transport compression used for the gateway connection. Either
+        ``"zlib-stream"``, the default, or ``"zstd-stream"``, which decompresses
+        faster but requires the ``zstandard`` library to be installed.
+
+        .. versionadded:: 2.6
     status: Optional[:class:`.Status`]
         A status to start your presence with upon logging on to Discord.
     activity: Optional[:class:`.BaseActivity`]
@@ -190,6 +282,39 @@ class Client:
         sync your system clock to Google's NTP server.
 
         .. versionadded:: 1.3
+    global_ratelimit: Optional[:class:`int`]
+        The maximum number of requests per second to send to the API, used to stay
+        under Discord's global rate limit before it is hit, for example ``50``, which
+        is the global rate limit of most bots. Defaults to ``None``, which disables
+        this.
+
+        .. versionadded:: 2.6
+    global_ratelimit_file: Optional[:class:`str`]
+        The path of a file used to share the ``global_ratelimit`` budget between
+        several processes running with the same token, for example multiple workers
+        on one machine. Only used if ``global_ratelimit`` is set, and only supported
+        on Unix.
+
+        .. versionadded:: 2.6
+    coalesce_requests: :class:`bool`
+        Whether identical ``GET`` requests that are made while one of them is still in
+        flight share a single API call, such as concurrent :meth:`abc.Messageable.fetch_message`
+        calls for the same message. Each caller still gets its own copy of the payload,
+        which costs a deep copy per shared response. Defaults to ``False``.
+
+        .. versionadded:: 2.6
+    response_cache_ttl: Optional[:class:`float`]
+        If given, the number of seconds for which the responses of ``GET`` requests are
+        cached and reused for identical requests. Defaults to ``None``, which disables
+        this cache.
+
+        .. versionadded:: 2.6
+    http_recorder: Optional[:class:`HTTPRecorder`]
+        An object that is notified of every HTTP request the client makes, including
+        its latency, rate limits and retries. :class:`HTTPMetrics` can be used to
+        aggregate these in memory and export them. Defaults to ``None``.
+
+        .. versionadded:: 2.6
     enable_debug_events: :class:`bool`
         Whether to enable events that are useful only for debugging gateway related information.
 
@@ -198,6 +323,29 @@ class Client:
         To enable these events, this must be set to ``True``. Defaults to ``False``.
 
         .. versionadded:: 2.0
+    skip_unhandled_events: :class:`bool`
+        Whether to skip decoding gateway events that nothing listens to and that do not
+        affect the cache, such as ``TYPING_START``. Only the sequence number of such
+        events is tracked. This has no effect while ``enable_debug_events`` is ``True``.
+        Defaults to ``False``.
+
+        .. versionadded:: 2.6
+    event_workers: Optional[:class:`int`]
+        If given, event handlers are run by this many long-lived worker tasks instead of
+        one new task per handler and event. The handlers of each event are looked up
+        once and cached until listeners are added or removed, and run one after another
+        by a single worker, with exceptions still being passed to :func:`on_error`.
+        This saves a lot of overhead for bots receiving many events, but a handler that
+        waits for a long time, for example on :meth:`wait_for`, holds up its worker.
+        Defaults to ``None``.
+
+        .. versionadded:: 2.6
+    dispatch_limits: Optional[:class:`DispatchLimits`]
+        Bounds how many event handlers may run at the same time, and what happens to
+        the ones that have to wait. This protects the bot from floods of events, such
+        as during raids. Defaults to ``None``, which does not limit handlers.
+
+        .. versionadded:: 2.6
 
     Attributes
     -----------
@@ -221,6 +369,14 @@ class Client:
         self._listeners: dict[str, list[tuple[asyncio.Future, Callable[..., bool]]]] = (
             {}
         )
+        # event -> key names -> key values -> listeners, for keyed wait_for calls
+        self._keyed_listeners: dict[
+            str,
+            dict[
+                tuple[str, ...],
+                dict[tuple[Any, ...], list[tuple[asyncio.Future, Callable[..., bool]]]],
+            ],
+        ] = {}
         self.shard_id: int | None = options.get("shard_id")
         self.shard_count: int | None = options.get("shard_count")
 
@@ -228,11 +384,21 @@ class Client:
         proxy: str | None = options.pop("proxy", None)
         proxy_auth: aiohttp.BasicAuth | None = options.pop("proxy_auth", None)
         unsync_clock: bool = options.pop("assume_unsync_clock", True)
+        global_ratelimit: int | None = options.pop("global_ratelimit", None)
+        global_ratelimit_file: str | None = options.pop("global_ratelimit_file", None)
+        coalesce_requests: bool = options.pop("coalesce_requests", False)
+        response_cache_ttl: float | None = options.pop("response_cache_ttl", None)
+        http_recorder: HTTPRecorder | None = options.pop("http_recorder", None)
         self.http: HTTPClient = HTTPClient(
             connector,
             proxy=proxy,
             proxy_auth=proxy_auth,
             unsync_clock=unsync_clock,
+            global_ratelimit=global_ratelimit,
+            global_ratelimit_file=global_ratelimit_file,
+            coalesce_requests=coalesce_requests,
+            response_cache_ttl=response_cache_ttl,
+            http_recorder=http_recorder,
             loop=self.loop,
         )
 
@@ -250,6 +416,19 @@ class Client:
         self._connection._get_websocket = self._get_websocket
         self._connection._get_client = lambda: self
         self._event_handlers: dict[str, list[Coro]] = {}
+        # event -> (method name, handlers, handlers to remove after one call)
+        self._handler_tables: dict[
+            str, tuple[str, tuple[Coro, ...], tuple[Coro, ...]]
+        ] = {}
+        self._event_workers: int | None = options.pop("event_workers", None)
+        self._event_queue: asyncio.Queue | None = None
+        self._event_worker_tasks: list[asyncio.Task] = []
+        dispatch_limits: DispatchLimits | None = options.pop("dispatch_limits", None)
+        self._event_limiter: _EventLimiter | None = (
+            _EventLimiter(dispatch_limits, self._start_limited_event)
+            if dispatch_limits is not None
+            else None
+        )
 
         if VoiceClient.warn_nacl:
             VoiceClient.warn_nacl = False
@@ -346,6 +525,15 @@ class Client:
         """
         return utils.SequenceProxy(self._connection._messages or [])
 
+    @property
+    def permission_cache(self) -> PermissionCache | None:
+        """The cache of resolved channel permissions, or ``None`` if
+        :attr:`CachePolicy.cache_permissions` is disabled.
+
+        .. versionadded:: 2.6
+        """
+        return self._connection._permission_cache
+
     @property
     def private_channels(self) -> list[PrivateChannel]:
         """The private channels that the connected client is participating on.
@@ -417,6 +605,97 @@ class Client:
         # Schedules the task
         return asyncio.create_task(wrapped, name=f"pycord: {event_name}")
 
+    def _has_event_listener(self, event: str) -> bool:
+        method = f"on_{event}"
+        return (
+            hasattr(self, method)
+            or bool(self._event_handlers.get(method))
+            or bool(self._listeners.get(event))
+            or bool(self._keyed_listeners.get(event))
+        )
+
+    def _get_handler_table(
+        self, event: str
+    ) -> tuple[str, tuple[Coro, ...], tuple[Coro, ...]]:
+        try:
+            return self._handler_tables[event]
+        except KeyError:
+            pass
+
+        method = f"on_{event}"
+        handlers = []
+        try:
+            handlers.append(getattr(self, method))
+        except AttributeError:
+            pass
+        listeners = self._event_handlers.get(method, [])
+        handlers.extend(listeners)
+        once = tuple(coro for coro in listeners if getattr(coro, "_once", False))
+        table = self._handler_tables[event] = (method, tuple(handlers), once)
+        return table
+
+    def _start_event_workers(self) -> asyncio.Queue:
+        self._event_queue = queue = asyncio.Queue()
+        self._event_worker_tasks = [
+            asyncio.create_task(self._event_worker(queue), name="pycord: event worker")
+            for _ in range(self._event_workers)  # type: ignore
+        ]
+        return queue
+
+    def _stop_event_workers(self) -> None:
+        queue, self._event_queue = self._event_queue, None
+        for task in self._event_worker_tasks:
+            task.cancel()
+        self._event_worker_tasks = []
+
+        limiter = self._event_limiter
+        if limiter is not None:
+            limiter.clear()
+            # release the handlers that were admitted but never ran
+            while queue is not None and not queue.empty():
+                limiter.done(queue.get_nowait()[0])
+
+    async def _event_worker(self, queue: asyncio.Queue) -> None:
+        # _run_event swallows cancellation, so check whether we were stopped
+        while self._event_queue is queue:
+            method, handlers, args, kwargs = await queue.get()
+            try:
+                for coro in handlers:
+                    await self._run_event(coro, method, *args, **kwargs)
+            finally:
+                if self._event_limiter is not None:
+                    self._event_limiter.done(method)
+
+    def _start_limited_event(self, method: str, job: tuple[Any, ...]) -> None:
+        if self._event_workers is not None:
+            queue = self._event_queue or self._start_event_workers()
+            queue.put_nowait((method, *job))
+            return
+
+        coro, args, kwargs = job
+        task = self._schedule_event(coro, method, *args, **kwargs)
+        task.add_done_callback(lambda _: self._event_limiter.done(method))  # type: ignore
+
+    def _schedule_limited_event(
+        self, coro: Coro, method: str, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> None:
+        # handlers dispatched after close are not limited anymore
+        if self._event_limiter is None or self._closed:
+            self._schedule_event(coro, method, *args, **kwargs)
+        else:
+            self._event_limiter.submit(method, (coro, args, kwargs))
+
+    @property
+    def dispatch_stats(self) -> DispatchStats | None:
+        """The current state of the event handlers limited by the ``dispatch_limits``
+        parameter, or ``None`` if it was not given.
+
+        .. versionadded:: 2.6
+        """
+        if self._event_limiter is None:
+            return None
+        return self._event_limiter.stats()
+
     def dispatch(self, event: str, *args: Any, **kwargs: Any) -> None:
         _log.debug("Dispatching event %s", event)
         method = f"on_{event}"
@@ -450,13 +729,50 @@ class Client:
                 for idx in reversed(removed):
                     del listeners[idx]
 
+        keyed = self._keyed_listeners.get(event)
+        if keyed:
+            getters = _WAIT_FOR_KEYS[event]
+            for names, index in list(keyed.items()):
+                try:
+                    values = tuple(getters[name](*args) for name in names)
+                except Exception:
+                    continue
+
+                # the listeners remove themselves once their future is done
+                for future, condition in list(index.get(values, ())):
+                    if future.done():
+                        continue
+
+                    try:
+                        result = condition(*args)
+                    except Exception as exc:
+                        future.set_exception(exc)
+                    else:
+                        if result:
+                            future.set_result(args[0] if len(args) == 1 else args)
+
+        # the workers are not started again once the client is closed
+        if self._event_workers is not None and not self._closed:
+            method, handlers, once = self._get_handler_table(event)
+            if handlers:
+                if self._event_limiter is not None:
+                    self._event_limiter.submit(method, (handlers, args, kwargs))
+                else:
+                    queue = self._event_queue or self._start_event_workers()
+                    queue.put_nowait((method, handlers, args, kwargs))
+            if once:
+                for coro in once:
+                    self._event_handlers[method].remove(coro)
+                self._handler_tables.clear()
+            return
+
         # Schedule the main handler registered with @event
         try:
             coro = getattr(self, method)
         except AttributeError:
             pass
         else:
-            self._schedule_event(coro, method, *args, **kwargs)
+            self._schedule_limited_event(coro, method, args, kwargs)
 
         # collect the once listeners as removing them from the list
         # while iterating over it causes issues
@@ -464,7 +780,7 @@ class Client:
 
         # Schedule additional handlers registered with @listen
         for coro in self._event_handlers.get(method, []):
-            self._schedule_event(coro, method, *args, **kwargs)
+            self._schedule_limited_event(coro, method, args, kwargs)
 
             try:
                 if coro._once:  # added using @listen()
@@ -481,6 +797,8 @@ class Client:
         # remove the once listeners
         for coro in once_listeners:
             self._event_handlers[method].remove(coro)
+        if once_listeners:
+            self._handler_tables.clear()
 
     async def on_error(self, event_method: str, *args: Any, **kwargs: Any) -> None:
         """|coro|
@@ -561,6 +879,7 @@ class Client:
 
         data = await self.http.static_login(token.strip())
         self._connection.user = ClientUser(state=self._connection, data=data)
+        await self._connection._load_snapshot()
 
     async def connect(self, *, reconnect: bool = True) -> None:
         """|coro|
@@ -669,6 +988,7 @@ class Client:
             return
 
         self._closed = True
+        self._stop_event_workers()
 
         for voice in self.voice_clients:
             try:
@@ -680,9 +1000,48 @@ class Client:
         if self.ws is not None and self.ws.open:
             await self.ws.close(code=1000)
 
+        await self._save_snapshot_on_close()
         await self.http.close()
         self._ready.clear()
 
+    async def save_snapshot(self, path: str | None = None) -> None:
+        """|coro|
+
+        Saves the cache to a file that can be restored through the
+        ``cache_snapshot`` parameter. This is done automatically when the
+        client is closed if ``cache_snapshot`` is given.
+
+        The cache is read in the event loop while the file is encoded and
+        written in an executor, replacing any existing file atomically.
+
+        .. versionadded:: 2.6
+
+        Parameters
+        ----------
+        path: Optional[:class:`str`]
+            The file to write to. Defaults to the ``cache_snapshot`` path.
+
+        Raises
+        ------
+        ValueError
+            No path was given and ``cache_snapshot`` is not set.
+        OSError
+            Writing the file failed.
+        """
+        path = path or self._connection._snapshot_path
+        if path is None:
+            raise ValueError("no path was given and cache_snapshot is not set")
+        await self._connection.save_snapshot(path)
+
+    async def _save_snapshot_on_close(self) -> None:
+        # an incomplete cache would overwrite a better snapshot
+        if self._connection._snapshot_path is None or not self.is_ready():
+            return
+        try:
+            await self.save_snapshot()
+        except Exception:
+            _log.exception("Failed to save the cache snapshot")
+
     def clear(self) -> None:
         """Clears the internal state of the bot.
 
@@ -1084,6 +1443,7 @@ class Client:
         *,
         check: Callable[..., bool] | None = None,
         timeout: float | None = None,
+        **keys: Any,
     ) -> Any:
         """|coro|
 
@@ -1116,6 +1476,21 @@ class Client:
         timeout: Optional[:class:`float`]
             The number of seconds to wait before timing out and raising
             :exc:`asyncio.TimeoutError`.
+        \\*\\*keys
+            Values the event must match, which are looked up in an index instead of
+            being checked one by one. This keeps waiting cheap when many ``wait_for``
+            calls are pending for the same event. ``check`` is still called for events
+            that match. The supported keys are:
+
+            - ``message``, ``message_edit`` and ``message_delete``: ``message_id``,
+              ``channel_id`` and ``user_id`` (the author).
+            - ``reaction_add``, ``reaction_remove``, ``raw_reaction_add`` and
+              ``raw_reaction_remove``: ``message_id``, ``channel_id``, ``user_id`` and
+              ``emoji`` (its string form).
+            - ``interaction``: ``custom_id``, ``message_id``, ``channel_id`` and
+              ``user_id``.
+
+            .. versionadded:: 2.6
 
         Returns
         -------
@@ -1128,6 +1503,8 @@ class Client:
         ------
         asyncio.TimeoutError
             Raised if a timeout is provided and reached.
+        TypeError
+            A key is not supported for the event.
 
         Examples
         --------
@@ -1163,6 +1540,16 @@ class Client:
                         await channel.send('\N{THUMBS DOWN SIGN}')
                     else:
                         await channel.send('\N{THUMBS UP SIGN}')
+
+        Waiting for a button press on a specific message by the command author: ::
+
+            interaction = await client.wait_for(
+                'interaction',
+                custom_id='confirm',
+                message_id=message.id,
+                user_id=ctx.author.id,
+                timeout=60.0,
+            )
         """
 
         future = self.loop.create_future()
@@ -1174,6 +1561,31 @@ class Client:
             check = _check
 
         ev = event.lower()
+        if keys:
+            try:
+                getters = _WAIT_FOR_KEYS[ev]
+            except KeyError:
+                raise TypeError(
+                    f"wait_for() does not support keys for the {ev!r} event"
+                ) from None
+
+            unknown = keys.keys() - getters.keys()
+            if unknown:
+                raise TypeError(
+                    f"wait_for() got unsupported keys for the {ev!r} event:"
+                    f" {', '.join(sorted(unknown))}"
+                )
+
+            names = tuple(sorted(keys))
+            values = tuple(keys[name] for name in names)
+            entry = (future, check)
+            index = self._keyed_listeners.setdefault(ev, {}).setdefault(names, {})
+            index.setdefault(values, []).append(entry)
+            future.add_done_callback(
+                lambda _: self._remove_keyed_listener(ev, names, values, entry)
+            )
+            return asyncio.wait_for(future, timeout)
+
         try:
             listeners = self._listeners[ev]
         except KeyError:
@@ -1183,6 +1595,24 @@ class Client:
         listeners.append((future, check))
         return asyncio.wait_for(future, timeout)
 
+    def _remove_keyed_listener(
+        self,
+        event: str,
+        names: tuple[str, ...],
+        values: tuple[Any, ...],
+        entry: tuple[asyncio.Future, Callable[..., bool]],
+    ) -> None:
+        keyed = self._keyed_listeners[event]
+        index = keyed[names]
+        listeners = index[values]
+        listeners.remove(entry)
+        if not listeners:
+            del index[values]
+            if not index:
+                del keyed[names]
+                if not keyed:
+                    del self._keyed_listeners[event]
+
     # event registration
     def add_listener(self, func: Coro, name: str = MISSING) -> None:
         """The non decorator alternative to :meth:`.listen`.
@@ -1224,6 +1654,7 @@ class Client:
             self._event_handlers[name].append(func)
         else:
             self._event_handlers[name] = [func]
+        self._handler_tables.clear()
 
         _log.debug(
             "%s has successfully been registered as a handler for event %s",
@@ -1250,6 +1681,7 @@ class Client:
                 self._event_handlers[name].remove(func)
             except ValueError:
                 pass
+            self._handler_tables.clear()
 
     def listen(self, name: str = MISSING, once: bool = False) -> Callable[[Coro], Coro]:
         """A decorator that registers another function as an external
@@ -1336,6 +1768,7 @@ class Client:
             raise TypeError("event registered must be a coroutine function")
 
         setattr(self, coro.__name__, coro)
+        self._handler_tables.clear()
         _log.debug("%s has successfully been registered as an event", coro.__name__)
         return coro
 
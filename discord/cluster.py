@@ -0,0 +1,749 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import inspect
+import logging
+import math
+import multiprocessing
+import os
+import secrets
+import signal
+import struct
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from . import utils
+from .errors import ClientException
+from .http import HTTPClient
+
+if TYPE_CHECKING:
+    from multiprocessing.process import BaseProcess
+
+    from .shard import AutoShardedClient
+
+__all__ = (
+    "ClusterManager",
+    "Cluster",
+)
+
+_log = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+
+# the seconds Discord requires between two IDENTIFYs of the same rate limit key
+IDENTIFY_INTERVAL: float = 5.0
+
+# the seconds between two checks of the cluster processes
+SUPERVISE_INTERVAL: float = 1.0
+# the seconds to wait before restarting a crashed cluster, doubled for every
+# crash in a row up to RESTART_MAX_DELAY
+RESTART_DELAY: float = 1.0
+RESTART_MAX_DELAY: float = 60.0
+# the seconds a cluster has to run for before its crashes no longer count as
+# in a row
+RESTART_RESET_AFTER: float = 300.0
+
+
+class _Peer:
+    """One end of an IPC connection.
+
+    Messages are JSON objects prefixed with their length. Requests carry a
+    nonce, which the other end echoes back in its ``reply``.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        handler: Callable[[str, Any], Awaitable[Any]],
+    ) -> None:
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+        self._handler = handler
+        self._nonce: int = 0
+        self._pending: dict[int, asyncio.Future[Any]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._write_lock: asyncio.Lock = asyncio.Lock()
+
+    async def send(self, payload: dict[str, Any]) -> None:
+        await self._write(utils._to_json(payload).encode("utf-8"))
+
+    async def _write(self, data: bytes) -> None:
+        async with self._write_lock:
+            self.writer.write(_HEADER.pack(len(data)) + data)
+            await self.writer.drain()
+
+    async def receive(self) -> dict[str, Any]:
+        (size,) = _HEADER.unpack(await self.reader.readexactly(_HEADER.size))
+        return utils._from_json(await self.reader.readexactly(size))
+
+    async def request(
+        self, op: str, data: Any = None, *, timeout: float | None = None
+    ) -> Any:
+        self._nonce += 1
+        nonce = self._nonce
+        future = asyncio.get_running_loop().create_future()
+        self._pending[nonce] = future
+        try:
+            await self.send({"op": op, "nonce": nonce, "d": data})
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(nonce, None)
+
+    async def run(self) -> None:
+        try:
+            while True:
+                payload = await self.receive()
+                if payload["op"] != "reply":
+                    task = asyncio.create_task(self._respond(payload))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                    continue
+
+                future = self._pending.get(payload["nonce"])
+                if future is None or future.done():
+                    continue
+                if payload.get("error") is not None:
+                    future.set_exception(ClientException(payload["error"]))
+                else:
+                    future.set_result(payload["d"])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(
+                        ClientException("The IPC connection was closed.")
+                    )
+
+    async def _respond(self, payload: dict[str, Any]) -> None:
+        reply: dict[str, Any] = {"op": "reply", "nonce": payload["nonce"], "d": None}
+        try:
+            reply["d"] = await self._handler(payload["op"], payload["d"])
+            data = utils._to_json(reply)
+        except Exception as exc:
+            reply["d"] = None
+            reply["error"] = f"{exc.__class__.__name__}: {exc}"
+            data = utils._to_json(reply)
+        try:
+            await self._write(data.encode("utf-8"))
+        except (ConnectionError, RuntimeError):
+            pass
+
+    def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self.writer.close()
+
+
+class ClusterManager:
+    """Runs a bot in several processes, each of them handling a range of shards.
+
+    Every process, called a cluster, runs its own :class:`AutoShardedClient`
+    and event loop, which lets a large bot use more than one CPU core. The
+    manager keeps the clusters within the IDENTIFY concurrency of the bot and
+    connects them through an IPC channel over a local socket, see
+    :class:`Cluster`.
+
+    The client of each cluster is created by calling ``factory`` in the
+    process of the cluster with the ``shard_ids`` and ``shard_count`` keyword
+    arguments, which must be passed on to the client. ``factory`` must
+    therefore be picklable, such as a function defined at the top level of a
+    module, and :meth:`run` should be guarded by
+    ``if __name__ == "__main__":``. ::
+
+        def create_bot(**options):
+            bot = discord.AutoShardedBot(intents=discord.Intents.default(), **options)
+            bot.load_extension("cogs.general")
+            return bot
+
+        if __name__ == "__main__":
+            discord.ClusterManager(create_bot, token=TOKEN, clusters=4).run()
+
+    .. versionadded:: 2.6
+
+    Parameters
+    ----------
+    factory: Callable[..., :class:`AutoShardedClient`]
+        Creates the client of a cluster.
+    token: :class:`str`
+        The authentication token of the bot.
+    clusters: Optional[:class:`int`]
+        The number of processes to start. Defaults to the number of CPUs,
+        but never more than the number of shards.
+    shard_count: Optional[:class:`int`]
+        The total number of shards. If not given, the number recommended by
+        Discord is used.
+    host: :class:`str`
+        The address the IPC server listens on.
+    port: :class:`int`
+        The port the IPC server listens on. Defaults to a free port.
+    timeout: Optional[:class:`float`]
+        The seconds to wait for the clusters to answer a query.
+    max_restarts: Optional[:class:`int`]
+        The number of times in a row a crashed cluster is restarted before it
+        is given up on. The restarts are delayed exponentially, from one
+        second up to a minute, and no longer count as in a row once the
+        cluster ran for five minutes. ``None`` restarts clusters forever.
+        Defaults to ``5``.
+    allow_eval: :class:`bool`
+        Whether the clusters accept :meth:`broadcast_eval`, which runs
+        arbitrary code in them. Anything that can connect to the IPC server
+        and knows its secret can then execute code in every cluster. Defaults
+        to ``False``.
+
+    Attributes
+    ----------
+    shard_count: Optional[:class:`int`]
+        The total number of shards, known once the manager has started.
+    max_concurrency: Optional[:class:`int`]
+        The number of shards that may IDENTIFY at the same time, known once the
+        manager has started.
+    cluster_shards: Dict[:class:`int`, List[:class:`int`]]
+        The shard IDs handled by each cluster.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[..., AutoShardedClient],
+        *,
+        token: str,
+        clusters: int | None = None,
+        shard_count: int | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        timeout: float | None = 30.0,
+        max_restarts: int | None = 5,
+        allow_eval: bool = False,
+    ) -> None:
+        self.factory: Callable[..., AutoShardedClient] = factory
+        self.token: str = token
+        self.host: str = host
+        self.port: int = port
+        self.timeout: float | None = timeout
+        self.max_restarts: int | None = max_restarts
+        self.allow_eval: bool = allow_eval
+        self.shard_count: int | None = shard_count
+        self.max_concurrency: int | None = None
+        self.cluster_shards: dict[int, list[int]] = {}
+        self._cluster_count: int | None = clusters
+        self._secret: str = secrets.token_hex(16)
+        self._server: asyncio.AbstractServer | None = None
+        self._peers: dict[int, _Peer] = {}
+        self._processes: dict[int, BaseProcess] = {}
+        # cluster ID -> when it was last started, by the loop's clock
+        self._started_at: dict[int, float] = {}
+        # cluster ID -> its crashes in a row
+        self._crashes: dict[int, int] = {}
+        # cluster ID -> when to restart it, by the loop's clock
+        self._restart_at: dict[int, float] = {}
+        self._identify_locks: dict[int, asyncio.Lock] = {}
+        self._identify_after: dict[int, float] = {}
+        self._closed: bool = False
+
+    async def _fetch_gateway(self) -> None:
+        http = HTTPClient(global_ratelimit=None)
+        try:
+            await http.static_login(self.token)
+            shard_count, _, limits = await http.get_bot_gateway_info()
+        finally:
+            await http.close()
+
+        if self.shard_count is None:
+            self.shard_count = shard_count
+        self.max_concurrency = max(limits.get("max_concurrency", 1), 1)
+
+    def _split_shards(self) -> None:
+        shard_count = self.shard_count or 1
+        clusters = min(self._cluster_count or os.cpu_count() or 1, shard_count)
+        per_cluster = math.ceil(shard_count / clusters)
+        self.cluster_shards = {
+            cluster_id: list(range(start, min(start + per_cluster, shard_count)))
+            for cluster_id, start in enumerate(range(0, shard_count, per_cluster))
+        }
+
+    async def _serve(self) -> None:
+        self._server = await asyncio.start_server(
+            self._on_connection, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _on_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        peer = _Peer(reader, writer, self._handle)
+        try:
+            hello = await asyncio.wait_for(peer.receive(), 10.0)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            writer.close()
+            return
+
+        data = hello.get("d") or {}
+        secret = str(data.get("secret", ""))
+        if hello.get("op") != "hello" or not hmac.compare_digest(secret, self._secret):
+            _log.warning("Rejected an IPC connection with an invalid secret.")
+            writer.close()
+            return
+
+        cluster_id: int = data["cluster_id"]
+        self._peers[cluster_id] = peer
+        _log.info("Cluster %s connected to the IPC server.", cluster_id)
+        try:
+            await peer.run()
+        finally:
+            if self._peers.get(cluster_id) is peer:
+                del self._peers[cluster_id]
+            peer.close()
+            _log.info("Cluster %s disconnected from the IPC server.", cluster_id)
+
+    async def _handle(self, op: str, data: Any) -> Any:
+        if op == "identify":
+            await self._wait_for_identify(data["shard_id"])
+            return None
+        if op == "broadcast_eval":
+            return await self.broadcast_eval(data["code"])
+        if op == "broadcast":
+            await self.broadcast(data["name"], data["data"])
+            return None
+        if op == "stats":
+            return await self._gather("stats")
+        raise ClientException(f"Unknown IPC operation {op!r}.")
+
+    async def _wait_for_identify(self, shard_id: int) -> None:
+        key = shard_id % (self.max_concurrency or 1)
+        try:
+            lock = self._identify_locks[key]
+        except KeyError:
+            lock = self._identify_locks[key] = asyncio.Lock()
+
+        async with lock:
+            loop = asyncio.get_running_loop()
+            delay = self._identify_after.get(key, 0.0) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._identify_after[key] = loop.time() + IDENTIFY_INTERVAL
+        _log.debug("Shard ID %s may IDENTIFY now.", shard_id)
+
+    async def _gather(self, op: str, data: Any = None) -> list[Any]:
+        peers = [self._peers[cluster_id] for cluster_id in sorted(self._peers)]
+        return list(
+            await asyncio.gather(
+                *(peer.request(op, data, timeout=self.timeout) for peer in peers)
+            )
+        )
+
+    async def broadcast_eval(self, code: str) -> list[Any]:
+        """|coro|
+
+        Evaluates a Python expression in every connected cluster. This
+        requires ``allow_eval`` to be enabled.
+
+        The expression can use ``client`` and ``cluster``, which are the
+        :class:`AutoShardedClient` and the :class:`Cluster` of the process. If
+        it results in an awaitable, it is awaited. The result must be JSON
+        serializable.
+
+        Parameters
+        ----------
+        code: :class:`str`
+            The expression to evaluate.
+
+        Returns
+        -------
+        List[Any]
+            The result of each cluster, ordered by cluster ID.
+
+        Raises
+        ------
+        ClientException
+            The expression failed in one of the clusters, or ``allow_eval``
+            is not enabled.
+        asyncio.TimeoutError
+            A cluster did not answer in time.
+        """
+        if not self.allow_eval:
+            raise ClientException("broadcast_eval requires allow_eval=True.")
+        return await self._gather("eval", {"code": code})
+
+    async def broadcast(self, name: str, data: Any = None) -> None:
+        """|coro|
+
+        Sends a message to every connected cluster, which is received through
+        :func:`on_cluster_message`.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The name of the message.
+        data: Any
+            The JSON serializable content of the message.
+        """
+        await self._gather("message", {"name": name, "data": data})
+
+    async def fetch_guild_count(self) -> int:
+        """|coro|
+
+        Returns the number of guilds across all connected clusters.
+        """
+        return sum(stats["guilds"] for stats in await self._gather("stats"))
+
+    async def fetch_latencies(self) -> list[tuple[int, float]]:
+        """|coro|
+
+        Returns the latency of every shard across all connected clusters.
+
+        This returns a list of tuples with elements ``(shard_id, latency)``,
+        like :attr:`AutoShardedClient.latencies`.
+        """
+        return sorted(
+            (shard_id, latency)
+            for stats in await self._gather("stats")
+            for shard_id, latency in stats["latencies"]
+        )
+
+    def _spawn(self, cluster_id: int) -> None:
+        context = multiprocessing.get_context("spawn")
+        process = context.Process(
+            target=_run_cluster,
+            args=(
+                self.factory,
+                self.token,
+                {
+                    "cluster_id": cluster_id,
+                    "cluster_count": len(self.cluster_shards),
+                    "shard_ids": self.cluster_shards[cluster_id],
+                    "shard_count": self.shard_count,
+                    "host": self.host,
+                    "port": self.port,
+                    "secret": self._secret,
+                    "allow_eval": self.allow_eval,
+                },
+            ),
+            name=f"pycord-cluster-{cluster_id}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[cluster_id] = process
+        self._started_at[cluster_id] = asyncio.get_running_loop().time()
+        _log.info(
+            "Started cluster %s with shards %s.",
+            cluster_id,
+            self.cluster_shards[cluster_id],
+        )
+
+    async def start(self) -> None:
+        """|coro|
+
+        Starts the IPC server and the clusters, then supervises them until
+        they all exit or :meth:`close` is called. Clusters that crash are
+        restarted, see ``max_restarts``.
+        """
+        if self.shard_count is None or self.max_concurrency is None:
+            await self._fetch_gateway()
+        self._split_shards()
+        await self._serve()
+
+        for cluster_id in self.cluster_shards:
+            self._spawn(cluster_id)
+
+        loop = asyncio.get_running_loop()
+        while not self._closed and (self._processes or self._restart_at):
+            await asyncio.sleep(SUPERVISE_INTERVAL)
+            if not self._closed:
+                self._supervise(loop.time())
+
+    def _supervise(self, now: float) -> None:
+        for cluster_id, process in list(self._processes.items()):
+            if process.exitcode is None:
+                continue
+            del self._processes[cluster_id]
+            if process.exitcode == 0:
+                _log.info("Cluster %s exited.", cluster_id)
+                continue
+
+            if now - self._started_at[cluster_id] >= RESTART_RESET_AFTER:
+                self._crashes[cluster_id] = 0
+            crashes = self._crashes.get(cluster_id, 0)
+            if self.max_restarts is not None and crashes >= self.max_restarts:
+                _log.error(
+                    "Cluster %s exited with code %s after %s restarts in a row,"
+                    " giving up on it.",
+                    cluster_id,
+                    process.exitcode,
+                    crashes,
+                )
+                continue
+
+            delay = min(RESTART_DELAY * 2**crashes, RESTART_MAX_DELAY)
+            self._crashes[cluster_id] = crashes + 1
+            self._restart_at[cluster_id] = now + delay
+            _log.warning(
+                "Cluster %s exited with code %s. Restarting in %.1f seconds...",
+                cluster_id,
+                process.exitcode,
+                delay,
+            )
+
+        for cluster_id, when in list(self._restart_at.items()):
+            if when <= now:
+                del self._restart_at[cluster_id]
+                self._spawn(cluster_id)
+
+    async def close(self) -> None:
+        """|coro|
+
+        Stops every cluster and the IPC server.
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+        self._restart_at.clear()
+        loop = asyncio.get_running_loop()
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self._processes.values():
+            await loop.run_in_executor(None, process.join, 10.0)
+        self._processes.clear()
+
+        for peer in list(self._peers.values()):
+            peer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def run(self) -> None:
+        """A blocking call that runs :meth:`start` in a new event loop and
+        stops the clusters on exit.
+        """
+
+        async def runner() -> None:
+            try:
+                await self.start()
+            finally:
+                await self.close()
+
+        try:
+            asyncio.run(runner())
+        except KeyboardInterrupt:
+            _log.info("Received signal to terminate the clusters.")
+
+
+class Cluster:
+    """The IPC channel of a cluster started by :class:`ClusterManager`.
+
+    It is available as the ``cluster`` attribute of the client of every
+    cluster. The cluster takes over :meth:`Client.before_identify_hook`, so
+    that IDENTIFYs are coordinated with the other clusters.
+
+    Messages sent through :meth:`broadcast` dispatch the
+    :func:`on_cluster_message` event.
+
+    .. versionadded:: 2.6
+
+    Parameters
+    ----------
+    allow_eval: :class:`bool`
+        Whether this cluster evaluates the expressions sent with
+        :meth:`ClusterManager.broadcast_eval`. Defaults to ``False``. The
+        clusters started by a :class:`ClusterManager` use its ``allow_eval``.
+
+    Attributes
+    ----------
+    client: :class:`AutoShardedClient`
+        The client of this cluster.
+    id: :class:`int`
+        The ID of this cluster.
+    count: :class:`int`
+        The total number of clusters.
+    shard_ids: List[:class:`int`]
+        The shard IDs handled by this cluster.
+    shard_count: :class:`int`
+        The total number of shards.
+    """
+
+    def __init__(
+        self,
+        client: AutoShardedClient,
+        *,
+        cluster_id: int,
+        cluster_count: int,
+        shard_ids: list[int],
+        shard_count: int,
+        allow_eval: bool = False,
+    ) -> None:
+        self.client: AutoShardedClient = client
+        self.id: int = cluster_id
+        self.count: int = cluster_count
+        self.shard_ids: list[int] = shard_ids
+        self.shard_count: int = shard_count
+        self.allow_eval: bool = allow_eval
+        self._peer: _Peer | None = None
+        self._task: asyncio.Task[None] | None = None
+
+        client.cluster = self  # type: ignore
+        client._hooks["before_identify"] = self._before_identify
+
+    def __repr__(self) -> str:
+        return f"<Cluster id={self.id} count={self.count} shard_ids={self.shard_ids}>"
+
+    async def connect(self, host: str, port: int, secret: str) -> None:
+        """|coro|
+
+        Connects to the IPC server of the :class:`ClusterManager`. This is done
+        for you in the processes started by the manager.
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        self._peer = peer = _Peer(reader, writer, self._handle)
+        await peer.send(
+            {
+                "op": "hello",
+                "nonce": 0,
+                "d": {"cluster_id": self.id, "secret": secret},
+            }
+        )
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        await self._peer.run()  # type: ignore
+        if not self.client.is_closed():
+            _log.warning("Lost the connection to the cluster manager, closing.")
+            await self.client.close()
+
+    async def close(self) -> None:
+        """|coro|
+
+        Closes the IPC connection.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._peer is not None:
+            self._peer.close()
+            self._peer = None
+
+    async def _request(self, op: str, data: Any = None, **kwargs: Any) -> Any:
+        if self._peer is None:
+            raise ClientException("This cluster is not connected.")
+        return await self._peer.request(op, data, **kwargs)
+
+    async def _before_identify(
+        self, shard_id: int | None, *, initial: bool = False
+    ) -> None:
+        await self._request("identify", {"shard_id": shard_id or 0})
+
+    async def _handle(self, op: str, data: Any) -> Any:
+        if op == "eval":
+            if not self.allow_eval:
+                raise ClientException("This cluster does not allow eval.")
+            namespace = {"client": self.client, "cluster": self}
+            result = eval(compile(data["code"], "<cluster>", "eval"), namespace)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        if op == "stats":
+            return {
+                "guilds": len(self.client.guilds),
+                "latencies": self.client.latencies,
+            }
+        if op == "message":
+            self.client.dispatch("cluster_message", data["name"], data["data"])
+            return None
+        raise ClientException(f"Unknown IPC operation {op!r}.")
+
+    async def broadcast_eval(self, code: str) -> list[Any]:
+        """|coro|
+
+        Evaluates a Python expression in every cluster, including this one.
+        This requires ``allow_eval`` to be enabled, see
+        :meth:`ClusterManager.broadcast_eval`.
+        """
+        return await self._request("broadcast_eval", {"code": code})
+
+    async def broadcast(self, name: str, data: Any = None) -> None:
+        """|coro|
+
+        Sends a message to every cluster, including this one, which is
+        received through :func:`on_cluster_message`.
+        """
+        await self._request("broadcast", {"name": name, "data": data})
+
+    async def fetch_guild_count(self) -> int:
+        """|coro|
+
+        Returns the number of guilds across all clusters.
+        """
+        return sum(stats["guilds"] for stats in await self._request("stats"))
+
+    async def fetch_latencies(self) -> list[tuple[int, float]]:
+        """|coro|
+
+        Returns the latency of every shard across all clusters.
+
+        This returns a list of tuples with elements ``(shard_id, latency)``,
+        like :attr:`AutoShardedClient.latencies`.
+        """
+        return sorted(
+            (shard_id, latency)
+            for stats in await self._request("stats")
+            for shard_id, latency in stats["latencies"]
+        )
+
+
+def _run_cluster(
+    factory: Callable[..., AutoShardedClient], token: str, info: dict[str, Any]
+) -> None:
+    async def runner() -> None:
+        # let the client close cleanly when the manager terminates us
+        task = asyncio.current_task()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+        client = factory(shard_ids=info["shard_ids"], shard_count=info["shard_count"])
+        cluster = Cluster(
+            client,
+            cluster_id=info["cluster_id"],
+            cluster_count=info["cluster_count"],
+            shard_ids=info["shard_ids"],
+            shard_count=info["shard_count"],
+            allow_eval=info["allow_eval"],
+        )
+        try:
+            await cluster.connect(info["host"], info["port"], info["secret"])
+            await client.start(token)
+        finally:
+            if not client.is_closed():
+                await client.close()
+            await cluster.close()
+
+    try:
+        asyncio.run(runner())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
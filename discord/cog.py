@@ -755,6 +755,7 @@ class CogMixin:
 
             for index in reversed(remove):
                 del event_list[index]
+        self._handler_tables.clear()
 
     def _call_module_finalizers(self, lib: types.ModuleType, key: str) -> None:
         try:
@@ -0,0 +1,258 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+from collections import defaultdict, deque
+from typing import Any, Callable, Literal, Mapping
+
+__all__ = (
+    "DispatchLimits",
+    "DispatchStats",
+)
+
+_log = logging.getLogger(__name__)
+
+OverflowPolicy = Literal["queue", "drop_oldest", "drop_newest"]
+
+
+class DispatchLimits:
+    """Bounds how many event handlers may run at the same time.
+
+    Handlers that cannot start because a limit is reached wait in a queue
+    and are started, oldest first, as soon as running handlers finish. This
+    can be passed to :class:`Client` through the ``dispatch_limits``
+    parameter, and :attr:`Client.dispatch_stats` reports the current state.
+
+    A limit applies to handler calls, or to whole events if the
+    ``event_workers`` parameter of :class:`Client` is used. Handlers of
+    :meth:`Client.wait_for` are not limited.
+
+    .. versionadded:: 2.6
+
+    Attributes
+    ----------
+    max_concurrency: Optional[:class:`int`]
+        The maximum number of handlers running at the same time across all
+        events. ``None`` means no limit.
+    per_event: Dict[:class:`str`, :class:`int`]
+        The maximum number of handlers running at the same time for specific
+        events, keyed by event name without the ``on_`` prefix, e.g.
+        ``{"message": 50}``.
+    max_queue: Optional[:class:`int`]
+        The maximum number of waiting handlers across all events. Only used
+        by the ``drop_oldest`` and ``drop_newest`` policies.
+    overflow: :class:`str`
+        What to do when ``max_queue`` is reached. ``"queue"`` keeps queueing
+        without a bound, ``"drop_oldest"`` drops the handler that has waited
+        the longest and ``"drop_newest"`` drops the new handler.
+    """
+
+    __slots__ = (
+        "max_concurrency",
+        "per_event",
+        "max_queue",
+        "overflow",
+    )
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int | None = None,
+        per_event: Mapping[str, int] | None = None,
+        max_queue: int | None = None,
+        overflow: OverflowPolicy = "queue",
+    ) -> None:
+        if overflow not in ("queue", "drop_oldest", "drop_newest"):
+            raise ValueError(
+                "overflow must be one of 'queue', 'drop_oldest' or 'drop_newest'"
+            )
+        if overflow != "queue" and max_queue is None:
+            raise ValueError(f"the {overflow!r} policy requires a max_queue")
+        if max_queue is not None and max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        per_event = dict(per_event or {})
+        for event, limit in per_event.items():
+            if limit < 1:
+                raise ValueError(f"the limit of the {event!r} event must be at least 1")
+
+        self.max_concurrency: int | None = max_concurrency
+        self.per_event: dict[str, int] = per_event
+        self.max_queue: int | None = max_queue
+        self.overflow: OverflowPolicy = overflow
+
+    def __repr__(self) -> str:
+        return (
+            f"<DispatchLimits max_concurrency={self.max_concurrency}"
+            f" per_event={self.per_event} max_queue={self.max_queue}"
+            f" overflow={self.overflow!r}>"
+        )
+
+
+class DispatchStats:
+    """A snapshot of the event handlers limited by :class:`DispatchLimits`.
+
+    .. versionadded:: 2.6
+
+    Attributes
+    ----------
+    running: :class:`int`
+        The number of handlers currently running.
+    queued: :class:`int`
+        The number of handlers waiting to start.
+    queued_by_event: Dict[:class:`str`, :class:`int`]
+        The number of handlers waiting to start by event name.
+    dropped: Dict[:class:`str`, :class:`int`]
+        The number of handlers dropped so far by event name.
+    """
+
+    __slots__ = (
+        "running",
+        "queued",
+        "queued_by_event",
+        "dropped",
+    )
+
+    def __init__(
+        self,
+        *,
+        running: int,
+        queued: int,
+        queued_by_event: dict[str, int],
+        dropped: dict[str, int],
+    ) -> None:
+        self.running: int = running
+        self.queued: int = queued
+        self.queued_by_event: dict[str, int] = queued_by_event
+        self.dropped: dict[str, int] = dropped
+
+    def __repr__(self) -> str:
+        return (
+            f"<DispatchStats running={self.running} queued={self.queued}"
+            f" dropped={sum(self.dropped.values())}>"
+        )
+
+
+class _EventLimiter:
+    """Admits event handlers according to :class:`DispatchLimits`.
+
+    ``start`` is called with the event and job of every admitted handler,
+    and :meth:`done` must be called with the event once it finished.
+    """
+
+    def __init__(
+        self, limits: DispatchLimits, start: Callable[[str, Any], None]
+    ) -> None:
+        self.limits: DispatchLimits = limits
+        self._start: Callable[[str, Any], None] = start
+        self._per_event: dict[str, int] = {
+            f"on_{event}": limit for event, limit in limits.per_event.items()
+        }
+        self._counter = itertools.count()
+        self.running: int = 0
+        self.running_by_event: defaultdict[str, int] = defaultdict(int)
+        # event -> (sequence, job), oldest first
+        self.pending: dict[str, deque[tuple[int, Any]]] = {}
+        self.queued: int = 0
+        self.dropped: defaultdict[str, int] = defaultdict(int)
+
+    def _can_run(self, event: str) -> bool:
+        max_concurrency = self.limits.max_concurrency
+        if max_concurrency is not None and self.running >= max_concurrency:
+            return False
+        limit = self._per_event.get(event)
+        return limit is None or self.running_by_event[event] < limit
+
+    def _run(self, event: str, job: Any) -> None:
+        self.running += 1
+        self.running_by_event[event] += 1
+        self._start(event, job)
+
+    def submit(self, event: str, job: Any) -> None:
+        # jobs of an event never overtake the ones already waiting
+        if event not in self.pending and self._can_run(event):
+            self._run(event, job)
+            return
+
+        limits = self.limits
+        if limits.max_queue is not None and self.queued >= limits.max_queue:
+            if limits.overflow == "drop_newest":
+                self._drop(event)
+                return
+            if limits.overflow == "drop_oldest":
+                self._drop(self._pop_oldest(any_event=True)[0])
+
+        self.pending.setdefault(event, deque()).append((next(self._counter), job))
+        self.queued += 1
+
+    def _drop(self, event: str) -> None:
+        self.dropped[event] += 1
+        _log.debug("Dropped a handler for %s, the dispatch queue is full.", event)
+
+    def _pop_oldest(self, *, any_event: bool = False) -> tuple[str, Any]:
+        oldest = None
+        for event, jobs in self.pending.items():
+            if (any_event or self._can_run(event)) and (
+                oldest is None or jobs[0][0] < self.pending[oldest][0][0]
+            ):
+                oldest = event
+        if oldest is None:
+            raise LookupError
+
+        jobs = self.pending[oldest]
+        _, job = jobs.popleft()
+        if not jobs:
+            del self.pending[oldest]
+        self.queued -= 1
+        return oldest, job
+
+    def done(self, event: str) -> None:
+        self.running -= 1
+        self.running_by_event[event] -= 1
+        while self.queued:
+            try:
+                event, job = self._pop_oldest()
+            except LookupError:
+                break
+            self._run(event, job)
+
+    def clear(self) -> None:
+        # drops the jobs that were never admitted, the running ones still
+        # have to call done()
+        self.pending.clear()
+        self.queued = 0
+
+    def stats(self) -> DispatchStats:
+        return DispatchStats(
+            running=self.running,
+            queued=self.queued,
+            queued_by_event={
+                event[3:]: len(jobs) for event, jobs in self.pending.items()
+            },
+            dropped={event[3:]: count for event, count in self.dropped.items()},
+        )
@@ -344,6 +344,8 @@ class BotBase(GroupMixin, discord.cog.CogMixin):
         """
         if ctx.command is not None:
             self.dispatch("command", ctx)
+            if ctx.guild is not None and self._connection._lazy_chunking:
+                self._connection._chunk_lazily(ctx.guild)
             try:
                 if await self.can_run(ctx, call_once=True):
                     await ctx.command.invoke(ctx)
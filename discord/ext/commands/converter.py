@@ -189,6 +189,10 @@ class MemberConverter(IDConverter[discord.Member]):
     .. versionchanged:: 1.5.1
         This converter now lazily fetches members from the gateway and HTTP APIs,
         optionally caching the result if :attr:`.MemberCacheFlags.joined` is enabled.
+
+    .. versionchanged:: 2.6
+        Name lookups use the member name index instead of scanning every member
+        if :attr:`~discord.CachePolicy.index_member_names` is enabled.
     """
 
     async def query_member_named(self, guild, argument):
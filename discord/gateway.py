@@ -28,6 +28,7 @@ from __future__ import annotations
 import asyncio
 import concurrent.futures
 import logging
+import re
 import struct
 import sys
 import threading
@@ -43,6 +44,15 @@ from .activity import BaseActivity
 from .enums import SpeakingState
 from .errors import ConnectionClosed, InvalidArgument
 
+has_zstd: bool
+
+try:
+    import zstandard  # type: ignore
+
+    has_zstd = True
+except ImportError:
+    has_zstd = False
+
 _log = logging.getLogger(__name__)
 
 __all__ = (
@@ -70,6 +80,69 @@ class WebSocketClosure(Exception):
 EventListener = namedtuple("EventListener", "predicate event result future")
 
 
+class _ZlibStreamDecompressor:
+    SUFFIX = b"\x00\x00\xff\xff"
+
+    def __init__(self):
+        self._inflator = zlib.decompressobj()
+        self._buffer = bytearray()
+
+    def decompress(self, data):
+        # Returns the inflated payload as bytes, or None if the message
+        # is split across several frames and is not complete yet.
+        if data[-4:] != self.SUFFIX:
+            self._buffer.extend(data)
+            return None
+
+        if not self._buffer:
+            # the common case of a message sent in a single frame does not
+            # need to be copied into the buffer at all
+            return self._inflator.decompress(data)
+
+        buffer = self._buffer
+        buffer.extend(data)
+        try:
+            return self._inflator.decompress(buffer)
+        finally:
+            # reset in place so the buffer's allocation can be reused
+            del buffer[:]
+
+
+class _ZstdStreamDecompressor:
+    def __init__(self):
+        self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data):
+        # zstd-stream flushes a complete payload per message
+        return self._decompressor.decompress(data)
+
+
+_DECOMPRESSORS = {
+    "zlib-stream": _ZlibStreamDecompressor,
+    "zstd-stream": _ZstdStreamDecompressor,
+}
+
+# The top level keys of a payload can only be told apart from the keys of "d"
+# before the first "d" key, since nothing is nested before it, or after the
+# object closing "d" at the very end of the payload. The latter is only peeked
+# at within the last _PEEK_TAIL characters, anything else is fully parsed.
+_PEEK_TAIL = 128
+_PEEK_PATTERNS = {
+    bytes: (
+        b'"d":',
+        re.compile(rb'"t":"([A-Z_]+)"'),
+        re.compile(rb'"s":(\d+)'),
+        re.compile(rb'[}\]]((?:,"[a-z]+":(?:"[A-Za-z0-9_]*"|\d+|null))+)}$'),
+    ),
+    str: (
+        '"d":',
+        re.compile(r'"t":"([A-Z_]+)"'),
+        re.compile(r'"s":(\d+)'),
+        re.compile(r'[}\]]((?:,"[a-z]+":(?:"[A-Za-z0-9_]*"|\d+|null))+)}$'),
+    ),
+}
+
+
 class GatewayRatelimiter:
     def __init__(self, count=110, per=60.0):
         # The default is 110 to give room for at least 10 heartbeats per minute
@@ -301,8 +374,8 @@ class DiscordWebSocket:
         self.session_id = None
         self.sequence = None
         self.resume_gateway_url = None
-        self._zlib = zlib.decompressobj()
-        self._buffer = bytearray()
+        self._decompressor = _ZlibStreamDecompressor()
+        self._skip_unhandled_events = False
         self._close_code = None
         self._rate_limiter = GatewayRatelimiter()
 
@@ -314,6 +387,8 @@ class DiscordWebSocket:
         return self._rate_limiter.is_ratelimited()
 
     def debug_log_receive(self, data, /):
+        if type(data) is bytes:
+            data = data.decode("utf-8")
         self._dispatch("socket_raw_receive", data)
 
     def log_receive(self, _, /):
@@ -335,9 +410,11 @@ class DiscordWebSocket:
 
         This is for internal use only.
         """
-        gateway = gateway or await client.http.get_gateway()
+        compression = client._connection.gateway_compression
+        gateway = gateway or await client.http.get_gateway(compression=compression)
         socket = await client.http.ws_connect(gateway)
         ws = cls(socket, loop=client.loop)
+        ws._decompressor = _DECOMPRESSORS[compression]()
 
         # dynamically add attributes needed
         ws.token = client.http.token
@@ -357,6 +434,8 @@ class DiscordWebSocket:
         if client._enable_debug_events:
             ws.send = ws.debug_send
             ws.log_receive = ws.debug_log_receive
+        else:
+            ws._skip_unhandled_events = client._connection.skip_unhandled_events
 
         client._connection._update_references(ws)
 
@@ -453,13 +532,13 @@ class DiscordWebSocket:
 
     async def received_message(self, msg, /):
         if type(msg) is bytes:
-            self._buffer.extend(msg)
-
-            if len(msg) < 4 or msg[-4:] != b"\x00\x00\xff\xff":
+            # the JSON decoder accepts the UTF-8 bytes as they are
+            msg = self._decompressor.decompress(msg)
+            if msg is None:
                 return
-            msg = self._zlib.decompress(self._buffer)
-            msg = msg.decode("utf-8")
-            self._buffer = bytearray()
+
+        if self._skip_unhandled_events and self._skip_dispatch(msg):
+            return
 
         self.log_receive(msg)
         msg = utils._from_json(msg)
@@ -579,6 +658,42 @@ class DiscordWebSocket:
         for index in reversed(removed):
             del self._dispatch_listeners[index]
 
+    def _skip_dispatch(self, msg, /):
+        # Peeks at the event type of a raw DISPATCH payload and, if nothing
+        # needs the event, only tracks its sequence instead of decoding it.
+        data_key, event_pattern, seq_pattern, tail_pattern = _PEEK_PATTERNS[type(msg)]
+        end = msg.find(data_key)
+        if end == -1:
+            return False
+
+        event = event_pattern.search(msg, 0, end)
+        seq = seq_pattern.search(msg, 0, end)
+        if event is None or seq is None:
+            tail = tail_pattern.search(msg, max(end, len(msg) - _PEEK_TAIL))
+            if tail is None:
+                return False
+            tail = tail.group(1)
+            event = event or event_pattern.search(tail)
+            seq = seq or seq_pattern.search(tail)
+            if event is None or seq is None:
+                return False
+
+        event = event.group(1)
+        if type(event) is bytes:
+            event = event.decode("ascii")
+
+        if not self._connection._is_event_skippable(event) or any(
+            entry.event == event for entry in self._dispatch_listeners
+        ):
+            return False
+
+        self.sequence = int(seq.group(1))
+        if self._keep_alive:
+            self._keep_alive.tick()
+
+        self._dispatch("socket_event_type", event)
+        return True
+
     @property
     def latency(self) -> float:
         """Measures latency between a HEARTBEAT and a HEARTBEAT_ACK in seconds."""
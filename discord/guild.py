@@ -31,6 +31,8 @@ from typing import (
     TYPE_CHECKING,
     Any,
     ClassVar,
+    Iterable,
+    Iterator,
     List,
     Literal,
     NamedTuple,
@@ -92,6 +94,7 @@ if TYPE_CHECKING:
     import datetime
 
     from .abc import Snowflake, SnowflakeTime
+    from .cache import MemberNameIndex
     from .channel import (
         CategoryChannel,
         ForumChannel,
@@ -264,6 +267,8 @@ class Guild(Hashable):
         "nsfw_level",
         "_scheduled_events",
         "_members",
+        "_role_members",
+        "_name_index",
         "_channels",
         "_icon",
         "_banner",
@@ -299,7 +304,15 @@ class Guild(Hashable):
         # of the attr in __slots__
 
         self._channels: dict[int, GuildChannel] = {}
-        self._members: dict[int, Member] = {}
+        self._members: dict[int, Member] = state._create_member_cache(self)
+        # role ID -> IDs of the cached members with that role, compact member
+        # stores answer these lookups themselves
+        self._role_members: dict[int, set[int]] | None = (
+            None if hasattr(self._members, "with_role") else {}
+        )
+        self._name_index: MemberNameIndex | None = state._create_member_name_index(
+            int(data["id"])
+        )
         self._scheduled_events: dict[int, ScheduledEvent] = {}
         self._voice_states: dict[int, VoiceState] = {}
         self._threads: dict[int, Thread] = {}
@@ -316,7 +329,67 @@ class Guild(Hashable):
         return self._voice_states.get(user_id)
 
     def _add_member(self, member: Member, /) -> None:
+        index = self._role_members
+        if index is not None:
+            old = self._members.get(member.id)
+            if old is not None and old is not member:
+                self._unindex_roles(member.id, old._roles)
+            for role_id in member._roles:
+                index.setdefault(role_id, set()).add(member.id)
         self._members[member.id] = member
+        if self._name_index is not None:
+            self._name_index.add(
+                member.id, member.name, member.global_name, member.nick
+            )
+
+    def _update_member_name(self, member: Member, /) -> None:
+        # like the roles, only the cached member object is indexed
+        name_index = self._name_index
+        if name_index is None or member.id not in name_index:
+            return
+        if self._members.get(member.id) is member:
+            name_index.add(member.id, member.name, member.global_name, member.nick)
+
+    def _unindex_roles(self, member_id: int, role_ids: Iterable[int], /) -> None:
+        index = self._role_members
+        for role_id in role_ids:
+            member_ids = index.get(role_id)  # type: ignore
+            if member_ids is not None:
+                member_ids.discard(member_id)
+                if not member_ids:
+                    del index[role_id]  # type: ignore
+
+    def _update_member_roles(self, member: Member, old_roles: Iterable[int], /) -> None:
+        # only the cached member object is indexed, copies and partial
+        # members built from payloads must not touch the index
+        index = self._role_members
+        if index is None or self._members.get(member.id) is not member:
+            return
+        self._unindex_roles(member.id, old_roles)
+        for role_id in member._roles:
+            index.setdefault(role_id, set()).add(member.id)
+
+    def _members_with_role(self, role_id: int, /) -> list[Member]:
+        index = self._role_members
+        if index is None:
+            return self._members.with_role(role_id)  # type: ignore
+        member_ids = index.get(role_id)
+        if not member_ids:
+            return []
+
+        members = self._members
+        result = []
+        stale = []
+        for member_id in member_ids:
+            member = members.get(member_id)
+            # members may lose the role without going through _update_member_roles
+            if member is None or not member._roles.has(role_id):
+                stale.append(member_id)
+            else:
+                result.append(member)
+        for member_id in stale:
+            member_ids.discard(member_id)
+        return result
 
     def _get_and_update_member(
         self, payload: MemberPayload, user_id: int, cache_flag: bool, /
@@ -333,7 +406,7 @@ class Guild(Hashable):
             # class will be incorrect such as status and activities.
             member = Member(guild=self, state=self._state, data=payload)  # type: ignore
             if cache_flag:
-                self._members[user_id] = member
+                self._add_member(member)
         return member
 
     def _store_thread(self, payload: ThreadPayload, /) -> Thread:
@@ -342,7 +415,18 @@ class Guild(Hashable):
         return thread
 
     def _remove_member(self, member: Snowflake, /) -> None:
-        self._members.pop(member.id, None)
+        removed = self._members.pop(member.id, None)
+        if removed is not None and self._role_members is not None:
+            self._unindex_roles(member.id, removed._roles)
+        if self._name_index is not None:
+            self._name_index.remove(member.id)
+
+    def _evict_member(self, member: Member, /) -> None:
+        # called by a bounded member cache for every member it drops
+        if self._role_members is not None:
+            self._unindex_roles(member.id, member._roles)
+        if self._name_index is not None:
+            self._name_index.remove(member.id)
 
     def _add_scheduled_event(self, event: ScheduledEvent, /) -> None:
         self._scheduled_events[event.id] = event
@@ -434,6 +518,8 @@ class Guild(Hashable):
     def _remove_role(self, role_id: int, /) -> Role:
         # this raises KeyError if it fails.
         role = self._roles.pop(role_id)
+        if self._role_members is not None:
+            self._role_members.pop(role_id, None)
 
         # since it didn't, we can change the positions now
         # basically the same as above except we only decrement
@@ -841,7 +927,14 @@ class Guild(Hashable):
 
     @property
     def members(self) -> list[Member]:
-        """A list of members that belong to this guild."""
+        """A list of members that belong to this guild.
+
+        .. versionchanged:: 2.6
+            If the ``lazy_chunking`` parameter of :class:`Client` is enabled, this
+            starts chunking the guild in the background if it is not chunked yet.
+        """
+        if self._state._lazy_chunking:
+            self._state._chunk_lazily(self)
         return list(self._members.values())
 
     def get_member(self, user_id: int, /) -> Member | None:
@@ -1053,7 +1146,11 @@ class Guild(Hashable):
             then ``None`` is returned.
         """
 
-        result = None
+        if self._name_index is not None:
+            if self._state._lazy_chunking:
+                self._state._chunk_lazily(self)
+            return self._get_member_named_indexed(name)
+
         members = self.members
         if len(name) > 5 and name[-5] == "#":
             # The 5 length is checking to see if #0000 is in the string,
@@ -1071,6 +1168,78 @@ class Guild(Hashable):
 
         return utils.find(lambda m: name in (m.nick, m.name, m.global_name), members)
 
+    def _get_member_named_indexed(self, name: str) -> Member | None:
+        index: MemberNameIndex = self._name_index  # type: ignore
+        members = self._members
+
+        def candidates(lookup: str) -> Iterator[Member]:
+            for member_id in index.get(lookup):
+                member = members.get(member_id)
+                if member is not None:
+                    yield member
+
+        if len(name) > 5 and name[-5] == "#":
+            username, discriminator = name[:-5], name[-4:]
+            for member in candidates(username):
+                if member.name == username and member.discriminator == discriminator:
+                    return member
+
+        for member in candidates(name):
+            if name in (member.nick, member.name, member.global_name):
+                return member
+        return None
+
+    def search_members(self, prefix: str, /, *, limit: int | None = 25) -> list[Member]:
+        """Returns the cached members whose username, global name or nickname
+        starts with ``prefix``, ignoring case.
+
+        This is meant for things like autocomplete, it only looks at the member
+        cache and does not query Discord. It is fast if
+        :attr:`CachePolicy.index_member_names` is enabled, and otherwise scans
+        every cached member.
+
+        .. versionadded:: 2.6
+
+        Parameters
+        ----------
+        prefix: :class:`str`
+            The start of the name to look for.
+        limit: Optional[:class:`int`]
+            The maximum number of members to return. ``None`` returns every match.
+
+        Returns
+        -------
+        List[:class:`Member`]
+            The matching members.
+        """
+        if limit is not None and limit <= 0:
+            return []
+
+        index = self._name_index
+        if index is not None:
+            members = self._members
+            result = []
+            for member_id in index.search(prefix):
+                member = members.get(member_id)
+                if member is not None:
+                    result.append(member)
+                    if limit is not None and len(result) >= limit:
+                        break
+            return result
+
+        prefix = prefix.casefold()
+        result = []
+        for member in self._members.values():
+            if any(
+                name.casefold().startswith(prefix)
+                for name in (member.name, member.global_name, member.nick)
+                if name
+            ):
+                result.append(member)
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
     def _create_channel(
         self,
         name: str,
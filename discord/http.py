@@ -26,15 +26,21 @@ DEALINGS IN THE SOFTWARE.
 from __future__ import annotations
 
 import asyncio
+import copy
 import logging
+import mmap
+import os
+import struct
 import sys
-import weakref
+import time
+from collections import deque
 from typing import TYPE_CHECKING, Any, Coroutine, Iterable, Sequence, TypeVar
 from urllib.parse import quote as _uriquote
 
 import aiohttp
 
 from . import __version__, utils
+from .cache import LRUCache
 from .errors import (
     DiscordServerError,
     Forbidden,
@@ -45,13 +51,12 @@ from .errors import (
     NotFound,
 )
 from .gateway import DiscordClientWebSocketResponse
+from .metrics import HTTPRecorder
 from .utils import MISSING, warn_deprecated
 
 _log = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
-    from types import TracebackType
-
     from .enums import AuditLogAction, InteractionResponseType
     from .file import File
     from .types import (
@@ -63,6 +68,7 @@ if TYPE_CHECKING:
         components,
         embed,
         emoji,
+        gateway,
         guild,
         integration,
         interactions,
@@ -84,8 +90,6 @@ if TYPE_CHECKING:
     from .types.snowflake import Snowflake, SnowflakeList
 
     T = TypeVar("T")
-    BE = TypeVar("BE", bound=BaseException)
-    MU = TypeVar("MU", bound="MaybeUnlock")
     Response = Coroutine[Any, Any, T]
 
 API_VERSION: int = 10
@@ -132,26 +136,239 @@ class Route:
         # the bucket is just method + path w/ major parameters
         return f"{self.channel_id}:{self.guild_id}:{self.path}"
 
+    @property
+    def key(self) -> str:
+        # identifies the endpoint, which Discord maps to a bucket hash
+        return f"{self.method} {self.path}"
 
-class MaybeUnlock:
-    def __init__(self, lock: asyncio.Lock) -> None:
-        self.lock: asyncio.Lock = lock
-        self._unlock: bool = True
+    @property
+    def major_parameters(self) -> str:
+        return (
+            f"{self.channel_id}:{self.guild_id}:{self.webhook_id}:{self.webhook_token}"
+        )
 
-    def __enter__(self: MU) -> MU:
-        return self
 
-    def defer(self) -> None:
-        self._unlock = False
+class Ratelimit:
+    """Tracks a single rate limit bucket.
+
+    Up to ``remaining`` requests may be in flight at once. Until Discord has
+    told us the limit of the bucket, requests are sent one at a time.
+    """
+
+    __slots__ = (
+        "loop",
+        "limit",
+        "remaining",
+        "outgoing",
+        "reset_at",
+        "_waiters",
+    )
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop: asyncio.AbstractEventLoop = loop
+        self.limit: int = 1
+        self.remaining: int = 1
+        self.outgoing: int = 0
+        # loop time at which the current window resets, 0 if unknown
+        self.reset_at: float = 0.0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    def __repr__(self) -> str:
+        return (
+            f"<Ratelimit limit={self.limit} remaining={self.remaining}"
+            f" outgoing={self.outgoing}>"
+        )
+
+    def is_inactive(self) -> bool:
+        return (
+            not self.outgoing
+            and not self._waiters
+            and self.loop.time() >= self.reset_at
+        )
+
+    def _refresh(self) -> None:
+        if self.reset_at and self.loop.time() >= self.reset_at:
+            self.remaining = max(self.limit - self.outgoing, 0)
+            self.reset_at = 0.0
+
+    def _wake(self) -> None:
+        # wake as many waiters as there are free slots, or a single one to
+        # probe the bucket if its state is unknown
+        count = self.remaining or (not self.outgoing and not self.reset_at)
+        while count > 0 and self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                count -= 1
+
+    async def acquire(self) -> None:
+        while True:
+            self._refresh()
+            if self.remaining > 0:
+                self.remaining -= 1
+                self.outgoing += 1
+                return
+
+            delay = self.reset_at - self.loop.time() if self.reset_at else None
+            future = self.loop.create_future()
+            self._waiters.append(future)
+            try:
+                await asyncio.wait_for(future, timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                try:
+                    self._waiters.remove(future)
+                except ValueError:
+                    pass
+
+    def release(self) -> None:
+        self.outgoing -= 1
+        if self.outgoing == 0 and not self.reset_at:
+            # nothing told us about the bucket, allow the next probe
+            self.remaining = max(self.remaining, 1)
+        self._wake()
+
+    def update(self, response: aiohttp.ClientResponse, *, use_clock: bool) -> None:
+        headers = response.headers
+        try:
+            limit = int(headers["X-Ratelimit-Limit"])
+            remaining = int(headers["X-Ratelimit-Remaining"])
+        except (KeyError, ValueError):
+            return
+
+        delta = utils._parse_ratelimit_header(response, use_clock=use_clock)
+        reset_at = self.loop.time() + delta
+        if self.reset_at and reset_at <= self.reset_at + 0.05:
+            # same window, responses may arrive out of order
+            self.remaining = min(self.remaining, remaining)
+        else:
+            # a new window, account for the requests still in flight
+            self.remaining = max(remaining - (self.outgoing - 1), 0)
+
+        self.limit = limit
+        self.reset_at = reset_at
+        self._wake()
+
+    def block(self, delay: float) -> None:
+        self.remaining = 0
+        self.reset_at = max(self.reset_at, self.loop.time() + delay)
+
+
+class GlobalRatelimiter:
+    """A token bucket that shapes requests to stay under the global rate limit.
+
+    Bursts of up to ``rate`` requests are allowed, after which requests are
+    spread out evenly over ``per`` seconds.
+    """
+
+    def __init__(self, rate: int, per: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+
+        self.rate: int = rate
+        self.per: float = per
+        self._tokens: float = float(rate)
+        self._last: float = time.monotonic()
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last
+        self._last = now
+        self._tokens = min(self.rate, self._tokens + elapsed * self.rate / self.per)
+
+    async def acquire(self) -> None:
+        # the lock keeps waiters in FIFO order while they sleep
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
 
-    def __exit__(
-        self,
-        exc_type: type[BE] | None,
-        exc: BE | None,
-        traceback: TracebackType | None,
-    ) -> None:
-        if self._unlock:
-            self.lock.release()
+
+class SharedGlobalRatelimiter(GlobalRatelimiter):
+    """A :class:`GlobalRatelimiter` whose budget is shared between processes.
+
+    The processes coordinate through a small memory-mapped counter file
+    guarded by an advisory lock, so every process using the same bot token
+    should be given the same ``path``. This uses a fixed window of ``per``
+    seconds instead of a token bucket and is only available on Unix.
+    """
+
+    _STRUCT = struct.Struct("<qq")
+    _LOCK_RETRY = 0.001
+
+    def __init__(self, path: str, rate: int, per: float = 1.0) -> None:
+        try:
+            import fcntl
+        except ImportError:
+            raise RuntimeError(
+                "sharing the global rate limit between processes requires fcntl"
+            ) from None
+
+        super().__init__(rate, per)
+        self._flock = fcntl.flock
+        self._LOCK_EX = fcntl.LOCK_EX
+        self._LOCK_NB = fcntl.LOCK_NB
+        self._LOCK_UN = fcntl.LOCK_UN
+        self.path: str = path
+
+        self._fd: int = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._flock(self._fd, self._LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < self._STRUCT.size:
+                os.ftruncate(self._fd, self._STRUCT.size)
+        finally:
+            self._flock(self._fd, self._LOCK_UN)
+        self._map: mmap.mmap = mmap.mmap(self._fd, self._STRUCT.size)
+
+    def __del__(self) -> None:
+        try:
+            self._map.close()
+            os.close(self._fd)
+        except Exception:
+            pass
+
+    def _try_take(self) -> float:
+        # returns 0 if a slot was taken, else the seconds to wait before retrying
+        now = time.time()
+        window = int(now // self.per)
+        try:
+            # never block the event loop, another process only holds the
+            # lock for the few instructions below
+            self._flock(self._fd, self._LOCK_EX | self._LOCK_NB)
+        except BlockingIOError:
+            return self._LOCK_RETRY
+        try:
+            current, count = self._STRUCT.unpack_from(self._map)
+            if current != window:
+                current, count = window, 0
+            if count < self.rate:
+                self._STRUCT.pack_into(self._map, 0, current, count + 1)
+                return 0.0
+        finally:
+            self._flock(self._fd, self._LOCK_UN)
+        return (window + 1) * self.per - now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                delay = self._try_take()
+                if not delay:
+                    return
+                await asyncio.sleep(delay)
+
+
+class _InflightRequest:
+    __slots__ = ("task", "shared")
+
+    def __init__(self, task: asyncio.Future[Any]) -> None:
+        self.task: asyncio.Future[Any] = task
+        self.shared: bool = False
 
 
 # For some reason, the Discord voice websocket expects this header to be
@@ -170,13 +387,21 @@ class HTTPClient:
         proxy_auth: aiohttp.BasicAuth | None = None,
         loop: asyncio.AbstractEventLoop | None = None,
         unsync_clock: bool = True,
+        global_ratelimit: int | None = None,
+        global_ratelimit_file: str | None = None,
+        coalesce_requests: bool = False,
+        response_cache_ttl: float | None = None,
+        http_recorder: HTTPRecorder | None = None,
     ) -> None:
         self.loop: asyncio.AbstractEventLoop = (
             asyncio.get_event_loop() if loop is None else loop
         )
         self.connector = connector
         self.__session: aiohttp.ClientSession = MISSING  # filled in static_login
-        self._locks: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        # route key (method + path) -> X-Ratelimit-Bucket hash
+        self._bucket_hashes: dict[str, str] = {}
+        self._buckets: dict[str, Ratelimit] = {}
+        self._buckets_prune_at: int = 1024
         self._global_over: asyncio.Event = asyncio.Event()
         self._global_over.set()
         self.token: str | None = None
@@ -184,6 +409,25 @@ class HTTPClient:
         self.proxy: str | None = proxy
         self.proxy_auth: aiohttp.BasicAuth | None = proxy_auth
         self.use_clock: bool = not unsync_clock
+        self._global_limiter: GlobalRatelimiter | None = None
+        if global_ratelimit is not None:
+            if global_ratelimit_file is not None:
+                self._global_limiter = SharedGlobalRatelimiter(
+                    global_ratelimit_file, global_ratelimit
+                )
+            else:
+                self._global_limiter = GlobalRatelimiter(global_ratelimit)
+
+        # GET requests currently in flight, shared by identical callers
+        self._inflight: dict[tuple[Any, ...], _InflightRequest] | None = (
+            {} if coalesce_requests else None
+        )
+        self._response_cache: LRUCache[tuple[Any, ...], Any] | None = (
+            LRUCache(1024, expire_after=response_cache_ttl)
+            if response_cache_ttl
+            else None
+        )
+        self._recorder: HTTPRecorder | None = http_recorder
 
         user_agent = (
             "DiscordBot (https://pycord.dev, {0}) Python/{1[0]}.{1[1]} aiohttp/{2}"
@@ -222,15 +466,70 @@ class HTTPClient:
         form: Iterable[dict[str, Any]] | None = None,
         **kwargs: Any,
     ) -> Any:
-        bucket = route.bucket
+        if route.method == "GET" and not files and not form:
+            if self._inflight is not None or self._response_cache is not None:
+                return await self._coalesced_get(route, **kwargs)
+
+        return await self._request(route, files=files, form=form, **kwargs)
+
+    async def _coalesced_get(self, route: Route, **kwargs: Any) -> Any:
+        key = (route.url, *sorted((k, repr(v)) for k, v in kwargs.items()))
+        cache = self._response_cache
+        if cache is not None:
+            try:
+                return copy.deepcopy(cache[key])
+            except KeyError:
+                pass
+
+        inflight = self._inflight
+        if inflight is None:
+            data = await self._request(route, **kwargs)
+            if cache is not None:
+                cache[key] = copy.deepcopy(data)
+            return data
+
+        entry = inflight.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(self._request(route, **kwargs))
+            inflight[key] = entry = _InflightRequest(task)
+            task.add_done_callback(lambda t: self._finish_inflight(key, entry))
+        else:
+            entry.shared = True
+            _log.debug("Coalescing GET %s with a request in flight.", route.url)
+
+        # shielded so a cancelled caller does not cancel the others
+        data = await asyncio.shield(entry.task)
+        if entry.shared or cache is not None:
+            # the callers may mutate the payload, so each gets its own copy
+            return copy.deepcopy(data)
+        return data
+
+    def _finish_inflight(self, key: tuple[Any, ...], entry: _InflightRequest) -> None:
+        if self._inflight is not None and self._inflight.get(key) is entry:
+            del self._inflight[key]
+
+        task = entry.task
+        if task.cancelled():
+            return
+        # retrieve the exception so it is not reported if every caller is gone
+        if task.exception() is None and self._response_cache is not None:
+            self._response_cache[key] = task.result()
+
+    async def _request(
+        self,
+        route: Route,
+        *,
+        files: Sequence[File] | None = None,
+        form: Iterable[dict[str, Any]] | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        bucket, ratelimit = self._get_ratelimit(route)
         method = route.method
         url = route.url
-
-        lock = self._locks.get(bucket)
-        if lock is None:
-            lock = asyncio.Lock()
-            if bucket is not None:
-                self._locks[bucket] = lock
+        # interaction callbacks do not count against the global rate limit
+        global_limiter = (
+            None if route.path.startswith("/interactions/") else self._global_limiter
+        )
 
         # header creation
         headers: dict[str, str] = {
@@ -262,14 +561,25 @@ class HTTPClient:
         if self.proxy_auth is not None:
             kwargs["proxy_auth"] = self.proxy_auth
 
+        recorder = self._recorder
         if not self._global_over.is_set():
             # wait until the global lock is complete
-            await self._global_over.wait()
+            if recorder is not None:
+                start = time.perf_counter()
+                await self._global_over.wait()
+                recorder.record_global_wait(time.perf_counter() - start)
+            else:
+                await self._global_over.wait()
 
         response: aiohttp.ClientResponse | None = None
         data: dict[str, Any] | str | None = None
-        await lock.acquire()
-        with MaybeUnlock(lock) as maybe_lock:
+        if recorder is not None:
+            start = time.perf_counter()
+            await ratelimit.acquire()
+            recorder.record_bucket_wait(route.path, bucket, time.perf_counter() - start)
+        else:
+            await ratelimit.acquire()
+        try:
             for tries in range(5):
                 if files:
                     for f in files:
@@ -281,7 +591,17 @@ class HTTPClient:
                         form_data.add_field(**params)
                     kwargs["data"] = form_data
 
+                if global_limiter is not None:
+                    if recorder is not None:
+                        start = time.perf_counter()
+                        await global_limiter.acquire()
+                        recorder.record_global_wait(time.perf_counter() - start)
+                    else:
+                        await global_limiter.acquire()
+
                 try:
+                    if recorder is not None:
+                        start = time.perf_counter()
                     async with self.__session.request(
                         method, url, **kwargs
                     ) as response:
@@ -296,23 +616,32 @@ class HTTPClient:
                         # even errors have text involved in them so this is safe to call
                         data = await json_or_text(response)
 
-                        # check if we have rate limit header information
-                        remaining = response.headers.get("X-Ratelimit-Remaining")
-                        if remaining == "0" and response.status != 429:
-                            # we've depleted our current bucket
-                            delta = utils._parse_ratelimit_header(
-                                response, use_clock=self.use_clock
+                        if recorder is not None:
+                            body = kwargs.get("data")
+                            recorder.record_request(
+                                method,
+                                route.path,
+                                response.status,
+                                time.perf_counter() - start,
+                                (len(body) if isinstance(body, (str, bytes)) else 0),
+                                getattr(response.content, "total_bytes", 0),
                             )
+
+                        # check if we have rate limit header information
+                        bucket_hash = response.headers.get("X-Ratelimit-Bucket")
+                        if bucket_hash is not None:
+                            bucket = self._learn_bucket(route, bucket_hash, ratelimit)
+
+                        ratelimit.update(response, use_clock=self.use_clock)
+                        if ratelimit.remaining == 0 and response.status != 429:
                             _log.debug(
                                 (
                                     "A rate limit bucket has been exhausted (bucket:"
                                     " %s, retry: %s)."
                                 ),
                                 bucket,
-                                delta,
+                                ratelimit.reset_at - self.loop.time(),
                             )
-                            maybe_lock.defer()
-                            self.loop.call_later(delta, lock.release)
 
                         # the request was successful so just return the text/json
                         if 300 > response.status >= 200:
@@ -336,6 +665,11 @@ class HTTPClient:
 
                             # check if it's a global rate limit
                             is_global = data.get("global", False)
+                            if recorder is not None:
+                                recorder.record_ratelimited(
+                                    method, route.path, bucket, retry_after, is_global
+                                )
+                                recorder.record_retry(method, route.path, 429)
                             if is_global:
                                 _log.warning(
                                     (
@@ -345,6 +679,8 @@ class HTTPClient:
                                     retry_after,
                                 )
                                 self._global_over.clear()
+                            else:
+                                ratelimit.block(retry_after)
 
                             await asyncio.sleep(retry_after)
                             _log.debug("Done sleeping for the rate limit. Retrying...")
@@ -359,6 +695,10 @@ class HTTPClient:
 
                         # we've received a 500, 502, 503, or 504, unconditional retry
                         if response.status in {500, 502, 503, 504}:
+                            if recorder is not None:
+                                recorder.record_retry(
+                                    method, route.path, response.status
+                                )
                             await asyncio.sleep(1 + tries * 2)
                             continue
 
@@ -376,6 +716,8 @@ class HTTPClient:
                 except OSError as e:
                     # Connection reset by peer
                     if tries < 4 and e.errno in (54, 10054):
+                        if recorder is not None:
+                            recorder.record_retry(method, route.path, None)
                         await asyncio.sleep(1 + tries * 2)
                         continue
                     raise
@@ -388,6 +730,46 @@ class HTTPClient:
                 raise HTTPException(response, data)
 
             raise RuntimeError("Unreachable code in HTTP handling")
+        finally:
+            ratelimit.release()
+
+    def _get_ratelimit(self, route: Route) -> tuple[str, Ratelimit]:
+        bucket_hash = self._bucket_hashes.get(route.key)
+        if bucket_hash is None:
+            # until Discord tells us the bucket, guess it from the route
+            bucket = route.bucket
+        else:
+            bucket = f"{bucket_hash}:{route.major_parameters}"
+
+        try:
+            return bucket, self._buckets[bucket]
+        except KeyError:
+            pass
+
+        if len(self._buckets) >= self._buckets_prune_at:
+            self._prune_ratelimits()
+
+        self._buckets[bucket] = ratelimit = Ratelimit(self.loop)
+        return bucket, ratelimit
+
+    def _learn_bucket(
+        self, route: Route, bucket_hash: str, ratelimit: Ratelimit
+    ) -> str:
+        bucket = f"{bucket_hash}:{route.major_parameters}"
+        if self._bucket_hashes.get(route.key) != bucket_hash:
+            _log.debug("Route %s uses rate limit bucket %s.", route.key, bucket_hash)
+            self._bucket_hashes[route.key] = bucket_hash
+            # carry the state over, unless another route already shares it
+            self._buckets.setdefault(bucket, ratelimit)
+        return bucket
+
+    def _prune_ratelimits(self) -> None:
+        self._buckets = {
+            key: ratelimit
+            for key, ratelimit in self._buckets.items()
+            if not ratelimit.is_inactive()
+        }
+        self._buckets_prune_at = max(1024, len(self._buckets) * 2)
 
     async def get_from_cdn(self, url: str) -> bytes:
         async with self.__session.get(url) as resp:
@@ -2994,30 +3376,57 @@ class HTTPClient:
             )
         )
 
-    async def get_gateway(self, *, encoding: str = "json", zlib: bool = True) -> str:
+    async def get_gateway(
+        self,
+        *,
+        encoding: str = "json",
+        zlib: bool = True,
+        compression: str = "zlib-stream",
+    ) -> str:
         try:
             data = await self.request(Route("GET", "/gateway"))
         except HTTPException as exc:
             raise GatewayNotFound() from exc
         if zlib:
-            value = "{0}?encoding={1}&v={2}&compress=zlib-stream"
+            value = "{0}?encoding={1}&v={2}&compress={3}"
         else:
             value = "{0}?encoding={1}&v={2}"
-        return value.format(data["url"], encoding, API_VERSION)
+        return value.format(data["url"], encoding, API_VERSION, compression)
 
     async def get_bot_gateway(
-        self, *, encoding: str = "json", zlib: bool = True
+        self,
+        *,
+        encoding: str = "json",
+        zlib: bool = True,
+        compression: str = "zlib-stream",
     ) -> tuple[int, str]:
+        shard_count, url, _ = await self.get_bot_gateway_info(
+            encoding=encoding, zlib=zlib, compression=compression
+        )
+        return shard_count, url
+
+    async def get_bot_gateway_info(
+        self,
+        *,
+        encoding: str = "json",
+        zlib: bool = True,
+        compression: str = "zlib-stream",
+    ) -> tuple[int, str, gateway.SessionStartLimit]:
+        # like get_bot_gateway, with the session start limit
         try:
             data = await self.request(Route("GET", "/gateway/bot"))
         except HTTPException as exc:
             raise GatewayNotFound() from exc
 
         if zlib:
-            value = "{0}?encoding={1}&v={2}&compress=zlib-stream"
+            value = "{0}?encoding={1}&v={2}&compress={3}"
         else:
             value = "{0}?encoding={1}&v={2}"
-        return data["shards"], value.format(data["url"], encoding, API_VERSION)
+        return (
+            data["shards"],
+            value.format(data["url"], encoding, API_VERSION, compression),
+            data["session_start_limit"],
+        )
 
     def get_user(self, user_id: Snowflake) -> Response[user.User]:
         return self.request(Route("GET", "/users/{user_id}", user_id=user_id))
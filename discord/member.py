@@ -25,12 +25,25 @@ DEALINGS IN THE SOFTWARE.
 
 from __future__ import annotations
 
+import array
 import datetime
 import inspect
 import itertools
 import sys
+import weakref
+from collections import OrderedDict
 from operator import attrgetter
-from typing import TYPE_CHECKING, Any, Literal, TypeVar, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Collection,
+    Iterator,
+    Literal,
+    MutableMapping,
+    TypeVar,
+    Union,
+    ValuesView,
+)
 
 import discord.abc
 
@@ -276,6 +289,8 @@ class Member(discord.abc.Messageable, _UserTag):
         "_state",
         "_avatar",
         "communication_disabled_until",
+        # lets MemberStore hand out the same object while it is referenced
+        "__weakref__",
     )
 
     if TYPE_CHECKING:
@@ -356,8 +371,11 @@ class Member(discord.abc.Messageable, _UserTag):
     def _update_from_message(self, data: MemberPayload) -> None:
         self.joined_at = utils.parse_time(data.get("joined_at"))
         self.premium_since = utils.parse_time(data.get("premium_since"))
-        self._roles = utils.SnowflakeList(map(int, data["roles"]))
-        self.nick = data.get("nick", None)
+        self._set_roles(data["roles"])
+        nick = data.get("nick", None)
+        if nick != self.nick:
+            self.nick = nick
+            self.guild._update_member_name(self)
         self.pending = data.get("pending", False)
 
     @classmethod
@@ -402,13 +420,22 @@ class Member(discord.abc.Messageable, _UserTag):
         ch = await self.create_dm()
         return ch
 
+    def _set_roles(self, role_ids: list[str]) -> None:
+        old_roles = self._roles
+        self._roles = utils.SnowflakeList(map(int, role_ids))
+        self.guild._update_member_roles(self, old_roles)
+
     def _update(self, data: MemberPayload) -> None:
         # the nickname change is optional,
         # if it isn't in the payload then it didn't change
         try:
-            self.nick = data["nick"]
+            nick = data["nick"]
         except KeyError:
             pass
+        else:
+            if nick != self.nick:
+                self.nick = nick
+                self.guild._update_member_name(self)
 
         try:
             self.pending = data["pending"]
@@ -416,7 +443,7 @@ class Member(discord.abc.Messageable, _UserTag):
             pass
 
         self.premium_since = utils.parse_time(data.get("premium_since"))
-        self._roles = utils.SnowflakeList(map(int, data["roles"]))
+        self._set_roles(data["roles"])
         self._avatar = data.get("avatar")
         self.communication_disabled_until = utils.parse_time(
             data.get("communication_disabled_until")
@@ -455,6 +482,8 @@ class Member(discord.abc.Messageable, _UserTag):
                 u.global_name,
                 u._public_flags,
             ) = modified
+            if original[0] != u.name or original[3] != u.global_name:
+                self._state._reindex_member_names(u.id, u.name, u.global_name)
             # Signal to dispatch on_user_update
             return to_return, u
 
@@ -1088,3 +1117,294 @@ class Member(discord.abc.Messageable, _UserTag):
             The role or ``None`` if not found in the member's roles.
         """
         return self.guild.get_role(role_id) if self._roles.has(role_id) else None
+
+
+_NO_TIME = float("nan")
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _pack_time(value: datetime.datetime | None) -> float:
+    return _NO_TIME if value is None else (value - _EPOCH).total_seconds()
+
+
+def _unpack_time(value: float) -> datetime.datetime | None:
+    if value != value:  # NaN
+        return None
+    return _EPOCH + datetime.timedelta(seconds=value)
+
+
+class MemberStore(MutableMapping[int, Member]):
+    """A mapping of user IDs to members that stores them in packed columns.
+
+    Members are kept as rows of arrays and interned role lists instead of
+    :class:`Member` objects, which are only created when a member is looked
+    up. The ``hot`` most recently used members are kept as objects, so that
+    updates made to them are written back to their row once they are
+    evicted. Members in ``pinned`` are always kept as objects.
+
+    Looking up a member that is still referenced elsewhere returns that same
+    object, which is kept again so that the updates made to it while it was
+    evicted are written back as well.
+    """
+
+    __slots__ = (
+        "guild",
+        "hot",
+        "_state",
+        "_pinned",
+        "_hot",
+        "_live",
+        "_index",
+        "_ids",
+        "_joined_at",
+        "_premium_since",
+        "_timed_out_until",
+        "_pending",
+        "_nicks",
+        "_avatars",
+        "_roles",
+        "_names",
+        "_global_names",
+        "_user_avatars",
+        "_discriminators",
+        "_public_flags",
+        "_user_bits",
+        "_interned_roles",
+        "_presences",
+    )
+
+    # the columns holding one entry per row
+    _columns = (
+        "_ids",
+        "_joined_at",
+        "_premium_since",
+        "_timed_out_until",
+        "_pending",
+        "_nicks",
+        "_avatars",
+        "_roles",
+        "_names",
+        "_global_names",
+        "_user_avatars",
+        "_discriminators",
+        "_public_flags",
+        "_user_bits",
+    )
+
+    def __init__(
+        self,
+        guild: Guild,
+        state: ConnectionState,
+        *,
+        hot: int = 1024,
+        pinned: Collection[int] = (),
+    ) -> None:
+        self.guild: Guild = guild
+        self.hot: int = hot
+        self._state: ConnectionState = state
+        self._pinned: frozenset[int] = frozenset(pinned)
+        self._hot: OrderedDict[int, Member] = OrderedDict()
+        # every member object handed out that is still referenced
+        self._live: weakref.WeakValueDictionary[int, Member] = (
+            weakref.WeakValueDictionary()
+        )
+        self._index: dict[int, int] = {}
+        self._ids: array.array[int] = array.array("Q")
+        self._joined_at: array.array[float] = array.array("d")
+        self._premium_since: array.array[float] = array.array("d")
+        self._timed_out_until: array.array[float] = array.array("d")
+        self._pending: bytearray = bytearray()
+        self._nicks: list[str | None] = []
+        self._avatars: list[str | None] = []
+        self._roles: list[bytes] = []
+        self._names: list[str] = []
+        self._global_names: list[str | None] = []
+        self._user_avatars: list[str | None] = []
+        self._discriminators: list[str] = []
+        self._public_flags: array.array[int] = array.array("Q")
+        self._user_bits: bytearray = bytearray()
+        # packed role IDs -> the same bytes and their set, shared by all rows
+        self._interned_roles: dict[bytes, tuple[bytes, frozenset[int]]] = {}
+        # user ID -> (client status, activities), only for non-offline members
+        self._presences: dict[int, tuple[dict[str | None, str], tuple[Any, ...]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._index
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(list(self._index))
+
+    def __getitem__(self, user_id: int) -> Member:
+        try:
+            member = self._hot[user_id]
+        except KeyError:
+            member = self._peek(user_id, self._index[user_id])
+            self._keep(user_id, member)
+        else:
+            self._hot.move_to_end(user_id)
+        return member
+
+    def __setitem__(self, user_id: int, member: Member) -> None:
+        self._pack(user_id, member)
+        self._live[user_id] = member
+        self._keep(user_id, member)
+
+    def __delitem__(self, user_id: int) -> None:
+        row = self._index.pop(user_id)
+        self._hot.pop(user_id, None)
+        self._live.pop(user_id, None)
+        self._presences.pop(user_id, None)
+
+        # move the last row into the hole
+        last = len(self._ids) - 1
+        if row != last:
+            for column in self._columns:
+                values = getattr(self, column)
+                values[row] = values[last]
+            self._index[self._ids[row]] = row
+        for column in self._columns:
+            getattr(self, column).pop()
+
+    def values(self) -> ValuesView[Member]:
+        return _MemberStoreValues(self)
+
+    def clear(self) -> None:
+        self.__init__(self.guild, self._state, hot=self.hot, pinned=self._pinned)
+
+    def _keep(self, user_id: int, member: Member) -> None:
+        hot = self._hot
+        hot[user_id] = member
+        hot.move_to_end(user_id)
+        while len(hot) > self.hot:
+            evicted_id, evicted = hot.popitem(last=False)
+            if evicted_id in self._pinned:
+                hot[evicted_id] = evicted
+                if len(hot) <= len(self._pinned):
+                    break
+                continue
+            # write back the updates made while it was an object
+            if evicted_id in self._index:
+                self._pack(evicted_id, evicted)
+
+    def _peek(self, user_id: int, row: int) -> Member:
+        # like __getitem__, without changing which members are kept
+        member = self._hot.get(user_id)
+        if member is None:
+            member = self._live.get(user_id)
+            if member is None:
+                member = self._live[user_id] = self._materialize(row)
+        return member
+
+    def _intern_roles(self, roles: utils.SnowflakeList) -> bytes:
+        packed = roles.tobytes()
+        try:
+            return self._interned_roles[packed][0]
+        except KeyError:
+            self._interned_roles[packed] = (packed, frozenset(roles))
+            return packed
+
+    def _pack(self, user_id: int, member: Member) -> None:
+        user = member._user
+        values = (
+            user_id,
+            _pack_time(member.joined_at),
+            _pack_time(member.premium_since),
+            _pack_time(member.communication_disabled_until),
+            member.pending,
+            member.nick,
+            member._avatar,
+            self._intern_roles(member._roles),
+            user.name,
+            user.global_name,
+            user._avatar,
+            sys.intern(user.discriminator),
+            user._public_flags,
+            user.bot | user.system << 1,
+        )
+
+        row = self._index.get(user_id)
+        if row is None:
+            self._index[user_id] = len(self._ids)
+            for column, value in zip(self._columns, values):
+                getattr(self, column).append(value)
+        else:
+            for column, value in zip(self._columns, values):
+                getattr(self, column)[row] = value
+
+        if member.activities or member._client_status != {None: "offline"}:
+            self._presences[user_id] = (member._client_status, member.activities)
+        else:
+            self._presences.pop(user_id, None)
+
+    def _materialize(self, row: int) -> Member:
+        state = self._state
+        user_id = self._ids[row]
+        user = state.get_user(user_id)
+        if user is None:
+            bits = self._user_bits[row]
+            user = state.store_user(
+                {
+                    "id": user_id,
+                    "username": self._names[row],
+                    "global_name": self._global_names[row],
+                    "avatar": self._user_avatars[row],
+                    "discriminator": self._discriminators[row],
+                    "public_flags": self._public_flags[row],
+                    "bot": bool(bits & 1),
+                    "system": bool(bits & 2),
+                }  # type: ignore
+            )
+
+        member = Member.__new__(Member)
+        member._state = state
+        member._user = user
+        member.guild = self.guild
+        member.joined_at = _unpack_time(self._joined_at[row])
+        member.premium_since = _unpack_time(self._premium_since[row])
+        member.communication_disabled_until = _unpack_time(self._timed_out_until[row])
+        member.pending = bool(self._pending[row])
+        member.nick = self._nicks[row]
+        member._avatar = self._avatars[row]
+        member._roles = utils.SnowflakeList(self._roles[row], is_sorted=True)
+
+        presence = self._presences.get(user_id)
+        if presence is None:
+            member._client_status = {None: "offline"}
+            member.activities = ()
+        else:
+            member._client_status = presence[0].copy()
+            member.activities = presence[1]
+        return member
+
+    def with_role(self, role_id: int) -> list[Member]:
+        """Returns the members that have a role, without creating objects
+        for the other members.
+        """
+        matching = {
+            packed
+            for packed, (_, role_ids) in self._interned_roles.items()
+            if role_id in role_ids
+        }
+        result = []
+        for user_id, row in self._index.items():
+            member = self._hot.get(user_id) or self._live.get(user_id)
+            if member is not None:
+                if member._roles.has(role_id):
+                    result.append(member)
+            elif self._roles[row] in matching:
+                result.append(self._peek(user_id, row))
+        return result
+
+
+class _MemberStoreValues(ValuesView):
+    __slots__ = ()
+
+    _mapping: MemberStore
+
+    def __iter__(self) -> Iterator[Member]:
+        store = self._mapping
+        for user_id, row in list(store._index.items()):
+            yield store._peek(user_id, row)
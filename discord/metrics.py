@@ -0,0 +1,282 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import defaultdict
+from typing import Sequence
+
+__all__ = (
+    "HTTPRecorder",
+    "HTTPMetrics",
+)
+
+
+class HTTPRecorder:
+    """The interface the HTTP client reports its activity to.
+
+    Subclass this and override the methods you are interested in, then pass
+    an instance to :class:`Client` through the ``http_recorder`` parameter.
+    Every method is a no-op by default.
+
+    The methods are called synchronously from within the request handling, so
+    they should be cheap and must not block.
+
+    ``route`` is always the path template of the endpoint, e.g.
+    ``/channels/{channel_id}/messages``, which keeps the number of distinct
+    values small. ``bucket`` identifies the rate limit bucket and contains
+    IDs, so it should not be used as a metric label.
+
+    .. versionadded:: 2.6
+    """
+
+    def record_request(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        latency: float,
+        sent: int,
+        received: int,
+    ) -> None:
+        """Called after every HTTP response, including ones that are retried.
+
+        Parameters
+        ----------
+        method: :class:`str`
+            The HTTP method.
+        route: :class:`str`
+            The path template of the endpoint.
+        status: :class:`int`
+            The status code of the response.
+        latency: :class:`float`
+            The seconds between sending the request and reading the response.
+        sent: :class:`int`
+            The size of the request body in bytes, ``0`` if it is unknown.
+        received: :class:`int`
+            The size of the response body in bytes.
+        """
+
+    def record_retry(self, method: str, route: str, status: int | None) -> None:
+        """Called whenever a request is about to be retried.
+
+        ``status`` is ``None`` if the retry is due to a connection error.
+        """
+
+    def record_ratelimited(
+        self, method: str, route: str, bucket: str, retry_after: float, is_global: bool
+    ) -> None:
+        """Called whenever a request receives a 429 response."""
+
+    def record_bucket_wait(self, route: str, bucket: str, seconds: float) -> None:
+        """Called with the time a request waited for its rate limit bucket."""
+
+    def record_global_wait(self, seconds: float) -> None:
+        """Called with the time a request was stalled by the global rate limit."""
+
+
+class HTTPMetrics(HTTPRecorder):
+    """An :class:`HTTPRecorder` that aggregates everything in memory.
+
+    The aggregated values can be read from the attributes, or exported in the
+    Prometheus text format through :meth:`to_prometheus`.
+
+    .. versionadded:: 2.6
+
+    Parameters
+    ----------
+    buckets: Sequence[:class:`float`]
+        The upper bounds of the latency histogram buckets, in seconds.
+
+    Attributes
+    ----------
+    requests: Dict[Tuple[:class:`str`, :class:`str`, :class:`int`], :class:`int`]
+        The number of responses by method, route and status.
+    bytes_sent: Dict[Tuple[:class:`str`, :class:`str`], :class:`int`]
+        The bytes sent by method and route.
+    bytes_received: Dict[Tuple[:class:`str`, :class:`str`], :class:`int`]
+        The bytes received by method and route.
+    retries: Dict[Tuple[:class:`str`, :class:`str`], :class:`int`]
+        The number of retries by method and route.
+    ratelimited: Dict[Tuple[:class:`str`, :class:`str`, :class:`bool`], :class:`int`]
+        The number of 429 responses by method, route and whether they were global.
+    bucket_wait: Dict[:class:`str`, :class:`float`]
+        The total seconds spent waiting for rate limit buckets by route.
+    global_wait: :class:`float`
+        The total seconds spent stalled by the global rate limit.
+    """
+
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, *, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        self.requests: defaultdict[tuple[str, str, int], int] = defaultdict(int)
+        self.bytes_sent: defaultdict[tuple[str, str], int] = defaultdict(int)
+        self.bytes_received: defaultdict[tuple[str, str], int] = defaultdict(int)
+        self.retries: defaultdict[tuple[str, str], int] = defaultdict(int)
+        self.ratelimited: defaultdict[tuple[str, str, bool], int] = defaultdict(int)
+        self.bucket_wait: defaultdict[str, float] = defaultdict(float)
+        self.global_wait: float = 0.0
+        # (method, route) -> counts per histogram bucket, the last being +Inf
+        self._histograms: dict[tuple[str, str], list[int]] = {}
+        self._latency_sums: defaultdict[tuple[str, str], float] = defaultdict(float)
+
+    def record_request(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        latency: float,
+        sent: int,
+        received: int,
+    ) -> None:
+        key = (method, route)
+        self.requests[(method, route, status)] += 1
+        self.bytes_sent[key] += sent
+        self.bytes_received[key] += received
+
+        try:
+            histogram = self._histograms[key]
+        except KeyError:
+            histogram = self._histograms[key] = [0] * (len(self.buckets) + 1)
+        histogram[bisect.bisect_left(self.buckets, latency)] += 1
+        self._latency_sums[key] += latency
+
+    def record_retry(self, method: str, route: str, status: int | None) -> None:
+        self.retries[(method, route)] += 1
+
+    def record_ratelimited(
+        self, method: str, route: str, bucket: str, retry_after: float, is_global: bool
+    ) -> None:
+        self.ratelimited[(method, route, is_global)] += 1
+
+    def record_bucket_wait(self, route: str, bucket: str, seconds: float) -> None:
+        self.bucket_wait[route] += seconds
+
+    def record_global_wait(self, seconds: float) -> None:
+        self.global_wait += seconds
+
+    def latency_histogram(self, method: str, route: str) -> list[tuple[float, int]]:
+        """Returns the cumulative latency histogram of a route.
+
+        Parameters
+        ----------
+        method: :class:`str`
+            The HTTP method.
+        route: :class:`str`
+            The path template of the endpoint.
+
+        Returns
+        -------
+        List[Tuple[:class:`float`, :class:`int`]]
+            Pairs of bucket upper bound and the number of requests at or below
+            it, the last bound being ``inf``.
+        """
+        counts = self._histograms.get((method, route), [0] * (len(self.buckets) + 1))
+        result = []
+        total = 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_prometheus(self, *, prefix: str = "pycord_http") -> str:
+        """Renders the metrics in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        prefix: :class:`str`
+            The prefix of every metric name.
+
+        Returns
+        -------
+        :class:`str`
+            The metrics, ready to be served on a ``/metrics`` endpoint.
+        """
+        lines: list[str] = []
+
+        def header(name: str, kind: str, doc: str) -> str:
+            name = f"{prefix}_{name}"
+            lines.append(f"# HELP {name} {doc}")
+            lines.append(f"# TYPE {name} {kind}")
+            return name
+
+        name = header(
+            "request_duration_seconds", "histogram", "Latency of HTTP requests."
+        )
+        for method, route in self._histograms:
+            labels = f'method="{method}",route="{_escape(route)}"'
+            for bound, count in self.latency_histogram(method, route):
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(
+                f"{name}_sum{{{labels}}} {self._latency_sums[(method, route)]}"
+            )
+            lines.append(f"{name}_count{{{labels}}} {count}")
+
+        name = header("requests_total", "counter", "HTTP responses by status.")
+        for (method, route, status), count in self.requests.items():
+            lines.append(
+                f'{name}{{method="{method}",route="{_escape(route)}",'
+                f'status="{status}"}} {count}'
+            )
+
+        for attr, doc in (
+            ("bytes_sent", "Bytes sent in request bodies."),
+            ("bytes_received", "Bytes received in response bodies."),
+            ("retries", "Retried HTTP requests."),
+        ):
+            name = header(f"{attr}_total", "counter", doc)
+            for (method, route), value in getattr(self, attr).items():
+                lines.append(
+                    f'{name}{{method="{method}",route="{_escape(route)}"}} {value}'
+                )
+
+        name = header("ratelimited_total", "counter", "HTTP 429 responses.")
+        for (method, route, is_global), count in self.ratelimited.items():
+            lines.append(
+                f'{name}{{method="{method}",route="{_escape(route)}",'
+                f'global="{str(is_global).lower()}"}} {count}'
+            )
+
+        name = header(
+            "bucket_wait_seconds_total",
+            "counter",
+            "Time spent waiting for rate limit buckets.",
+        )
+        for route, seconds in self.bucket_wait.items():
+            lines.append(f'{name}{{route="{_escape(route)}"}} {seconds}')
+
+        name = header(
+            "global_wait_seconds_total",
+            "counter",
+            "Time spent stalled by the global rate limit.",
+        )
+        lines.append(f"{name} {self.global_wait}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -29,9 +29,11 @@ import array
 import ctypes
 import ctypes.util
 import gc
+import heapq
 import logging
 import math
 import os.path
+import queue
 import struct
 import sys
 import threading
@@ -518,52 +520,249 @@ class Decoder(_OpusStruct):
         return array.array("h", pcm[: ret * channel_count]).tobytes()
 
 
-class DecodeManager(threading.Thread, _OpusStruct):
-    def __init__(self, client):
-        super().__init__(daemon=True, name="DecodeManager")
+class _JitterBuffer:
+    """Puts the frames of one SSRC back in the order of their RTP sequence
+    numbers. A frame is held until the frame before it was released, more than
+    ``depth`` frames are waiting or it waited for ``delay`` seconds. Frames
+    arriving after a later frame was released are dropped and counted.
+    """
+
+    __slots__ = ("depth", "delay", "late", "_heap", "_next", "_highest", "_pushed")
+
+    def __init__(self, depth: int, delay: float):
+        self.depth: int = depth
+        self.delay: float = delay
+        self.late: int = 0
+        # (extended sequence, push order, receive time, frame)
+        self._heap: list[tuple[int, int, float, RawData]] = []
+        self._next: int | None = None
+        self._highest: int | None = None
+        self._pushed: int = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _extend(self, sequence: int) -> int:
+        # sequence numbers are 16 bit and wrap around, so they are extended
+        # to the value closest to the highest sequence seen so far
+        if self._highest is None:
+            self._highest = sequence
+            return sequence
+
+        delta = (sequence - self._highest) & 0xFFFF
+        if delta >= 0x8000:
+            delta -= 0x10000
+        extended = self._highest + delta
+        if extended > self._highest:
+            self._highest = extended
+        return extended
+
+    def push(self, frame: RawData, now: float) -> None:
+        sequence = self._extend(frame.sequence)
+        if self._next is not None and sequence < self._next:
+            self.late += 1
+            return
+        self._pushed += 1
+        heapq.heappush(self._heap, (sequence, self._pushed, now, frame))
+
+    def pop(self, now: float) -> list[RawData]:
+        """Returns the frames that are ready to be decoded, in order."""
+        heap = self._heap
+        ready = []
+        while heap:
+            sequence, _, received, frame = heap[0]
+            if (
+                sequence != self._next
+                and len(heap) <= self.depth
+                and now - received < self.delay
+            ):
+                break
+
+            heapq.heappop(heap)
+            if self._next is not None and sequence < self._next:
+                # a duplicate of a frame that was already released
+                self.late += 1
+                continue
+            self._next = sequence + 1
+            ready.append(frame)
+        return ready
+
+    def deadline(self) -> float | None:
+        """The time at which the first held frame is released without waiting
+        for the frames before it.
+        """
+        if not self._heap:
+            return None
+        return self._heap[0][2] + self.delay
+
+    def drain(self) -> list[RawData]:
+        return self.pop(math.inf)
+
+
+class DecodeManager(_OpusStruct):
+    """Decodes received opus frames on a pool of worker threads.
+
+    Every SSRC is assigned to one worker so that its frames are decoded in
+    order by the same :class:`Decoder`, while different speakers are decoded
+    in parallel. Each worker has its own queue of at most ``max_queue``
+    frames, frames arriving for a full queue are dropped and counted in
+    :attr:`dropped`.
+
+    Before decoding, the frames of every SSRC pass a jitter buffer which
+    restores the order of their sequence numbers. A frame waits for the
+    frames before it while fewer than ``jitter_depth`` frames are held and
+    for at most ``jitter_delay`` seconds. Frames arriving after a later frame
+    was decoded are dropped and counted in :attr:`late`. A ``jitter_depth``
+    of 0 decodes the frames in the order they arrive.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        client,
+        *,
+        workers: int | None = None,
+        max_queue: int = 500,
+        jitter_depth: int = 3,
+        jitter_delay: float = 0.06,
+    ):
+        if workers is None:
+            workers = min(4, os.cpu_count() or 1)
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
 
         self.client = client
-        self.decode_queue = []
+        self.max_queue: int = max_queue
+        self.jitter_depth: int = jitter_depth
+        self.jitter_delay: float = jitter_delay
+        self.decoder: dict[int, Decoder] = {}
+        # SSRC -> the number of frames dropped because its worker fell behind
+        self.dropped: dict[int, int] = {}
+
+        self._queues: list[queue.SimpleQueue] = [
+            queue.SimpleQueue() for _ in range(workers)
+        ]
+        self._threads: list[threading.Thread] = [
+            threading.Thread(
+                target=self._run,
+                args=(q,),
+                daemon=True,
+                name=f"DecodeManager-{index}",
+            )
+            for index, q in enumerate(self._queues)
+        ]
+        # SSRC -> index of its worker, assigned round-robin
+        self._assigned: dict[int, int] = {}
+        # SSRC -> its jitter buffer, only ever used by the worker of the SSRC
+        self._buffers: dict[int, _JitterBuffer] = {}
+        self._lock = threading.Lock()
+        self._stopped = False
 
-        self.decoder = {}
+    @property
+    def dropped_total(self) -> int:
+        return sum(self.dropped.values())
 
-        self._end_thread = threading.Event()
+    @property
+    def late(self) -> dict[int, int]:
+        """SSRC -> the number of frames dropped because they arrived too late
+        to be put back in order.
+        """
+        return {ssrc: buffer.late for ssrc, buffer in list(self._buffers.items())}
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def is_alive(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
 
     def decode(self, opus_frame):
         if not isinstance(opus_frame, RawData):
             raise TypeError("opus_frame should be a RawData object.")
-        self.decode_queue.append(opus_frame)
-
-    def run(self):
-        while not self._end_thread.is_set():
-            try:
-                data = self.decode_queue.pop(0)
-            except IndexError:
-                time.sleep(0.001)
-                continue
-
+        if self._stopped:
+            return
+
+        ssrc = opus_frame.ssrc
+        index = self._assigned.get(ssrc)
+        if index is None:
+            with self._lock:
+                index = self._assigned.setdefault(
+                    ssrc, len(self._assigned) % len(self._queues)
+                )
+
+        q = self._queues[index]
+        if q.qsize() >= self.max_queue:
+            self.dropped[ssrc] = self.dropped.get(ssrc, 0) + 1
+            return
+        q.put(opus_frame)
+
+    def _run(self, q: queue.SimpleQueue) -> None:
+        buffers: list[_JitterBuffer] = []
+        timeout = None
+        while True:
             try:
-                if data.decrypted_data is None:
-                    continue
-                else:
-                    data.decoded_data = self.get_decoder(data.ssrc).decode(
-                        data.decrypted_data
-                    )
-            except OpusError:
-                print("Error occurred while decoding opus frame.")
-                continue
+                data = q.get(timeout=timeout)
+            except queue.Empty:
+                data = None
+
+            if data is self._STOP:
+                for buffer in buffers:
+                    for frame in buffer.drain():
+                        self._decode(frame)
+                return
+
+            now = time.perf_counter()
+            if data is not None and data.decrypted_data is not None:
+                buffer = self._buffers.get(data.ssrc)
+                if buffer is None:
+                    buffer = _JitterBuffer(self.jitter_depth, self.jitter_delay)
+                    self._buffers[data.ssrc] = buffer
+                    buffers.append(buffer)
+                buffer.push(data, now)
+
+            # frames of other speakers may have waited long enough by now
+            deadline = math.inf
+            for buffer in buffers:
+                for frame in buffer.pop(now):
+                    self._decode(frame)
+                if buffer:
+                    deadline = min(deadline, buffer.deadline())
+            timeout = None if deadline == math.inf else max(0, deadline - now)
+
+    def _decode(self, data: RawData) -> None:
+        try:
+            data.decoded_data = self.get_decoder(data.ssrc).decode(data.decrypted_data)
+        except OpusError:
+            _log.info("Error occurred while decoding opus frame.")
+            return
 
-            self.client.recv_decoded_audio(data)
+        self.client.recv_decoded_audio(data)
 
     def stop(self):
-        while self.decoding:
-            time.sleep(0.1)
-            self.decoder = {}
-            gc.collect()
-            print("Decoder Process Killed")
-        self._end_thread.set()
+        """Decodes the frames that are already queued, then stops the workers."""
+        if self._stopped:
+            return
+        self._stopped = True
+        for q in self._queues:
+            q.put(self._STOP)
+
+        current = threading.current_thread()
+        for thread in self._threads:
+            # stop may be called by a sink from within a worker
+            if thread is not current and thread.is_alive():
+                thread.join()
+
+        self.decoder = {}
+        gc.collect()
+        _log.debug(
+            "Decoder threads stopped, %d frames dropped, %d frames late",
+            self.dropped_total,
+            sum(self.late.values()),
+        )
 
     def get_decoder(self, ssrc):
+        # each SSRC is only ever decoded by its own worker, so this cannot race
         d = self.decoder.get(ssrc)
         if d is not None:
             return d
@@ -572,4 +771,6 @@ class DecodeManager(threading.Thread, _OpusStruct):
 
     @property
     def decoding(self):
-        return bool(self.decode_queue)
+        return any(not q.empty() for q in self._queues) or any(
+            list(self._buffers.values())
+        )
@@ -325,12 +325,10 @@ class Role(Hashable):
     @property
     def members(self) -> list[Member]:
         """Returns all the members with this role."""
-        all_members = self.guild.members
         if self.is_default():
-            return all_members
+            return self.guild.members
 
-        role_id = self.id
-        return [member for member in all_members if member._roles.has(role_id)]
+        return self.guild._members_with_role(self.id)
 
     @property
     def icon(self) -> Asset | None:
@@ -329,6 +329,16 @@ class AutoShardedClient(Client):
     if this is used. By default, when omitted, the client will launch shards from
     0 to ``shard_count - 1``.
 
+    Shards are launched in parallel as far as the ``max_concurrency`` of the
+    bot allows. Shards whose IDs share the same remainder when divided by it
+    IDENTIFY one after another, so :meth:`Client.before_identify_hook` is
+    called with ``initial=True`` once for each of these groups.
+
+    .. versionchanged:: 2.6
+        Shards are launched in parallel according to ``max_concurrency``, which
+        is read from the ``/gateway/bot`` endpoint even if :attr:`.shard_count`
+        is given.
+
     Attributes
     ----------
     shard_ids: Optional[List[:class:`int`]]
@@ -439,22 +449,39 @@ class AutoShardedClient(Client):
         ret.launch()
 
     async def launch_shards(self) -> None:
+        compression = self._connection.gateway_compression
+        shard_count, gateway, limits = await self.http.get_bot_gateway_info(
+            compression=compression
+        )
         if self.shard_count is None:
-            self.shard_count, gateway = await self.http.get_bot_gateway()
-        else:
-            gateway = await self.http.get_gateway()
+            self.shard_count = shard_count
 
         self._connection.shard_count = self.shard_count
 
         shard_ids = self.shard_ids or range(self.shard_count)
         self._connection.shard_ids = shard_ids
 
+        # shards in different rate limit keys may IDENTIFY at the same time
+        max_concurrency = max(limits.get("max_concurrency", 1), 1)
+        lanes: dict[int, list[int]] = {}
         for shard_id in shard_ids:
-            initial = shard_id == shard_ids[0]
-            await self.launch_shard(gateway, shard_id, initial=initial)
+            lanes.setdefault(shard_id % max_concurrency, []).append(shard_id)
+
+        _log.info(
+            "Launching %d shards with a max concurrency of %d.",
+            len(shard_ids),
+            max_concurrency,
+        )
+        await asyncio.gather(
+            *(self._launch_lane(gateway, lane) for lane in lanes.values())
+        )
 
         self._connection.shards_launched.set()
 
+    async def _launch_lane(self, gateway: str, shard_ids: list[int]) -> None:
+        for index, shard_id in enumerate(shard_ids):
+            await self.launch_shard(gateway, shard_id, initial=index == 0)
+
     async def connect(self, *, reconnect: bool = True) -> None:
         self._reconnect = reconnect
         await self.launch_shards()
@@ -499,6 +526,7 @@ class AutoShardedClient(Client):
         if to_close:
             await asyncio.wait(to_close)
 
+        await self._save_snapshot_on_close()
         await self.http.close()
         self.__queue.put_nowait(EventItem(EventType.clean_close, None, None))
 
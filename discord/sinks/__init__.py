@@ -11,10 +11,12 @@ A place to store all officially given voice sinks.
 from .core import *
 from .errors import *
 from .m4a import *
+from .mix import *
 from .mka import *
 from .mkv import *
 from .mp3 import *
 from .mp4 import *
 from .ogg import *
 from .pcm import *
+from .stream import *
 from .wave import *
@@ -95,24 +95,32 @@ class Filters:
         self.vc.stop_recording()
 
 
+# the sequence, timestamp and SSRC of an RTP header
+_RTP_HEADER = struct.Struct(">xxHII")
+
+
 class RawData:
     """Handles raw data from Discord so that it can be decrypted and decoded to be used.
 
     .. versionadded:: 2.0
+
+    .. versionchanged:: 2.6
+        ``data`` is a :class:`memoryview` of the encrypted payload.
     """
 
-    def __init__(self, data, client):
-        self.data = bytearray(data)
+    def __init__(self, data, client, decrypt=None):
+        # the payload is only sliced from a view, it is copied once when
+        # it is decrypted
+        view = memoryview(data)
         self.client = client
 
-        self.header = data[:12]
-        self.data = self.data[12:]
+        self.header = bytes(view[:12])
+        self.data = view[12:]
 
-        unpacker = struct.Struct(">xxHII")
-        self.sequence, self.timestamp, self.ssrc = unpacker.unpack_from(self.header)
-        self.decrypted_data = getattr(self.client, f"_decrypt_{self.client.mode}")(
-            self.header, self.data
-        )
+        self.sequence, self.timestamp, self.ssrc = _RTP_HEADER.unpack_from(data)
+        if decrypt is None:
+            decrypt = getattr(self.client, f"_decrypt_{self.client.mode}")
+        self.decrypted_data = decrypt(self.header, self.data)
         self.decoded_data = None
 
         self.user_id = None
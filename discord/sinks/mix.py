@@ -0,0 +1,220 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from array import array
+
+from .core import Filters
+from .errors import StreamingSinkError
+from .stream import BYTES_PER_SECOND, StreamingAudioData, StreamingSink
+
+__all__ = ("MixingSink",)
+
+_log = logging.getLogger(__name__)
+
+# 20ms of 48kHz stereo 16 bit audio
+FRAME_SIZE = BYTES_PER_SECOND // 50
+
+
+class MixingSink(StreamingSink):
+    """A sink that mixes every user into a single track while recording.
+
+    The audio of each user is placed on a shared timeline using the silence
+    :class:`~discord.VoiceClient` inserts between packets, which is why this
+    sink always records with ``sync_start`` enabled. Overlapping audio is
+    summed and clipped, and the mix is written out in 20ms frames once it is
+    ``latency`` seconds old, so the track is produced in real time from the
+    first packet on, including the silence while nobody speaks. Audio arriving
+    later than that is dropped. The track ends when recording is stopped.
+
+    The track is written like a :class:`StreamingSink` writes a user, to a file
+    named ``mix`` in ``directory``, and is available through :attr:`mixed`.
+
+    .. versionadded:: 2.6
+
+    Parameters
+    ----------
+    directory: :class:`str`
+        The directory the track is written to, created if needed.
+    encoding: :class:`str`
+        The encoding of the track, see :class:`StreamingSink`.
+    segment_duration: Optional[:class:`float`]
+        If given, a new file is started every time this many seconds were written.
+    latency: :class:`float`
+        How many seconds of audio are held back to wait for late packets.
+    filters
+        The filters of the sink, see :class:`Filters`. Users that are filtered
+        out are not part of the mix.
+
+    Attributes
+    ----------
+    mixed: :class:`StreamingAudioData`
+        The mixed track.
+    dropped: :class:`int`
+        The number of bytes of audio that arrived too late to be mixed.
+    """
+
+    def __init__(
+        self,
+        *,
+        directory: str,
+        encoding: str = "wav",
+        segment_duration: float | None = None,
+        latency: float = 0.2,
+        filters=None,
+    ):
+        super().__init__(
+            directory=directory,
+            encoding=encoding,
+            segment_duration=segment_duration,
+            filters=filters,
+        )
+        self.latency: float = latency
+        self.mixed: StreamingAudioData = StreamingAudioData(self, "mix")  # type: ignore
+        self.dropped: int = 0
+        # the mix of the timeline from _base onwards, both in bytes
+        self._buffer = bytearray()
+        self._base = 0
+        # user -> where their next audio goes on the timeline
+        self._positions: dict[int, int] = {}
+        self._started: float | None = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def init(self, vc):
+        super().init(vc)
+        # the silence before each user's first packet aligns them in the mix
+        vc.sync_start = True
+        # writes only come in while someone speaks, the clock keeps the track
+        # going in between
+        threading.Thread(target=self._run_clock, daemon=True, name="MixingSink").start()
+
+    def _run_clock(self) -> None:
+        while not self._stopped.wait(FRAME_SIZE / BYTES_PER_SECOND):
+            with self._lock:
+                failed = (
+                    self._started is not None
+                    and not self.finished
+                    and self._flush(self._horizon())
+                )
+            if failed:
+                self._stop_recording()
+
+    @Filters.container
+    def write(self, data, user):
+        if self._failed:
+            return
+        with self._lock:
+            if self._started is None:
+                self._started = time.perf_counter() - len(data) / BYTES_PER_SECOND
+
+            start = self._positions.get(user, 0)
+            end = start + len(data)
+            self._positions[user] = end
+            self._mix(start - self._base, data)
+            failed = self._flush(self._horizon())
+        # outside of the lock, stopping waits for the other decoder threads
+        # which may be blocked on it
+        if failed:
+            self._stop_recording()
+
+    def _mix(self, offset: int, data: bytes) -> None:
+        if offset < 0:
+            # partly or entirely older than what was already written out
+            late = min(-offset, len(data))
+            self.dropped += late
+            data = data[late:]
+            offset = 0
+            if not data:
+                return
+
+        buffer = self._buffer
+        end = offset + len(data)
+        if len(buffer) < end:
+            buffer.extend(bytes(end - len(buffer)))
+
+        mixed = array("h")
+        mixed.frombytes(buffer[offset:end])
+        incoming = array("h")
+        incoming.frombytes(data)
+        summed = array(
+            "h",
+            [
+                32767 if s > 32767 else -32768 if s < -32768 else s
+                for s in map(int.__add__, mixed, incoming)
+            ],
+        )
+        buffer[offset:end] = summed.tobytes()
+
+    def _horizon(self) -> int:
+        elapsed = time.perf_counter() - self._started - self.latency  # type: ignore
+        return int(elapsed * BYTES_PER_SECOND)
+
+    def _flush(self, horizon: int) -> bool:
+        # returns whether writing failed, the caller stops the recording
+        # once it released the lock
+        size = (horizon - self._base) // FRAME_SIZE * FRAME_SIZE
+        if size <= 0:
+            return False
+
+        buffer = self._buffer
+        chunk = bytes(buffer[:size])
+        if len(chunk) < size:
+            # nobody spoke, the track still has to keep time
+            chunk += bytes(size - len(chunk))
+        del buffer[:size]
+        self._base += size
+        if self._failed:
+            return False
+        try:
+            self.mixed.write(chunk)
+        except (StreamingSinkError, OSError):
+            _log.exception("Writing the mixed audio failed.")
+            return self._set_failed()
+        return False
+
+    def cleanup(self):
+        self._stopped.set()
+        with self._lock:
+            self.finished = True
+            if self._started is not None:
+                # everything that was received is mixed, up to when the
+                # recording was stopped
+                stopped_at = getattr(self.vc, "stopping_time", None)
+                if stopped_at is None:
+                    stopped_at = time.perf_counter()
+                end = max(
+                    self._base + len(self._buffer),
+                    int((stopped_at - self._started) * BYTES_PER_SECOND),
+                )
+                self._flush(end + FRAME_SIZE - 1)
+        self._cleanup_all([self.mixed])
+
+    def get_all_audio(self):
+        """Gets the mixed track."""
+        return [self.mixed.file]
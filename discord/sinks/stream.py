@@ -0,0 +1,320 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import threading
+import wave
+
+from .core import CREATE_NO_WINDOW, AudioData, Filters, Sink, default_filters
+from .errors import RecordingException, StreamingSinkError
+
+__all__ = (
+    "StreamingSink",
+    "StreamingAudioData",
+)
+
+_log = logging.getLogger(__name__)
+
+# 48kHz, 2 channels, 16 bit samples
+BYTES_PER_SECOND = 48000 * 2 * 2
+
+# encoding -> the ffmpeg muxer writing it
+FFMPEG_FORMATS = {
+    "mp3": "mp3",
+    "ogg": "ogg",
+    "mka": "matroska",
+    "mkv": "matroska",
+    "mp4": "mp4",
+    "m4a": "ipod",
+}
+
+
+class _FileWriter:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.fp = open(path, "wb")
+
+    def write(self, data: bytes) -> None:
+        self.fp.write(data)
+
+    def close(self) -> None:
+        self.fp.close()
+
+
+class _WaveWriter(_FileWriter):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # the header is rewritten with the final size when closed
+        self.fp = wave.open(path, "wb")
+        self.fp.setnchannels(2)
+        self.fp.setsampwidth(2)
+        self.fp.setframerate(48000)
+
+    def write(self, data: bytes) -> None:
+        self.fp.writeframesraw(data)
+
+
+class _FFmpegWriter:
+    def __init__(self, path: str, fmt: str) -> None:
+        self.path = path
+        args = [
+            "ffmpeg",
+            "-f",
+            "s16le",
+            "-ar",
+            "48000",
+            "-loglevel",
+            "error",
+            "-ac",
+            "2",
+            "-i",
+            "-",
+            "-f",
+            fmt,
+            "-y",
+            path,
+        ]
+        try:
+            self.process = subprocess.Popen(
+                args, creationflags=CREATE_NO_WINDOW, stdin=subprocess.PIPE
+            )
+        except FileNotFoundError:
+            raise StreamingSinkError("ffmpeg was not found.") from None
+        except subprocess.SubprocessError as exc:
+            raise StreamingSinkError(
+                "Popen failed: {0.__class__.__name__}: {0}".format(exc)
+            ) from exc
+
+    def write(self, data: bytes) -> None:
+        try:
+            self.process.stdin.write(data)
+        except (BrokenPipeError, ValueError):
+            raise StreamingSinkError("ffmpeg exited while recording.") from None
+
+    def close(self) -> None:
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        if self.process.wait() != 0:
+            raise StreamingSinkError(
+                f"ffmpeg exited with code {self.process.returncode}"
+                f" while writing {self.path}."
+            )
+
+
+class StreamingAudioData(AudioData):
+    """The audio of one user recorded by a :class:`StreamingSink`.
+
+    .. versionadded:: 2.6
+
+    Attributes
+    ----------
+    paths: List[:class:`str`]
+        The paths of the files written for the user, in order.
+    file
+        The only file opened for reading once recording has finished, or
+        ``None`` if the recording was split into several segments.
+    """
+
+    def __init__(self, sink: StreamingSink, user: int) -> None:
+        super().__init__(None)
+        self.sink = sink
+        self.user = user
+        self.paths: list[str] = []
+        self._writer = None
+        self._written = 0
+
+    def write(self, data):
+        if self.finished:
+            super().write(data)
+
+        sink = self.sink
+        if self._writer is None:
+            self._writer = sink._open(self.user, len(self.paths))
+            self.paths.append(self._writer.path)
+            self._written = 0
+
+        self._writer.write(data)
+        self._written += len(data)
+        if sink.segment_size is not None and self._written >= sink.segment_size:
+            self._close_writer()
+
+    def _close_writer(self) -> None:
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+
+    def cleanup(self):
+        if self.finished:
+            super().cleanup()
+        self.finished = True
+        self._close_writer()
+        if len(self.paths) == 1:
+            self.file = open(self.paths[0], "rb")
+
+
+class StreamingSink(Sink):
+    """A sink that writes the audio of every user to disk while recording.
+
+    Unlike the other sinks, which keep everything in memory and encode it
+    once recording stops, the audio is written as it is received. Memory use
+    stays constant however long the recording is, and the files are complete
+    as soon as recording stops.
+
+    ``wav`` and ``pcm`` are written directly, every other encoding is piped
+    into an ``ffmpeg`` process per user that runs for the whole recording.
+
+    The :attr:`~Sink.audio_data` values are :class:`StreamingAudioData`.
+
+    .. versionadded:: 2.6
+
+    Parameters
+    ----------
+    directory: :class:`str`
+        The directory the files are written to, created if needed. Files are
+        named after the user ID, e.g. ``1234.mp3``, or ``1234-0.mp3`` and
+        onwards if segmented.
+    encoding: :class:`str`
+        The encoding of the files. One of ``wav``, ``pcm``, ``mp3``, ``ogg``,
+        ``mka``, ``mkv``, ``mp4`` or ``m4a``.
+    segment_duration: Optional[:class:`float`]
+        If given, a new file is started for a user every time this many
+        seconds of their audio were written.
+    filters
+        The filters of the sink, see :class:`Filters`.
+
+    If writing fails while recording, e.g. because ``ffmpeg`` exited, the
+    error is logged and the recording is stopped.
+
+    Raises
+    ------
+    StreamingSinkError
+        The encoding is not supported.
+    """
+
+    def __init__(
+        self,
+        *,
+        directory: str,
+        encoding: str = "wav",
+        segment_duration: float | None = None,
+        filters=None,
+    ):
+        if encoding not in FFMPEG_FORMATS and encoding not in ("wav", "pcm"):
+            raise StreamingSinkError(f"Unsupported encoding {encoding!r}.")
+        if filters is None:
+            filters = default_filters
+        self.filters = filters
+        Filters.__init__(self, **self.filters)
+
+        self.directory = directory
+        self.encoding = encoding
+        self.segment_size: int | None = (
+            None
+            if segment_duration is None
+            else max(1, int(segment_duration * BYTES_PER_SECOND))
+        )
+        self.vc = None
+        self.audio_data = {}
+        self._failed = False
+        self._fail_lock = threading.Lock()
+
+    def init(self, vc):
+        os.makedirs(self.directory, exist_ok=True)
+        super().init(vc)
+
+    def _open(self, user: int, index: int):
+        name = str(user) if self.segment_size is None else f"{user}-{index}"
+        path = os.path.join(self.directory, f"{name}.{self.encoding}")
+        if self.encoding == "wav":
+            return _WaveWriter(path)
+        if self.encoding == "pcm":
+            return _FileWriter(path)
+        return _FFmpegWriter(path, FFMPEG_FORMATS[self.encoding])
+
+    @Filters.container
+    def write(self, data, user):
+        if self._failed:
+            return
+        audio = self.audio_data.get(user)
+        if audio is None:
+            audio = self.audio_data[user] = StreamingAudioData(self, user)
+        try:
+            audio.write(data)
+        except (StreamingSinkError, OSError):
+            _log.exception("Writing the audio of %s failed.", user)
+            self._fail()
+
+    def _fail(self) -> None:
+        if self._set_failed():
+            self._stop_recording()
+
+    def _set_failed(self) -> bool:
+        # writes happen on the decoder threads, raising would only end the
+        # thread and silently drop the speakers it decodes
+        with self._fail_lock:
+            if self._failed:
+                return False
+            self._failed = True
+            return True
+
+    def _stop_recording(self) -> None:
+        # stopping joins the decoder threads, so this must not be called
+        # while holding a lock those threads may be waiting for
+        vc = self.vc
+        if vc is not None and vc.recording:
+            _log.warning("Stopping the recording because of the error above.")
+            try:
+                vc.stop_recording()
+            except RecordingException:
+                pass  # stopped in the meantime
+
+    def cleanup(self):
+        self.finished = True
+        self._cleanup_all(self.audio_data.values())
+
+    def _cleanup_all(self, audio_data) -> None:
+        # every file has to be closed even if some of them fail
+        errors = []
+        for audio in audio_data:
+            try:
+                audio.cleanup()
+            except (StreamingSinkError, OSError) as exc:
+                errors.append(exc)
+            else:
+                audio.on_format(self.encoding)
+
+        if len(errors) == 1:
+            raise errors[0]
+        if errors:
+            raise StreamingSinkError(" ".join(str(exc) for exc in errors))
+
+    def format_audio(self, audio):
+        # the audio is encoded while it is recorded
+        return
@@ -0,0 +1,269 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+import zlib
+from typing import TYPE_CHECKING, Any
+
+from .utils import HAS_MSGSPEC
+
+if HAS_MSGSPEC:
+    import msgspec
+
+if TYPE_CHECKING:
+    from .abc import GuildChannel
+    from .guild import Guild
+    from .member import Member
+    from .role import Role
+    from .state import ConnectionState
+    from .user import User
+
+__all__ = ()
+
+_log = logging.getLogger(__name__)
+
+# A snapshot file is the magic, one byte naming the encoding and the
+# zlib compressed body. The payloads inside use the shapes of the Discord
+# API so that they can be fed to the regular constructors when restoring.
+MAGIC = b"PYCS"
+VERSION = 1
+_MSGPACK = b"M"
+_JSON = b"J"
+
+_CHANNEL_FIELDS = (
+    ("topic", "topic"),
+    ("nsfw", "nsfw"),
+    ("slowmode_delay", "rate_limit_per_user"),
+    ("default_auto_archive_duration", "default_auto_archive_duration"),
+    ("default_thread_slowmode_delay", "default_thread_slowmode_delay"),
+    ("last_message_id", "last_message_id"),
+    ("bitrate", "bitrate"),
+    ("user_limit", "user_limit"),
+    ("rtc_region", "rtc_region"),
+    ("video_quality_mode", "video_quality_mode"),
+    ("status", "status"),
+)
+
+
+def _value(obj: Any) -> Any:
+    # enums are stored by their value
+    return getattr(obj, "value", obj)
+
+
+def _time(obj: Any) -> str | None:
+    return None if obj is None else obj.isoformat()
+
+
+def dump_user(user: User) -> dict[str, Any]:
+    payload = user._to_minimal_user_json()
+    payload["public_flags"] = user._public_flags
+    payload["system"] = user.system
+    return payload
+
+
+def dump_member(member: Member) -> dict[str, Any]:
+    # the user is stored once in the users table and referenced by ID
+    return {
+        "user": member.id,
+        "roles": list(member._roles),
+        "joined_at": _time(member.joined_at),
+        "premium_since": _time(member.premium_since),
+        "nick": member.nick,
+        "pending": member.pending,
+        "avatar": member._avatar,
+        "communication_disabled_until": _time(member.communication_disabled_until),
+    }
+
+
+def dump_role(role: Role) -> dict[str, Any]:
+    return {
+        "id": role.id,
+        "name": role.name,
+        "permissions": str(role._permissions),
+        "position": role.position,
+        "color": role._colour,
+        "hoist": role.hoist,
+        "managed": role.managed,
+        "mentionable": role.mentionable,
+        "icon": role._icon,
+        "unicode_emoji": role.unicode_emoji,
+    }
+
+
+def dump_channel(channel: GuildChannel) -> dict[str, Any]:
+    payload = {
+        "id": channel.id,
+        "type": _value(channel.type),
+        "name": channel.name,
+        "position": channel.position,
+        "parent_id": channel.category_id,
+        "flags": channel.flags.value,
+        "permission_overwrites": [o._asdict() for o in channel._overwrites],
+    }
+    for attr, key in _CHANNEL_FIELDS:
+        value = getattr(channel, attr, None)
+        if value is not None:
+            payload[key] = _value(value)
+    return payload
+
+
+def dump_guild(guild: Guild) -> dict[str, Any]:
+    return {
+        "id": guild.id,
+        "name": guild.name,
+        "icon": guild._icon,
+        "banner": guild._banner,
+        "splash": guild._splash,
+        "discovery_splash": guild._discovery_splash,
+        "description": guild.description,
+        "owner_id": guild.owner_id,
+        "member_count": guild._member_count,
+        "large": guild._large,
+        "features": list(guild.features),
+        "verification_level": _value(guild.verification_level),
+        "default_message_notifications": _value(guild.default_notifications),
+        "explicit_content_filter": _value(guild.explicit_content_filter),
+        "mfa_level": _value(guild.mfa_level),
+        "nsfw_level": _value(guild.nsfw_level),
+        "afk_timeout": guild.afk_timeout,
+        "afk_channel_id": guild.afk_channel and guild.afk_channel.id,
+        "system_channel_id": guild._system_channel_id,
+        "system_channel_flags": guild._system_channel_flags,
+        "rules_channel_id": guild._rules_channel_id,
+        "public_updates_channel_id": guild._public_updates_channel_id,
+        "preferred_locale": guild.preferred_locale,
+        "premium_tier": guild.premium_tier,
+        "premium_subscription_count": guild.premium_subscription_count,
+        "premium_progress_bar_enabled": guild.premium_progress_bar_enabled,
+        "max_members": guild.max_members,
+        "max_presences": guild.max_presences,
+        "max_video_channel_users": guild.max_video_channel_users,
+        "roles": [dump_role(role) for role in guild._roles.values()],
+        "channels": [dump_channel(channel) for channel in guild._channels.values()],
+        "members": [dump_member(member) for member in guild._members.values()],
+    }
+
+
+def dump_state(state: ConnectionState) -> dict[str, Any]:
+    """Returns the cache of ``state`` as plain data. This has to run in the
+    event loop since the cache must not change while it is being read.
+    """
+    guilds = [dump_guild(guild) for guild in state._guilds.values()]
+    users = {user.id: dump_user(user) for user in state._users.values()}
+    for guild in state._guilds.values():
+        for member in guild._members.values():
+            if member.id not in users:
+                users[member.id] = dump_user(member._user)
+
+    return {
+        "version": VERSION,
+        "user_id": state.self_id,
+        "created_at": time.time(),
+        "guilds": guilds,
+        "users": list(users.values()),
+    }
+
+
+def encode(data: dict[str, Any]) -> bytes:
+    if HAS_MSGSPEC:
+        fmt, body = _MSGPACK, msgspec.msgpack.encode(data)
+    else:
+        fmt, body = _JSON, json.dumps(data, separators=(",", ":")).encode()
+    return MAGIC + fmt + zlib.compress(body)
+
+
+def decode(raw: bytes) -> dict[str, Any]:
+    if raw[:4] != MAGIC:
+        raise ValueError("not a cache snapshot")
+
+    fmt, body = raw[4:5], zlib.decompress(raw[5:])
+    if fmt == _JSON:
+        data = json.loads(body)
+    elif fmt == _MSGPACK:
+        if not HAS_MSGSPEC:
+            raise ValueError("this snapshot requires msgspec to be installed")
+        data = msgspec.msgpack.decode(body)
+    else:
+        raise ValueError(f"unknown snapshot encoding {fmt!r}")
+
+    if not isinstance(data, dict):
+        raise ValueError("not a cache snapshot")
+    if data.get("version") != VERSION:
+        raise ValueError(f"unsupported snapshot version {data.get('version')!r}")
+    return data
+
+
+def write(path: str, data: dict[str, Any]) -> None:
+    """Encodes and writes a snapshot, replacing ``path`` atomically."""
+    raw = encode(data)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fp:
+        fp.write(raw)
+    os.replace(tmp, path)
+
+
+def read(path: str) -> dict[str, Any] | None:
+    """Reads a snapshot written by :func:`write` and links the members back to
+    their users. Returns ``None`` if there is no usable snapshot at ``path``.
+    """
+    try:
+        with open(path, "rb") as fp:
+            raw = fp.read()
+    except FileNotFoundError:
+        return None
+    except OSError as exc:
+        _log.warning("Ignoring the cache snapshot at %s: %s", path, exc)
+        return None
+
+    # a bad snapshot only costs the speed up, it must never stop the client
+    # from starting
+    try:
+        return _link(decode(raw))
+    except Exception as exc:
+        _log.warning("Ignoring the cache snapshot at %s: %r", path, exc)
+        return None
+
+
+def _link(data: dict[str, Any]) -> dict[str, Any]:
+    # read by ConnectionState._load_snapshot
+    for key in ("user_id", "created_at"):
+        if key not in data:
+            raise ValueError(f"missing {key!r}")
+
+    users = {user["id"]: user for user in data["users"]}
+    for guild in data["guilds"]:
+        int(guild["id"])
+        members = []
+        for member in guild["members"]:
+            user = users.get(member["user"])
+            if user is not None:
+                member["user"] = user
+                members.append(member)
+        guild["members"] = members
+    return data
@@ -27,17 +27,18 @@ from __future__ import annotations
 
 import asyncio
 import copy
+import heapq
 import inspect
 import itertools
 import logging
 import os
-from collections import OrderedDict, deque
+import time
+from collections import OrderedDict
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     Coroutine,
-    Deque,
     Sequence,
     TypeVar,
     Union,
@@ -45,20 +46,22 @@ from typing import (
 
 import discord
 
-from . import utils
+from . import snapshot, utils
 from .activity import BaseActivity
 from .audit_logs import AuditLogEntry
 from .automod import AutoModRule
+from .cache import CachePolicy, MemberNameIndex, MessageCache, PermissionCache
 from .channel import *
 from .channel import _channel_factory
 from .emoji import Emoji
 from .enums import ChannelType, InteractionType, ScheduledEventStatus, Status, try_enum
 from .flags import ApplicationFlags, Intents, MemberCacheFlags
+from .gateway import has_zstd
 from .guild import Guild
 from .integrations import _integration_factory
 from .interactions import Interaction
 from .invite import Invite
-from .member import Member
+from .member import Member, MemberStore
 from .mentions import AllowedMentions
 from .message import Message
 from .monetization import Entitlement
@@ -146,6 +149,129 @@ class ChunkRequest:
 _log = logging.getLogger(__name__)
 
 
+class ChunkScheduler:
+    """Chunks the guilds received while a connection is getting ready.
+
+    Guilds are queued per shard and up to ``window`` of them are requested
+    at the same time on each shard, the gateway rate limiter pacing the
+    actual sends. Guilds with members in voice channels come first, then
+    the smallest ones, so that most guilds are ready early.
+    """
+
+    def __init__(self, state: ConnectionState, *, window: int = 16) -> None:
+        self.state: ConnectionState = state
+        self.window: int = window
+        self._counter = itertools.count()
+        # shard ID -> heap of (priority, order, guild, future)
+        self._queues: dict[int, list[tuple[Any, ...]]] = {}
+        # shard ID -> the requests it may still start, kept across sender
+        # runs so that requests in flight when a sender ends still count
+        self._windows: dict[int, asyncio.Semaphore] = {}
+        self._senders: dict[int, asyncio.Task[None]] = {}
+        # request task -> the future of its guild
+        self._tasks: dict[asyncio.Task[None], asyncio.Future[None]] = {}
+        # shard ID -> [chunked, total]
+        self.progress: dict[int, list[int]] = {}
+        self._reported_at: dict[int, float] = {}
+
+    def add(self, guild: Guild) -> asyncio.Future[None]:
+        shard_id = guild.shard_id
+        future = self.state.loop.create_future()
+        priority = (not guild._voice_states, guild._member_count or 0)
+        queue = self._queues.setdefault(shard_id, [])
+        heapq.heappush(queue, (priority, next(self._counter), guild, future))
+        self.progress.setdefault(shard_id, [0, 0])[1] += 1
+
+        if shard_id not in self._windows:
+            self._windows[shard_id] = asyncio.Semaphore(self.window)
+        if shard_id not in self._senders:
+            self._senders[shard_id] = asyncio.create_task(self._send(shard_id))
+        return future
+
+    async def _send(self, shard_id: int) -> None:
+        window = self._windows[shard_id]
+        queue = self._queues[shard_id]
+        try:
+            while queue:
+                await window.acquire()
+                _, _, guild, future = heapq.heappop(queue)
+                task = asyncio.create_task(self._chunk(guild, future))
+                self._tasks[task] = future
+                task.add_done_callback(self._tasks.pop)
+                task.add_done_callback(lambda _: window.release())
+        finally:
+            del self._senders[shard_id]
+
+    async def _chunk(self, guild: Guild, future: asyncio.Future[None]) -> None:
+        # a chunk holds up to 1000 members, leave room for the sends being paced
+        timeout = 10.0 + (guild._member_count or 0) / 2000
+        try:
+            await asyncio.wait_for(self.state.chunk_guild(guild), timeout=timeout)
+        except asyncio.TimeoutError:
+            _log.warning(
+                "Shard ID %s timed out waiting for chunks for guild_id %s.",
+                guild.shard_id,
+                guild.id,
+            )
+        finally:
+            if not future.done():
+                future.set_result(None)
+            self._report(guild.shard_id)
+
+    def _report(self, shard_id: int) -> None:
+        progress = self.progress[shard_id]
+        progress[0] += 1
+        chunked, total = progress
+        now = self.state.loop.time()
+        if chunked < total and now - self._reported_at.get(shard_id, 0.0) < 1.0:
+            return
+
+        self._reported_at[shard_id] = now
+        _log.debug(
+            "Shard ID %s has chunked %d out of %d guilds.", shard_id, chunked, total
+        )
+        self.state.dispatch("chunk_progress", shard_id, chunked, total)
+
+    def cancel(self) -> None:
+        for task in self._senders.values():
+            task.cancel()
+        # a task cancelled before it started never resolves its future
+        for task, future in self._tasks.items():
+            task.cancel()
+            future.cancel()
+        for queue in self._queues.values():
+            for *_, future in queue:
+                future.cancel()
+            queue.clear()
+
+
+# Gateway events that only produce the listed client events and do not touch
+# the cache, mapped to those events. These can be skipped with
+# skip_unhandled_events if nothing listens.
+_SKIPPABLE_EVENTS: dict[str, tuple[str, ...]] = {
+    "TYPING_START": ("raw_typing", "typing"),
+    "INVITE_CREATE": ("invite_create",),
+    "INVITE_DELETE": ("invite_delete",),
+    "WEBHOOKS_UPDATE": ("webhooks_update",),
+    "INTEGRATION_CREATE": ("integration_create",),
+    "INTEGRATION_UPDATE": ("integration_update",),
+    "INTEGRATION_DELETE": ("raw_integration_delete",),
+    "GUILD_INTEGRATIONS_UPDATE": ("guild_integrations_update",),
+    "GUILD_AUDIT_LOG_ENTRY_CREATE": ("raw_audit_log_entry", "audit_log_entry"),
+    "CHANNEL_PINS_UPDATE": (
+        "private_channel_pins_update",
+        "guild_channel_pins_update",
+    ),
+    "AUTO_MODERATION_RULE_CREATE": ("auto_moderation_rule_create",),
+    "AUTO_MODERATION_RULE_UPDATE": ("auto_moderation_rule_update",),
+    "AUTO_MODERATION_RULE_DELETE": ("auto_moderation_rule_delete",),
+    "AUTO_MODERATION_ACTION_EXECUTION": ("auto_moderation_action_execution",),
+    "ENTITLEMENT_CREATE": ("entitlement_create",),
+    "ENTITLEMENT_UPDATE": ("entitlement_update",),
+    "ENTITLEMENT_DELETE": ("entitlement_delete",),
+}
+
+
 async def logging_coroutine(
     coroutine: Coroutine[Any, Any, T], *, info: str
 ) -> T | None:
@@ -186,10 +312,23 @@ class ConnectionState:
             options, "application_id"
         )
         self.heartbeat_timeout: float = options.get("heartbeat_timeout", 60.0)
+        self.skip_unhandled_events: bool = options.get("skip_unhandled_events", False)
         self.guild_ready_timeout: float = options.get("guild_ready_timeout", 2.0)
         if self.guild_ready_timeout < 0:
             raise ValueError("guild_ready_timeout cannot be negative")
 
+        self.gateway_compression: str = options.get(
+            "gateway_compression", "zlib-stream"
+        )
+        if self.gateway_compression not in ("zlib-stream", "zstd-stream"):
+            raise ValueError(
+                "gateway_compression must be either 'zlib-stream' or 'zstd-stream'"
+            )
+        if self.gateway_compression == "zstd-stream" and not has_zstd:
+            raise RuntimeError(
+                "zstandard library needed in order to use zstd-stream compression"
+            )
+
         allowed_mentions = options.get("allowed_mentions")
 
         if allowed_mentions is not None and not isinstance(
@@ -222,8 +361,9 @@ class ConnectionState:
                 " issues."
             )
 
+        self._lazy_chunking: bool = options.get("lazy_chunking", False)
         self._chunk_guilds: bool = options.get(
-            "chunk_guilds_at_startup", intents.members
+            "chunk_guilds_at_startup", intents.members and not self._lazy_chunking
         )
 
         # Ensure these two are set properly
@@ -231,6 +371,12 @@ class ConnectionState:
             raise ValueError(
                 "Intents.members must be enabled to chunk guilds at startup."
             )
+        if not intents.members and self._lazy_chunking:
+            raise ValueError("Intents.members must be enabled to chunk guilds lazily.")
+        self._lazy_chunk_tasks: dict[int, asyncio.Task[None]] = {}
+        # IDs of the guilds chunked lazily, Guild.chunked is not used since
+        # it stays False when the member cache does not keep every member
+        self._lazy_chunked: set[int] = set()
 
         cache_flags = options.get("member_cache_flags", None)
         if cache_flags is None:
@@ -245,6 +391,25 @@ class ConnectionState:
             cache_flags._verify_intents(intents)
 
         self.member_cache_flags: MemberCacheFlags = cache_flags
+
+        cache_policy = options.get("cache_policy", None)
+        if cache_policy is None:
+            cache_policy = CachePolicy()
+        elif not isinstance(cache_policy, CachePolicy):
+            raise TypeError(
+                f"cache_policy parameter must be CachePolicy not {type(cache_policy)!r}"
+            )
+
+        self.cache_policy: CachePolicy = cache_policy
+        self._snapshot_path: str | None = options.get("cache_snapshot", None)
+        # guild ID -> guild payload restored from the snapshot, until READY
+        self._snapshot: dict[int, dict[str, Any]] | None = None
+        self._snapshot_users: list[dict[str, Any]] = []
+        self._permission_cache: PermissionCache | None = (
+            PermissionCache(cache_policy.permission_cache_size)
+            if cache_policy.cache_permissions
+            else None
+        )
         self._activity: ActivityPayload | None = activity
         self._status: str | None = status
         self._intents: Intents = intents
@@ -274,10 +439,22 @@ class ConnectionState:
         # references now using a regular dictionary with eviction being done
         # using __del__. Testing this for memory leaks led to no discernible leaks,
         # though more testing will have to be done.
-        self._users: dict[int, User] = {}
-        self._emojis: dict[int, Emoji] = {}
-        self._stickers: dict[int, GuildSticker] = {}
-        self._guilds: dict[int, Guild] = {}
+        policy = self.cache_policy
+        # guilds restored from the snapshot that have yet to be reconciled
+        # with their GUILD_CREATE
+        self._restored_guilds: set[int] = set()
+        # guild ID -> IDs of the members restored from the snapshot that were
+        # not refreshed by a chunk yet
+        self._provisional_members: dict[int, set[int]] = {}
+        self._refresh_tasks: dict[int, asyncio.Task[None]] = {}
+        if self._permission_cache is not None:
+            self._permission_cache.clear()
+        self._users: dict[int, User] = policy.users._create(on_evict=self._unstore_user)
+        self._emojis: dict[int, Emoji] = policy.emojis._create()
+        self._stickers: dict[int, GuildSticker] = policy.stickers._create()
+        self._guilds: dict[int, Guild] = policy.guilds._create()
+        # user ID -> IDs of the guilds whose member name index has the user
+        self._user_name_guilds: dict[int, set[int]] = {}
         if views:
             self._view_store: ViewStore = ViewStore(self)
         self._modal_store: ModalStore = ModalStore(self)
@@ -287,10 +464,55 @@ class ConnectionState:
         self._private_channels: OrderedDict[int, PrivateChannel] = OrderedDict()
         # extra dict to look up private channels by user id
         self._private_channels_by_user: dict[int, DMChannel] = {}
-        if self.max_messages is not None:
-            self._messages: Deque[Message] | None = deque(maxlen=self.max_messages)
+        if policy.messages is not None:
+            self._messages: MessageCache | None = policy.messages._create_message_cache(
+                channel_index=policy.index_messages_by_channel
+            )
+        elif self.max_messages is not None:
+            self._messages: MessageCache | None = MessageCache(
+                self.max_messages, channel_index=policy.index_messages_by_channel
+            )
         else:
-            self._messages: Deque[Message] | None = None
+            self._messages: MessageCache | None = None
+
+    def _create_member_cache(self, guild: Guild) -> dict[int, Member]:
+        # the client's own member must always be cached, see Guild.me
+        self_id = self.self_id
+        pinned = (self_id,) if self_id is not None else ()
+        if self.cache_policy.compact_members:
+            return MemberStore(guild, self, pinned=pinned)  # type: ignore
+        return self.cache_policy.members._create(  # type: ignore
+            pinned=pinned, on_evict=guild._evict_member
+        )
+
+    def _create_member_name_index(self, guild_id: int) -> MemberNameIndex | None:
+        if self.cache_policy.index_member_names:
+            return MemberNameIndex(guild_id, self._user_name_guilds)
+        return None
+
+    def _reindex_member_names(
+        self, user_id: int, name: str, global_name: str | None
+    ) -> None:
+        # users are shared between guilds, so a new username has to reach
+        # the index of every guild the user is in
+        guild_ids = self._user_name_guilds.get(user_id)
+        if not guild_ids:
+            return
+        for guild_id in list(guild_ids):
+            guild = self._get_guild(guild_id)
+            if guild is None or guild._name_index is None:
+                # the guild was evicted without removing its members
+                guild_ids.discard(guild_id)
+                continue
+            guild._name_index.rename(user_id, name, global_name)
+        if not guild_ids:
+            del self._user_name_guilds[user_id]
+
+    @staticmethod
+    def _unstore_user(user: User) -> None:
+        # an evicted user must not remove a newer entry for its ID from
+        # the cache once it is garbage collected
+        user._stored = False
 
     def process_chunk_requests(
         self, guild_id: int, nonce: str | None, members: list[Member], complete: bool
@@ -306,6 +528,15 @@ class ConnectionState:
         for key in removed:
             del self._chunk_requests[key]
 
+    def _is_event_skippable(self, event: str) -> bool:
+        try:
+            events = _SKIPPABLE_EVENTS[event]
+        except KeyError:
+            return False
+
+        client = self._get_client()
+        return not any(client._has_event_listener(name) for name in events)
+
     def call_handlers(self, key: str, *args: Any, **kwargs: Any) -> None:
         try:
             func = self.handlers[key]
@@ -409,9 +640,16 @@ class ConnectionState:
 
     def _add_guild(self, guild: Guild) -> None:
         self._guilds[guild.id] = guild
+        self._lazy_chunked.discard(guild.id)
 
     def _remove_guild(self, guild: Guild) -> None:
         self._guilds.pop(guild.id, None)
+        self._provisional_members.pop(guild.id, None)
+        self._lazy_chunked.discard(guild.id)
+        if guild._name_index is not None:
+            guild._name_index.clear()
+        if self._permission_cache is not None:
+            self._permission_cache._invalidate_channels(guild._channels)
 
         for emoji in guild.emojis:
             self._emojis.pop(emoji.id, None)
@@ -481,17 +719,117 @@ class ConnectionState:
                 self._private_channels_by_user.pop(recipient.id, None)
 
     def _get_message(self, msg_id: int | None) -> Message | None:
-        return (
-            utils.find(lambda m: m.id == msg_id, reversed(self._messages))
-            if self._messages
-            else None
-        )
+        return self._messages.get(msg_id) if self._messages else None
 
     def _add_guild_from_data(self, data: GuildPayload) -> Guild:
         guild = Guild(data=data, state=self)
         self._add_guild(guild)
         return guild
 
+    async def _load_snapshot(self) -> None:
+        path = self._snapshot_path
+        if path is None:
+            return
+
+        data = await self.loop.run_in_executor(None, snapshot.read, path)
+        if data is None:
+            return
+        if data["user_id"] != self.self_id:
+            _log.warning("Ignoring the cache snapshot at %s of another user.", path)
+            return
+
+        self._snapshot = {int(guild["id"]): guild for guild in data["guilds"]}
+        self._snapshot_users = data["users"]
+        _log.info(
+            "Loaded a cache snapshot of %d guilds taken %.0f seconds ago.",
+            len(self._snapshot),
+            time.time() - data["created_at"],
+        )
+
+    async def save_snapshot(self, path: str) -> None:
+        data = snapshot.dump_state(self)
+        await self.loop.run_in_executor(None, snapshot.write, path, data)
+        _log.info(
+            "Saved a cache snapshot of %d guilds to %s.", len(data["guilds"]), path
+        )
+
+    def _add_ready_guild(self, data: GuildPayload) -> None:
+        # guilds in READY are unavailable until their GUILD_CREATE, unless they
+        # can be restored from the snapshot in the meantime
+        if self._snapshot:
+            payload = self._snapshot.pop(int(data["id"]), None)
+            if payload is not None:
+                guild = self._add_guild_from_data(payload)  # type: ignore
+                self._restored_guilds.add(guild.id)
+                return
+        self._add_guild_from_data(data)
+
+    def _restore_snapshot_users(self) -> None:
+        users, self._snapshot_users = self._snapshot_users, []
+        for user in users:
+            self.store_user(user)  # type: ignore
+
+    def _reconcile_restored_guild(self, guild: Guild, data: GuildPayload) -> None:
+        self._restored_guilds.discard(guild.id)
+        # channels and threads are all sent again, and removing them is the
+        # only way to drop the ones deleted while the bot was offline
+        guild._channels.clear()
+        guild._threads.clear()
+
+        # members may have left, joined or changed while the bot was offline.
+        # The restored ones are only kept until a chunk replaces them, and
+        # dropped if they are not part of the chunks.
+        self_id = self.self_id
+        restored = {member_id for member_id in guild._members if member_id != self_id}
+        if not restored:
+            return
+        if not self._intents.members or not self.member_cache_flags.joined:
+            for member_id in restored:
+                guild._remove_member(Object(id=member_id))
+            return
+
+        self._provisional_members[guild.id] = restored
+        if guild.id not in self._refresh_tasks:
+            self._refresh_tasks[guild.id] = self.loop.create_task(
+                self._refresh_restored_members(guild)
+            )
+
+    async def _refresh_restored_members(self, guild: Guild) -> None:
+        _log.debug("Refreshing the restored members of guild ID %s.", guild.id)
+        try:
+            await asyncio.wait_for(self.chunk_guild(guild), timeout=60.0)
+        except asyncio.TimeoutError:
+            _log.warning(
+                "Timed out refreshing the restored members of guild_id %s.", guild.id
+            )
+            self._provisional_members.pop(guild.id, None)
+            return
+        finally:
+            self._refresh_tasks.pop(guild.id, None)
+
+        stale = self._provisional_members.pop(guild.id, ())
+        if stale and self._get_guild(guild.id) is guild:
+            _log.debug(
+                "Removing %d restored members that left guild_id %s.",
+                len(stale),
+                guild.id,
+            )
+            for member_id in stale:
+                guild._remove_member(Object(id=member_id))
+
+    def _refresh_provisional_members(
+        self, guild: Guild, members: list[Member], payloads: list[Any]
+    ) -> None:
+        provisional = self._provisional_members.get(guild.id)
+        if not provisional:
+            return
+        for member, payload in zip(members, payloads):
+            if member.id in provisional:
+                provisional.discard(member.id)
+                # the users were restored from the snapshot as well
+                member._update_inner_user(payload["user"])
+                guild._add_member(member)
+
     def _guild_needs_chunking(self, guild: Guild) -> bool:
         # If presences are enabled then we get back the old guild.large behaviour
         return (
@@ -569,6 +907,7 @@ class ConnectionState:
             raise
 
     async def _delay_ready(self) -> None:
+        scheduler = ChunkScheduler(self)
         try:
             states = []
             while True:
@@ -582,23 +921,15 @@ class ConnectionState:
                     break
                 else:
                     if self._guild_needs_chunking(guild):
-                        future = await self.chunk_guild(guild, wait=False)
-                        states.append((guild, future))
+                        states.append((guild, scheduler.add(guild)))
                     elif guild.unavailable is False:
                         self.dispatch("guild_available", guild)
                     else:
                         self.dispatch("guild_join", guild)
 
+            # the scheduler applies a timeout to every guild
             for guild, future in states:
-                try:
-                    await asyncio.wait_for(future, timeout=5.0)
-                except asyncio.TimeoutError:
-                    _log.warning(
-                        "Shard ID %s timed out waiting for chunks for guild_id %s.",
-                        guild.shard_id,
-                        guild.id,
-                    )
-
+                await future
                 if guild.unavailable is False:
                     self.dispatch("guild_available", guild)
                 else:
@@ -611,7 +942,7 @@ class ConnectionState:
                 pass  # already been deleted somehow
 
         except asyncio.CancelledError:
-            pass
+            scheduler.cancel()
         else:
             # dispatch the event
             self.call_handlers("ready")
@@ -638,8 +969,10 @@ class ConnectionState:
                 # flags will always be present here
                 self.application_flags = ApplicationFlags._from_value(application["flags"])  # type: ignore
 
+        self._restore_snapshot_users()
         for guild_data in data["guilds"]:
-            self._add_guild_from_data(guild_data)
+            self._add_ready_guild(guild_data)
+        self._snapshot = None
 
         self.dispatch("connect")
         self._ready_task = asyncio.create_task(self._delay_ready())
@@ -703,13 +1036,15 @@ class ConnectionState:
         self.dispatch("raw_message_delete", raw)
         if self._messages is not None and found is not None:
             self.dispatch("message_delete", found)
-            self._messages.remove(found)
+            self._messages.pop(found.id)
 
     def parse_message_delete_bulk(self, data) -> None:
         raw = RawBulkMessageDeleteEvent(data)
         if self._messages:
             found_messages = [
-                message for message in self._messages if message.id in raw.message_ids
+                message
+                for message in map(self._messages.get, raw.message_ids)
+                if message is not None
             ]
         else:
             found_messages = []
@@ -719,7 +1054,7 @@ class ConnectionState:
             self.dispatch("bulk_message_delete", found_messages)
             for msg in found_messages:
                 # self._messages won't be None here
-                self._messages.remove(msg)  # type: ignore
+                self._messages.pop(msg.id)  # type: ignore
 
     def parse_message_update(self, data) -> None:
         raw = RawMessageUpdateEvent(data)
@@ -866,6 +1201,7 @@ class ConnectionState:
         ref = self._users.get(user.id)
         if ref:
             ref._update(data)
+        self._reindex_member_names(user.id, user.name, user.global_name)
 
     def parse_invite_create(self, data) -> None:
         invite = Invite.from_gateway(state=self, data=data)
@@ -882,6 +1218,8 @@ class ConnectionState:
             channel = guild.get_channel(channel_id)
             if channel is not None:
                 guild._remove_channel(channel)
+                if self._permission_cache is not None:
+                    self._permission_cache._invalidate_channels((channel_id,))
                 self.dispatch("guild_channel_delete", channel)
 
     def parse_channel_update(self, data) -> None:
@@ -902,6 +1240,8 @@ class ConnectionState:
             if channel is not None:
                 old_channel = copy.copy(channel)
                 channel._update(guild, data)
+                if self._permission_cache is not None:
+                    self._permission_cache._invalidate_channels((channel_id,))
                 self.dispatch("guild_channel_update", old_channel, channel)
             else:
                 _log.debug(
@@ -1183,6 +1523,9 @@ class ConnectionState:
             if guild._member_count is not None:
                 guild._member_count -= 1
 
+            if self._permission_cache is not None:
+                self._permission_cache._invalidate_members(guild._channels, (user.id,))
+
             member = guild.get_member(user.id)
             if member is not None:
                 raw.user = member
@@ -1206,6 +1549,9 @@ class ConnectionState:
             )
             return
 
+        if self._permission_cache is not None:
+            self._permission_cache._invalidate_members(guild._channels, (user_id,))
+
         member = guild.get_member(user_id)
         if member is not None:
             old_member = Member._copy(member)
@@ -1266,11 +1612,20 @@ class ConnectionState:
         self.dispatch("guild_stickers_update", guild, before_stickers, guild.stickers)
 
     def _get_create_guild(self, data):
+        guild_id = int(data["id"])
+        if guild_id in self._restored_guilds:
+            guild = self._get_guild(guild_id)
+            if guild is not None:
+                self._reconcile_restored_guild(guild, data)
+                guild.unavailable = False
+                guild._from_data(data)
+                return guild
+
         if data.get("unavailable") is False:
             # GUILD_CREATE with unavailable in the response
             # usually means that the guild has become available
             # and is therefore in the cache
-            guild = self._get_guild(int(data["id"]))
+            guild = self._get_guild(guild_id)
             if guild is not None:
                 guild.unavailable = False
                 guild._from_data(data)
@@ -1296,6 +1651,33 @@ class ConnectionState:
             return await request.wait()
         return request.get_future()
 
+    def _chunk_lazily(self, guild: Guild) -> None:
+        if guild.id in self._lazy_chunk_tasks or guild.id in self._lazy_chunked:
+            return
+        if guild.chunked:
+            return
+        # partial guilds, e.g. from interactions, cannot be chunked
+        if self._get_guild(guild.id) is not guild:
+            return
+
+        try:
+            task = self.loop.create_task(self._lazy_chunk(guild))
+        except RuntimeError:
+            return
+        self._lazy_chunk_tasks[guild.id] = task
+
+    async def _lazy_chunk(self, guild: Guild) -> None:
+        _log.debug("Chunking guild ID %s in the background.", guild.id)
+        try:
+            await asyncio.wait_for(self.chunk_guild(guild), timeout=60.0)
+        except asyncio.TimeoutError:
+            _log.warning("Timed out waiting for chunks for guild_id %s.", guild.id)
+        else:
+            if self._get_guild(guild.id) is guild:
+                self._lazy_chunked.add(guild.id)
+        finally:
+            self._lazy_chunk_tasks.pop(guild.id, None)
+
     async def _chunk_and_dispatch(self, guild, unavailable):
         try:
             await asyncio.wait_for(self.chunk_guild(guild), timeout=60.0)
@@ -1365,10 +1747,7 @@ class ConnectionState:
 
         # do a cleanup of the messages cache
         if self._messages is not None:
-            self._messages: Deque[Message] | None = deque(
-                (msg for msg in self._messages if msg.guild != guild),
-                maxlen=self.max_messages,
-            )
+            self._messages.remove_where(lambda msg: msg.guild == guild)
 
         self._remove_guild(guild)
         self.dispatch("guild_remove", guild)
@@ -1429,10 +1808,22 @@ class ConnectionState:
         guild._add_role(role)
         self.dispatch("guild_role_create", role)
 
+    def _invalidate_role_permissions(self, guild: Guild, role_id: int) -> None:
+        cache = self._permission_cache
+        if cache is None:
+            return
+        # without the role index every member of the guild may be affected
+        role_members = guild._role_members
+        if role_id == guild.id or role_members is None:
+            cache._invalidate_channels(guild._channels)
+        else:
+            cache._invalidate_members(guild._channels, role_members.get(role_id, ()))
+
     def parse_guild_role_delete(self, data) -> None:
         guild = self._get_guild(int(data["guild_id"]))
         if guild is not None:
             role_id = int(data["role_id"])
+            self._invalidate_role_permissions(guild, role_id)
             try:
                 role = guild._remove_role(role_id)
             except KeyError:
@@ -1454,6 +1845,7 @@ class ConnectionState:
             if role is not None:
                 old_role = copy.copy(role)
                 role._update(role_data)
+                self._invalidate_role_permissions(guild, role_id)
                 self.dispatch("guild_role_update", old_role, role)
         else:
             _log.debug(
@@ -1467,7 +1859,10 @@ class ConnectionState:
         presences = data.get("presences", [])
 
         # the guild won't be None here
-        members = [Member(guild=guild, data=member, state=self) for member in data.get("members", [])]  # type: ignore
+        payloads = data.get("members", [])
+        members = [Member(guild=guild, data=member, state=self) for member in payloads]  # type: ignore
+        if guild is not None:
+            self._refresh_provisional_members(guild, members, payloads)
         _log.debug(
             "Processed a chunk for %s members in guild ID %s.", len(members), guild_id
         )
@@ -1937,73 +2332,51 @@ class AutoShardedConnectionState(ConnectionState):
     async def _delay_ready(self) -> None:
         await self.shards_launched.wait()
         processed = []
-        max_concurrency = len(self.shard_ids) * 2
-        current_bucket = []
-        while True:
-            # this snippet of code is basically waiting N seconds
-            # until the last GUILD_CREATE was sent
-            try:
-                guild = await asyncio.wait_for(
-                    self._ready_state.get(), timeout=self.guild_ready_timeout
-                )
-            except asyncio.TimeoutError:
-                break
-            else:
-                if self._guild_needs_chunking(guild):
-                    _log.debug(
-                        (
-                            "Guild ID %d requires chunking, will be done in the"
-                            " background."
-                        ),
-                        guild.id,
+        scheduler = ChunkScheduler(self)
+        try:
+            while True:
+                # this snippet of code is basically waiting N seconds
+                # until the last GUILD_CREATE was sent
+                try:
+                    guild = await asyncio.wait_for(
+                        self._ready_state.get(), timeout=self.guild_ready_timeout
                     )
-                    if len(current_bucket) >= max_concurrency:
-                        try:
-                            await utils.sane_wait_for(
-                                current_bucket, timeout=max_concurrency * 70.0
-                            )
-                        except asyncio.TimeoutError:
-                            fmt = (
-                                "Shard ID %s failed to wait for chunks from a"
-                                " sub-bucket with length %d"
-                            )
-                            _log.warning(fmt, guild.shard_id, len(current_bucket))
-                        finally:
-                            current_bucket = []
-
-                    # Chunk the guild in the background while we wait for GUILD_CREATE streaming
-                    future = asyncio.ensure_future(self.chunk_guild(guild))
-                    current_bucket.append(future)
-                else:
-                    future = self.loop.create_future()
-                    future.set_result([])
-
-                processed.append((guild, future))
-
-        guilds = sorted(processed, key=lambda g: g[0].shard_id)
-        for shard_id, info in itertools.groupby(guilds, key=lambda g: g[0].shard_id):
-            children, futures = zip(*info)
-            # 110 reqs/minute w/ 1 req/guild plus some buffer
-            timeout = 61 * (len(children) / 110)
-            try:
-                await utils.sane_wait_for(futures, timeout=timeout)
-            except asyncio.TimeoutError:
-                _log.warning(
-                    (
-                        "Shard ID %s failed to wait for chunks (timeout=%.2f) for %d"
-                        " guilds"
-                    ),
-                    shard_id,
-                    timeout,
-                    len(guilds),
-                )
-            for guild in children:
-                if guild.unavailable is False:
-                    self.dispatch("guild_available", guild)
+                except asyncio.TimeoutError:
+                    break
                 else:
-                    self.dispatch("guild_join", guild)
+                    if self._guild_needs_chunking(guild):
+                        _log.debug(
+                            (
+                                "Guild ID %d requires chunking, will be done in the"
+                                " background."
+                            ),
+                            guild.id,
+                        )
+                        # Chunk the guild in the background while we wait for GUILD_CREATE streaming
+                        future = scheduler.add(guild)
+                    else:
+                        future = self.loop.create_future()
+                        future.set_result([])
+
+                    processed.append((guild, future))
+
+            guilds = sorted(processed, key=lambda g: g[0].shard_id)
+            for shard_id, info in itertools.groupby(
+                guilds, key=lambda g: g[0].shard_id
+            ):
+                children, futures = zip(*info)
+                # the scheduler applies a timeout to every guild
+                await asyncio.gather(*futures)
+                for guild in children:
+                    if guild.unavailable is False:
+                        self.dispatch("guild_available", guild)
+                    else:
+                        self.dispatch("guild_join", guild)
 
-            self.dispatch("shard_ready", shard_id)
+                self.dispatch("shard_ready", shard_id)
+        except asyncio.CancelledError:
+            scheduler.cancel()
+            raise
 
         # remove the state
         try:
@@ -2013,6 +2386,9 @@ class AutoShardedConnectionState(ConnectionState):
 
         # clear the current task
         self._ready_task = None
+        # every shard is ready, the rest of the snapshot belongs to guilds
+        # the bot is no longer in
+        self._snapshot = None
 
         # dispatch the event
         self.call_handlers("ready")
@@ -2037,8 +2413,9 @@ class AutoShardedConnectionState(ConnectionState):
                     application["flags"]
                 )
 
+        self._restore_snapshot_users()
         for guild_data in data["guilds"]:
-            self._add_guild_from_data(guild_data)
+            self._add_ready_guild(guild_data)
 
         if self._messages:
             self._update_message_references()
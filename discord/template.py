@@ -51,6 +51,7 @@ class _PartialTemplateState:
     def __init__(self, *, state):
         self.__state = state
         self.http = _FriendlyHttpAttributeErrorHelper()
+        self._permission_cache = None
 
     @property
     def shard_count(self):
@@ -77,6 +78,16 @@ class _PartialTemplateState:
     def _get_message(self, id):
         return None
 
+    def _create_member_cache(self, guild):
+        return {}
+
+    def _create_member_name_index(self, guild_id):
+        return None
+
+    @property
+    def _lazy_chunking(self):
+        return False
+
     def _get_guild(self, id):
         return self.__state._get_guild(id)
 
@@ -40,6 +40,7 @@ Some documentation to refer to:
 from __future__ import annotations
 
 import asyncio
+import collections
 import logging
 import select
 import socket
@@ -85,6 +86,17 @@ __all__ = (
 
 _log = logging.getLogger(__name__)
 
+# one second of silence, gaps in the received audio are written as slices
+# of it instead of building a new buffer of zeros for every packet
+_SILENCE = memoryview(
+    bytes(opus._OpusStruct.SAMPLING_RATE * opus._OpusStruct.SAMPLE_SIZE)
+)
+# the datagrams read from the socket before checking whether the recording
+# was stopped, they are read without waiting while more are available
+_MAX_DATAGRAMS_PER_WAKEUP = 64
+# the decoded frames kept per SSRC while its user is not known yet
+_MAX_PENDING_FRAMES = 250
+
 
 class VoiceProtocol:
     """A class that represents the Discord voice protocol.
@@ -256,11 +268,17 @@ class VoiceClient(VoiceProtocol):
         self.encoder: Encoder = MISSING
         self.decoder = None
         self._lite_nonce: int = 0
+        self._decrypt_key: list[int] | None = None
+        self._decrypt_box = None
+        self._decrypt_nonce: bytearray = bytearray(24)
+        self._decryptor_mode: str | None = None
+        self._decryptor: Callable[[bytes, memoryview], bytes] | None = None
         self.ws: DiscordVoiceWebSocket = MISSING
 
         self.paused = False
         self.recording = False
         self.user_timestamps = {}
+        self.first_packet_timestamp: float | None = None
         self.sink = None
         self.starting_time = None
         self.stopping_time = None
@@ -585,26 +603,45 @@ class VoiceClient(VoiceProtocol):
 
         return header + box.encrypt(bytes(data), bytes(nonce)).ciphertext + nonce[:4]
 
+    def _get_decrypt_box(self):
+        # the box is only rebuilt when a new session description replaced
+        # the key, not for every received packet
+        key = self.secret_key
+        if self._decrypt_key is not key:
+            self._decrypt_box = nacl.secret.SecretBox(bytes(key))
+            self._decrypt_key = key
+        return self._decrypt_box
+
+    def _get_decryptor(self):
+        mode = self.mode
+        if self._decryptor_mode != mode:
+            self._decryptor = getattr(self, f"_decrypt_{mode}")
+            self._decryptor_mode = mode
+            self._decrypt_nonce = bytearray(24)
+        return self._decryptor
+
     def _decrypt_xsalsa20_poly1305(self, header, data):
-        box = nacl.secret.SecretBox(bytes(self.secret_key))
+        box = self._get_decrypt_box()
 
-        nonce = bytearray(24)
+        # packets are decrypted on the receiving thread only, so the
+        # nonce buffer can be reused
+        nonce = self._decrypt_nonce
         nonce[:12] = header
 
         return self.strip_header_ext(box.decrypt(bytes(data), bytes(nonce)))
 
     def _decrypt_xsalsa20_poly1305_suffix(self, header, data):
-        box = nacl.secret.SecretBox(bytes(self.secret_key))
+        box = self._get_decrypt_box()
 
         nonce_size = nacl.secret.SecretBox.NONCE_SIZE
-        nonce = data[-nonce_size:]
+        nonce = bytes(data[-nonce_size:])
 
         return self.strip_header_ext(box.decrypt(bytes(data[:-nonce_size]), nonce))
 
     def _decrypt_xsalsa20_poly1305_lite(self, header, data):
-        box = nacl.secret.SecretBox(bytes(self.secret_key))
+        box = self._get_decrypt_box()
 
-        nonce = bytearray(24)
+        nonce = self._decrypt_nonce
         nonce[:4] = data[-4:]
         data = data[:-4]
 
@@ -737,14 +774,25 @@ class VoiceClient(VoiceProtocol):
         if self.paused:
             return
 
-        data = RawData(data, self)
+        data = RawData(data, self, self._get_decryptor())
 
         if data.decrypted_data == b"\xf8\xff\xfe":  # Frame of silence
             return
 
+        # set here rather than by the decoders, which may finish an earlier
+        # packet after a later one
+        if self.first_packet_timestamp is None:
+            self.first_packet_timestamp = data.receive_time
         self.decoder.decode(data)
 
-    def start_recording(self, sink, callback, *args, sync_start: bool = False):
+    def start_recording(
+        self,
+        sink,
+        callback,
+        *args,
+        sync_start: bool = False,
+        decode_workers: int | None = None,
+    ):
         """The bot will begin recording audio from the current voice channel it is in.
         This function uses a thread so the current code line will not be stopped.
         Must be in a voice channel to use.
@@ -763,6 +811,12 @@ class VoiceClient(VoiceProtocol):
         sync_start: :class:`bool`
             If True, the recordings of subsequent users will start with silence.
             This is useful for recording audio just as it was heard.
+        decode_workers: Optional[:class:`int`]
+            The number of threads decoding the received audio. Each speaker is
+            decoded by a single thread, so more threads let more speakers be
+            decoded in parallel. Defaults to the number of CPUs, up to 4.
+
+            .. versionadded:: 2.6
 
         Raises
         ------
@@ -782,8 +836,10 @@ class VoiceClient(VoiceProtocol):
 
         self.empty_socket()
 
-        self.decoder = opus.DecodeManager(self)
+        self.decoder = opus.DecodeManager(self, workers=decode_workers)
         self.decoder.start()
+        self._timestamp_lock = threading.Lock()
+        self._pending_audio: dict[int, collections.deque] = {}
         self.recording = True
         self.sync_start = sync_start
         self.sink = sink
@@ -846,7 +902,7 @@ class VoiceClient(VoiceProtocol):
 
         self.user_timestamps: dict[int, tuple[int, float]] = {}
         self.starting_time = time.perf_counter()
-        self.first_packet_timestamp: float
+        self.first_packet_timestamp = None
         while self.recording:
             ready, _, err = select.select([self.socket], [], [self.socket], 0.01)
             if not ready:
@@ -854,15 +910,23 @@ class VoiceClient(VoiceProtocol):
                     print(f"Socket error: {err}")
                 continue
 
-            try:
-                data = self.socket.recv(4096)
-            except OSError:
-                self.stop_recording()
-                continue
+            # read every datagram that arrived since the last wakeup instead
+            # of going back to select for each one
+            for _ in range(_MAX_DATAGRAMS_PER_WAKEUP):
+                if not self.recording:
+                    break
+                try:
+                    data = self.socket.recv(4096)
+                except BlockingIOError:
+                    break
+                except OSError:
+                    self.stop_recording()
+                    break
 
-            self.unpack_audio(data)
+                self.unpack_audio(data)
 
         self.stopping_time = time.perf_counter()
+        self._flush_pending_audio()
         self.sink.cleanup()
         callback = asyncio.run_coroutine_threadsafe(callback(sink, *args), self.loop)
         result = callback.result()
@@ -871,15 +935,56 @@ class VoiceClient(VoiceProtocol):
             print(result)
 
     def recv_decoded_audio(self, data: RawData):
+        # the decoder threads share the timestamps of the first packet
+        with self._timestamp_lock:
+            silence = self._get_silence(data)
+
+        ssrc = data.ssrc
+        info = self.ws.ssrc_map.get(ssrc)
+        pending = self._pending_audio.get(ssrc)
+        if info is None:
+            # the speaking event naming the user of this SSRC has not arrived
+            # yet, keep the audio until it does instead of stalling the decoder
+            if pending is None:
+                pending = collections.deque(maxlen=_MAX_PENDING_FRAMES)
+                self._pending_audio[ssrc] = pending
+            pending.append((silence, data.decoded_data))
+            return
+
+        user = info["user_id"]
+        if pending is not None:
+            del self._pending_audio[ssrc]
+            for frame_silence, pcm in pending:
+                self._write_audio(user, frame_silence, pcm)
+        self._write_audio(user, silence, data.decoded_data)
+
+    def _write_audio(self, user: int, silence: float, pcm: bytes) -> None:
+        size = max(0, int(silence)) * opus._OpusStruct.SAMPLE_SIZE
+        while size > 0:
+            chunk = min(size, len(_SILENCE))
+            self.sink.write(_SILENCE[:chunk], user)
+            size -= chunk
+        self.sink.write(pcm, user)
+
+    def _flush_pending_audio(self) -> None:
+        # called once the decoders stopped, for SSRCs whose user became known
+        # after their last frame was decoded
+        for ssrc, pending in list(self._pending_audio.items()):
+            info = self.ws.ssrc_map.get(ssrc)
+            if info is None:
+                _log.debug("Dropping %d frames of unknown SSRC %s", len(pending), ssrc)
+                continue
+            for silence, pcm in pending:
+                self._write_audio(info["user_id"], silence, pcm)
+        self._pending_audio.clear()
+
+    def _get_silence(self, data: RawData) -> float:
         # Add silence when they were not being recorded.
         if data.ssrc not in self.user_timestamps:  # First packet from user
-            if (
-                not self.user_timestamps or not self.sync_start
-            ):  # First packet from anyone
-                self.first_packet_timestamp = data.receive_time
+            if not self.sync_start:
                 silence = 0
 
-            else:  # Previously received a packet from someone else
+            else:  # Align with the first packet received from anyone
                 silence = (
                     (data.receive_time - self.first_packet_timestamp) * 48000
                 ) - 960
@@ -898,15 +1003,7 @@ class VoiceClient(VoiceProtocol):
                 silence = dT - 960
 
         self.user_timestamps.update({data.ssrc: (data.timestamp, data.receive_time)})
-
-        data.decoded_data = (
-            struct.pack("<h", 0) * max(0, int(silence)) * opus._OpusStruct.CHANNELS
-            + data.decoded_data
-        )
-
-        while data.ssrc not in self.ws.ssrc_map:
-            time.sleep(0.05)
-        self.sink.write(data.decoded_data, self.ws.ssrc_map[data.ssrc]["user_id"])
+        return silence
 
     def is_playing(self) -> bool:
         """Indicates if we're currently playing audio."""
@@ -0,0 +1,218 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import discord
+from discord.cache import (
+    CacheBackend,
+    CachePolicy,
+    LRUCache,
+    MessageCache,
+    PermissionCache,
+)
+from discord.member import Member, MemberStore
+
+
+def _message(id: int, channel_id: int = 1) -> SimpleNamespace:
+    return SimpleNamespace(id=id, channel=SimpleNamespace(id=channel_id))
+
+
+def test_message_cache_evicts_oldest() -> None:
+    cache = MessageCache(3)
+    messages = [_message(i) for i in range(5)]
+    for message in messages:
+        cache.append(message)
+
+    assert len(cache) == 3
+    assert list(cache) == messages[2:]
+    assert cache.get(0) is None
+    assert cache.get(4) is messages[4]
+    assert cache[0] is messages[2]
+    assert cache[-1] is messages[4]
+    with pytest.raises(IndexError):
+        cache[3]
+
+
+def test_message_cache_remove() -> None:
+    cache = MessageCache(10)
+    first, second = _message(1), _message(2)
+    cache.append(first)
+    cache.append(second)
+
+    assert cache.pop(1) is first
+    assert cache.pop(1) is None
+    assert first not in cache
+    with pytest.raises(ValueError):
+        cache.remove(first)
+
+    cache.remove(second)
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize("channel_index", [True, False])
+def test_message_cache_channel_messages(channel_index: bool) -> None:
+    cache = MessageCache(3, channel_index=channel_index)
+    for i in range(4):
+        cache.append(_message(i, channel_id=i % 2))
+
+    assert [m.id for m in cache.channel_messages(0)] == [2]
+    assert [m.id for m in cache.channel_messages(1)] == [1, 3]
+
+    cache.remove_where(lambda m: m.channel.id == 1)
+    assert cache.channel_messages(1) == []
+    assert [m.id for m in cache] == [2]
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    evicted = []
+    cache = LRUCache(3, pinned=(0,), on_evict=evicted.append)
+    cache[0] = "self"
+    cache[1] = "a"
+    cache[2] = "b"
+    cache[3] = "c"
+
+    assert list(cache) == [0, 2, 3]
+    assert evicted == ["a"]
+
+    cache[2]
+    cache[4] = "d"
+    assert list(cache) == [0, 2, 4]
+    assert evicted == ["a", "c"]
+
+
+def test_lru_cache_expires(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 100.0
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache = LRUCache(expire_after=10)
+    cache[1] = "a"
+    now = 105.0
+    cache[2] = "b"
+    now = 111.0
+
+    assert 1 not in cache
+    assert cache[2] == "b"
+    assert len(cache) == 1
+
+
+def test_cache_policy_backends() -> None:
+    assert isinstance(CacheBackend.unbounded()._create(), dict)
+    assert isinstance(CacheBackend.lru(10)._create(), LRUCache)
+    assert CacheBackend.none()._create_message_cache(channel_index=False) is None
+    with pytest.raises(ValueError):
+        CachePolicy(guilds=CacheBackend.none())
+
+
+def _member_store(count: int) -> MemberStore:
+    client = discord.Client(intents=discord.Intents.none())
+    state = client._connection
+    guild = SimpleNamespace(id=1)
+    store = MemberStore(guild, state, hot=2)
+    for i in range(1, count + 1):
+        data = {
+            "user": {
+                "id": str(i),
+                "username": f"user{i}",
+                "discriminator": "0",
+                "avatar": None,
+            },
+            "roles": ["10"] if i % 2 else [],
+            "joined_at": "2024-01-02T03:04:05.123456+00:00",
+            "nick": None,
+        }
+        store[i] = Member(data=data, guild=guild, state=state)
+    return store
+
+
+def test_member_store_round_trips_members() -> None:
+    store = _member_store(5)
+
+    store[1].nick = "changed"
+    store[2], store[3]  # evict member 1, writing it back
+    assert 1 not in store._hot
+    assert store[1].nick == "changed"
+    assert store[1].joined_at.microsecond == 123456
+    assert store[4].name == "user4"
+
+    assert sorted(m.id for m in store.with_role(10)) == [1, 3, 5]
+    del store[2]
+    assert len(store) == 4
+    assert sorted(m.id for m in store.values()) == [1, 3, 4, 5]
+    assert store.get(2) is None
+
+
+def test_member_store_keeps_live_members() -> None:
+    store = _member_store(5)
+
+    member = store[1]
+    store[2], store[3]
+    assert 1 not in store._hot
+    # updated while evicted, then looked up and kept again
+    member.nick = "changed"
+    assert store[1] is member
+    assert member in store.values()
+    assert [m for m in store.with_role(10) if m.id == 1] == [member]
+
+    store[2], store[3]
+    del member
+    assert 1 not in store._live
+    assert store[1].nick == "changed"
+    # cold members are only created once while they are referenced
+    values = store.values()
+    assert len(values) == 5
+    first = list(values)
+    assert all(a is b for a, b in zip(first, values))
+
+
+def test_cache_policy_compact_members() -> None:
+    with pytest.raises(ValueError):
+        CachePolicy(compact_members=True, members=CacheBackend.lru(10))
+
+
+def test_permission_cache_evicts_least_recently_used() -> None:
+    cache = PermissionCache(maxsize=2)
+    overwrites = []
+    first, second, third = (SimpleNamespace(id=i, _roles=[]) for i in range(3))
+    cache._set(50, overwrites, first, 1)
+    cache._set(50, overwrites, second, 2)
+    assert cache._get(50, overwrites, first) == 1
+
+    cache._set(51, overwrites, third, 3)
+    assert len(cache) == 2
+    assert cache._get(50, overwrites, second) is None
+    assert cache._get(50, overwrites, first) == 1
+    assert cache._get(51, overwrites, third) == 3
+
+    # invalidated entries do not take up room
+    cache._invalidate_channels((51,))
+    cache._set(50, overwrites, second, 2)
+    assert cache._get(50, overwrites, first) == 1
+    assert cache._get(50, overwrites, second) == 2
+    assert len(cache._recent) == len(cache) == 2
+
+    with pytest.raises(ValueError):
+        CachePolicy(permission_cache_size=0)
@@ -0,0 +1,167 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import discord
+
+
+def _message(message_id: int, channel_id: int, author_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=message_id,
+        channel=SimpleNamespace(id=channel_id),
+        author=SimpleNamespace(id=author_id),
+    )
+
+
+async def test_wait_for_keys() -> None:
+    client = discord.Client(intents=discord.Intents.none())
+    first = asyncio.ensure_future(client.wait_for("message", channel_id=1, user_id=2))
+    second = asyncio.ensure_future(
+        client.wait_for("message", channel_id=1, check=lambda m: m.id == 11)
+    )
+    await asyncio.sleep(0)
+
+    client.dispatch("message", _message(10, 1, 3))
+    client.dispatch("message", _message(11, 1, 2))
+    assert (await first).id == 11
+    assert (await second).id == 11
+    assert not client._keyed_listeners
+
+
+async def test_wait_for_keys_timeout_cleans_up() -> None:
+    client = discord.Client(intents=discord.Intents.none())
+    with pytest.raises(asyncio.TimeoutError):
+        await client.wait_for("reaction_add", message_id=1, timeout=0.01)
+    assert not client._keyed_listeners
+
+    with pytest.raises(TypeError):
+        client.wait_for("message", custom_id="confirm")
+
+
+async def test_event_workers() -> None:
+    client = discord.Client(intents=discord.Intents.none(), event_workers=2)
+    calls = []
+    errors = []
+
+    @client.listen("on_message")
+    async def first(message):
+        calls.append(("first", message))
+        raise RuntimeError
+
+    @client.listen("on_message", once=True)
+    async def second(message):
+        calls.append(("second", message))
+
+    @client.event
+    async def on_error(event_method, *args, **kwargs):
+        errors.append(event_method)
+
+    client.dispatch("message", 1)
+    client.dispatch("message", 2)
+    await asyncio.sleep(0.01)
+
+    assert calls == [("first", 1), ("second", 1), ("first", 2)]
+    assert errors == ["on_message", "on_message"]
+    assert len(client._event_worker_tasks) == 2
+
+    client._stop_event_workers()
+
+
+async def test_dispatch_limits() -> None:
+    limits = discord.DispatchLimits(
+        per_event={"message": 1}, max_queue=2, overflow="drop_oldest"
+    )
+    client = discord.Client(intents=discord.Intents.none(), dispatch_limits=limits)
+    release = asyncio.Event()
+    seen = []
+
+    @client.listen("on_message")
+    async def handler(message):
+        seen.append(message)
+        await release.wait()
+
+    for i in range(4):
+        client.dispatch("message", i)
+    await asyncio.sleep(0)
+
+    stats = client.dispatch_stats
+    assert (stats.running, stats.queued) == (1, 2)
+    assert stats.dropped == {"message": 1}
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert seen == [0, 2, 3]
+    assert client.dispatch_stats.running == 0
+
+
+async def test_event_workers_release_their_slots_on_close() -> None:
+    limits = discord.DispatchLimits(max_concurrency=3)
+    client = discord.Client(
+        intents=discord.Intents.none(), event_workers=1, dispatch_limits=limits
+    )
+    release = asyncio.Event()
+    seen = []
+
+    @client.listen("on_message")
+    async def handler(message):
+        seen.append(message)
+        await release.wait()
+
+    for i in range(5):
+        client.dispatch("message", i)
+    await asyncio.sleep(0)
+    stats = client.dispatch_stats
+    assert (stats.running, stats.queued) == (3, 2)
+
+    await client.close()
+    await asyncio.sleep(0)
+    stats = client.dispatch_stats
+    assert (stats.running, stats.queued) == (0, 0)
+    assert seen == [0]
+
+    # events dispatched after close do not start the workers again
+    release.set()
+    client.dispatch("message", 5)
+    await asyncio.sleep(0)
+    assert seen == [0, 5]
+    assert client._event_queue is None
+    assert not client._event_worker_tasks
+    assert client.dispatch_stats.running == 0
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"max_queue": 0, "overflow": "drop_oldest"},
+        {"max_concurrency": 0},
+        {"per_event": {"message": 0}},
+    ],
+)
+def test_dispatch_limits_reject_empty_limits(kwargs) -> None:
+    with pytest.raises(ValueError):
+        discord.DispatchLimits(**kwargs)
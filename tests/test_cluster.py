@@ -0,0 +1,282 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import functools
+import json
+import zlib
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+
+import discord
+from discord import Cluster, ClusterManager
+from discord.errors import ClientException
+from discord.http import Route
+
+
+class FakeClient:
+    def __init__(self, shard_ids):
+        self.guilds = [object()] * len(shard_ids)
+        self.latencies = [(shard_id, 0.1) for shard_id in shard_ids]
+        self.dispatched = []
+        self._hooks = {}
+
+    def dispatch(self, event, *args):
+        self.dispatched.append((event, *args))
+
+    def is_closed(self):
+        return True
+
+
+@pytest.fixture
+async def clusters():
+    manager = ClusterManager(
+        None, token="token", shard_count=4, clusters=2, allow_eval=True
+    )
+    manager.max_concurrency = 1
+    manager._split_shards()
+    await manager._serve()
+
+    connected = []
+    for cluster_id, shard_ids in manager.cluster_shards.items():
+        cluster = Cluster(
+            FakeClient(shard_ids),
+            cluster_id=cluster_id,
+            cluster_count=2,
+            shard_ids=shard_ids,
+            shard_count=4,
+            allow_eval=True,
+        )
+        await cluster.connect(manager.host, manager.port, manager._secret)
+        connected.append(cluster)
+
+    while len(manager._peers) < 2:
+        await asyncio.sleep(0.01)
+    yield manager, connected
+
+    for cluster in connected:
+        await cluster.close()
+    await manager.close()
+
+
+async def test_cluster_queries(clusters) -> None:
+    manager, (first, second) = clusters
+    assert manager.cluster_shards == {0: [0, 1], 1: [2, 3]}
+
+    assert await first.fetch_guild_count() == 4
+    assert await second.fetch_latencies() == [(i, 0.1) for i in range(4)]
+    assert await manager.broadcast_eval("cluster.id * 10") == [0, 10]
+
+    await second.broadcast("reload", {"cog": "general"})
+    assert first.client.dispatched == [
+        ("cluster_message", "reload", {"cog": "general"})
+    ]
+
+    with pytest.raises(ClientException):
+        await first.broadcast_eval("1 / 0")
+
+
+async def test_cluster_identify_is_coordinated(clusters, monkeypatch) -> None:
+    monkeypatch.setattr("discord.cluster.IDENTIFY_INTERVAL", 0.2)
+    manager, (first, second) = clusters
+    loop = asyncio.get_running_loop()
+    hook = first.client._hooks["before_identify"]
+
+    start = loop.time()
+    await hook(0, initial=True)
+    await second.client._hooks["before_identify"](2, initial=True)
+    assert loop.time() - start >= 0.15
+
+
+async def test_cluster_eval_is_opt_in(clusters) -> None:
+    manager, (first, _) = clusters
+    manager.allow_eval = False
+    with pytest.raises(ClientException):
+        await manager.broadcast_eval("1")
+    with pytest.raises(ClientException):
+        await first.broadcast_eval("1")
+
+    # clusters refuse it on their own as well
+    manager.allow_eval = True
+    first.allow_eval = False
+    with pytest.raises(ClientException):
+        await manager.broadcast_eval("1")
+
+
+def test_crashed_clusters_are_restarted_with_backoff(monkeypatch) -> None:
+    manager = ClusterManager(None, token="token", max_restarts=2)
+    spawned = []
+
+    def spawn(cluster_id):
+        spawned.append(cluster_id)
+        manager._processes[cluster_id] = SimpleNamespace(exitcode=1)
+        manager._started_at[cluster_id] = now
+
+    monkeypatch.setattr(manager, "_spawn", spawn)
+    now = 0.0
+    spawn(0)
+    spawned.clear()
+
+    restarted_at = []
+    for _ in range(20):
+        manager._supervise(now)
+        if spawned:
+            restarted_at.append(now)
+            spawned.clear()
+        now += 0.5
+    # restarted 1 and then 2 seconds after crashing, then given up on
+    assert restarted_at == [1.0, 3.5]
+    assert not manager._processes
+    assert not manager._restart_at
+
+    # a cluster that ran for long enough starts over
+    manager._crashes[0] = 2
+    spawn(0)
+    manager._supervise(now + 300.0)
+    assert manager._restart_at == {0: now + 301.0}
+
+
+_ME = {"id": "1", "username": "bot", "discriminator": "0", "avatar": None}
+
+
+class FakeGateway:
+    """Serves the HTTP routes and the gateway used by a sharded client."""
+
+    def __init__(self) -> None:
+        self.identified: list[list[int]] = []
+        self.url: str = ""
+        self._runner: web.AppRunner | None = None
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/api/v10/users/@me", self._me)
+        app.router.add_get("/api/v10/gateway/bot", self._gateway_bot)
+        app.router.add_get("/gateway", self._gateway)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def close(self) -> None:
+        await self._runner.cleanup()
+
+    @staticmethod
+    def _json(data: dict) -> web.Response:
+        # the client only decodes this exact content type
+        return web.Response(
+            body=json.dumps(data).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+
+    async def _me(self, request: web.Request) -> web.Response:
+        return self._json(_ME)
+
+    async def _gateway_bot(self, request: web.Request) -> web.Response:
+        return self._json(
+            {
+                "url": self.url.replace("http", "ws") + "/gateway",
+                "shards": 4,
+                "session_start_limit": {
+                    "total": 1000,
+                    "remaining": 1000,
+                    "reset_after": 0,
+                    "max_concurrency": 4,
+                },
+            }
+        )
+
+    async def _gateway(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        compressor = zlib.compressobj()
+
+        async def send(payload: dict) -> None:
+            data = compressor.compress(json.dumps(payload).encode())
+            await ws.send_bytes(data + compressor.flush(zlib.Z_SYNC_FLUSH))
+
+        await send({"op": 10, "d": {"heartbeat_interval": 45000}})
+        async for message in ws:
+            payload = json.loads(message.data)
+            if payload["op"] == 1:
+                await send({"op": 11})
+            elif payload["op"] == 2:
+                shard = payload["d"]["shard"]
+                self.identified.append(shard)
+                ready = {
+                    "v": 10,
+                    "user": _ME,
+                    "guilds": [],
+                    "session_id": f"session{shard[0]}",
+                    "resume_gateway_url": self.url.replace("http", "ws"),
+                    "shard": shard,
+                    "application": {"id": "1", "flags": 0},
+                }
+                await send({"op": 0, "t": "READY", "s": 1, "d": ready})
+        return ws
+
+
+def _fake_gateway_client(base: str, **options) -> discord.AutoShardedClient:
+    # runs in the cluster processes
+    Route.base = property(lambda self: base)
+    return discord.AutoShardedClient(intents=discord.Intents.none(), **options)
+
+
+async def test_cluster_manager_end_to_end(monkeypatch) -> None:
+    gateway = FakeGateway()
+    await gateway.start()
+    base = gateway.url + "/api/v10"
+    monkeypatch.setattr(Route, "base", property(lambda self: base))
+
+    manager = ClusterManager(
+        functools.partial(_fake_gateway_client, base),
+        token="token",
+        clusters=2,
+    )
+    task = asyncio.create_task(manager.start())
+    try:
+
+        async def wait_for_clusters() -> None:
+            while len(gateway.identified) < 4 or len(manager._peers) < 2:
+                assert not task.done()
+                await asyncio.sleep(0.05)
+
+        await asyncio.wait_for(wait_for_clusters(), 60.0)
+        assert manager.shard_count == 4
+        assert manager.max_concurrency == 4
+        assert sorted(gateway.identified) == [[i, 4] for i in range(4)]
+        assert await manager.fetch_guild_count() == 0
+        assert [shard_id for shard_id, _ in await manager.fetch_latencies()] == [
+            0,
+            1,
+            2,
+            3,
+        ]
+    finally:
+        await manager.close()
+        await asyncio.wait_for(task, 10.0)
+        await gateway.close()
@@ -0,0 +1,136 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import zlib
+from collections import defaultdict
+
+import pytest
+
+import discord
+from discord.gateway import DiscordWebSocket, _ZlibStreamDecompressor
+
+
+def _compress_stream(*payloads: bytes) -> list[bytes]:
+    compressor = zlib.compressobj()
+    return [
+        compressor.compress(p) + compressor.flush(zlib.Z_SYNC_FLUSH) for p in payloads
+    ]
+
+
+def test_zlib_stream_single_frames() -> None:
+    decompressor = _ZlibStreamDecompressor()
+    first, second = _compress_stream(b'{"op":10}', b'{"op":11}')
+
+    assert decompressor.decompress(first) == b'{"op":10}'
+    assert decompressor.decompress(second) == b'{"op":11}'
+
+
+def test_zlib_stream_split_frames() -> None:
+    decompressor = _ZlibStreamDecompressor()
+    (message,) = _compress_stream(b'{"t":"GUILD_CREATE","d":{}}' * 50)
+
+    assert decompressor.decompress(message[:5]) is None
+    assert decompressor.decompress(message[5:]) == b'{"t":"GUILD_CREATE","d":{}}' * 50
+    assert not decompressor._buffer
+
+
+def _dispatch_ws(client: discord.Client) -> tuple[DiscordWebSocket, list, list]:
+    ws = DiscordWebSocket(None, loop=asyncio.get_running_loop())
+    parsed = []
+    dispatched = []
+    ws._connection = client._connection
+    ws._discord_parsers = defaultdict(lambda: parsed.append)
+    ws._dispatch = lambda *args: dispatched.append(args)
+    ws.shard_id = None
+    ws._skip_unhandled_events = True
+    return ws, parsed, dispatched
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        '{"t":"TYPING_START","s":42,"op":0,"d":{"s":1,"t":"MESSAGE_CREATE"}}',
+        '{"op":0,"d":{"s":1,"t":"MESSAGE_CREATE"},"s":42,"t":"TYPING_START"}',
+        '{"t":"TYPING_START","op":0,"d":{"x":{"s":1},"y":[1]},"s":42}',
+        '{"s":42,"op":0,"d":{"t":"MESSAGE_CREATE","x":{"s":1}},"t":"TYPING_START"}',
+    ],
+)
+@pytest.mark.parametrize("compress", [False, True])
+async def test_unhandled_events_are_skipped(payload: str, compress: bool) -> None:
+    ws, parsed, dispatched = _dispatch_ws(discord.Client())
+
+    if compress:
+        (message,) = _compress_stream(payload.encode())
+        await ws.received_message(message)
+    else:
+        await ws.received_message(payload)
+    assert not parsed
+    assert ws.sequence == 42
+    assert dispatched == [("socket_event_type", "TYPING_START")]
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        # the event is handled
+        '{"t":"MESSAGE_CREATE","s":42,"op":0,"d":{}}',
+        # the event updates the cache
+        '{"t":"PRESENCE_UPDATE","s":42,"op":0,"d":{}}',
+        # the keys of "d" must not be mistaken for the top level ones
+        '{"op":0,"d":{"t":"TYPING_START","s":1},"s":42,"t":"MESSAGE_CREATE"}',
+        '{"op":0,"d":{"x":{"t":"TYPING_START","s":1}},"s":42,"t":"MESSAGE_CREATE"}',
+        # the keys cannot be peeked at
+        '{"t": "TYPING_START", "s": 42, "op": 0, "d": {}}',
+        '{"op":0,"d":{},"s":42,"x":"' + "x" * 200 + '","t":"TYPING_START"}',
+    ],
+)
+async def test_events_are_parsed(payload: str) -> None:
+    ws, parsed, _ = _dispatch_ws(discord.Client())
+
+    await ws.received_message(payload)
+    assert len(parsed) == 1
+    assert ws.sequence == 42
+
+
+async def test_events_with_listeners_are_parsed() -> None:
+    client = discord.Client()
+
+    @client.event
+    async def on_typing(channel, user, when):
+        pass
+
+    ws, parsed, _ = _dispatch_ws(client)
+    await ws.received_message('{"t":"TYPING_START","s":42,"op":0,"d":{}}')
+    assert len(parsed) == 1
+    assert ws.sequence == 42
+
+    # so are the events waited for with DiscordWebSocket.wait_for
+    ws, parsed, _ = _dispatch_ws(discord.Client())
+    ws.wait_for("TYPING_START", lambda data: True)
+    await ws.received_message('{"t":"TYPING_START","s":43,"op":0,"d":{}}')
+    assert len(parsed) == 1
+    assert ws.sequence == 43
@@ -0,0 +1,157 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import discord.http
+from discord.http import (
+    GlobalRatelimiter,
+    HTTPClient,
+    Ratelimit,
+    Route,
+    SharedGlobalRatelimiter,
+)
+from discord.metrics import HTTPMetrics
+
+
+def _response(limit: int, remaining: int, reset_after: float) -> SimpleNamespace:
+    return SimpleNamespace(
+        headers={
+            "X-Ratelimit-Limit": str(limit),
+            "X-Ratelimit-Remaining": str(remaining),
+            "X-Ratelimit-Reset-After": str(reset_after),
+        }
+    )
+
+
+async def test_ratelimit_serializes_until_limit_is_known() -> None:
+    ratelimit = Ratelimit(asyncio.get_running_loop())
+    await ratelimit.acquire()
+
+    second = asyncio.ensure_future(ratelimit.acquire())
+    await asyncio.sleep(0)
+    assert not second.done()
+
+    ratelimit.update(_response(5, 4, 10.0), use_clock=False)
+    await asyncio.sleep(0)
+    assert second.done()
+    assert ratelimit.outgoing == 2
+    assert ratelimit.remaining == 3
+
+
+async def test_ratelimit_waits_for_reset() -> None:
+    ratelimit = Ratelimit(asyncio.get_running_loop())
+    await ratelimit.acquire()
+    ratelimit.update(_response(1, 0, 0.05), use_clock=False)
+    ratelimit.release()
+
+    waiter = asyncio.ensure_future(ratelimit.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    await asyncio.wait_for(waiter, timeout=1)
+    assert ratelimit.outgoing == 1
+
+
+async def test_global_ratelimiter_spreads_bursts() -> None:
+    limiter = GlobalRatelimiter(5, per=0.1)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(7):
+        await limiter.acquire()
+
+    # the first 5 are a burst, the other 2 are spaced by per / rate
+    assert loop.time() - start >= 0.035
+
+
+async def test_shared_global_ratelimiter(tmp_path, monkeypatch) -> None:
+    # keep every call within the same window
+    clock = SimpleNamespace(time=lambda: 1800.0, monotonic=time.monotonic)
+    monkeypatch.setattr(discord.http, "time", clock)
+    path = str(tmp_path / "global")
+    first = SharedGlobalRatelimiter(path, 2, per=3600)
+    second = SharedGlobalRatelimiter(path, 2, per=3600)
+    await first.acquire()
+    await second.acquire()
+
+    assert first._try_take() == 1800.0
+    assert second._try_take() == 1800.0
+
+
+def test_shared_global_ratelimiter_does_not_block_on_the_lock(tmp_path) -> None:
+    fcntl = pytest.importorskip("fcntl")
+    path = str(tmp_path / "global")
+    limiter = SharedGlobalRatelimiter(path, 2)
+    with open(path, "rb") as other:
+        fcntl.flock(other, fcntl.LOCK_EX)
+        assert limiter._try_take() == limiter._LOCK_RETRY
+    assert limiter._try_take() == 0.0
+
+
+async def test_coalesced_get_shares_one_call() -> None:
+    assert HTTPClient()._inflight is None
+    http = HTTPClient(coalesce_requests=True)
+    calls = []
+
+    async def _request(route, **kwargs):
+        calls.append(route.url)
+        await asyncio.sleep(0.01)
+        return {"id": "1", "content": "hi"}
+
+    http._request = _request
+    route = Route("GET", "/channels/{channel_id}/messages/1", channel_id=1)
+    first, second = await asyncio.gather(http.request(route), http.request(route))
+
+    assert len(calls) == 1
+    assert first == second
+    assert first is not second
+    assert not http._inflight
+
+
+def test_http_metrics_prometheus() -> None:
+    metrics = HTTPMetrics(buckets=(0.1, 1.0))
+    path = "/channels/{channel_id}/messages"
+    metrics.record_request("POST", path, 200, 0.05, 10, 100)
+    metrics.record_request("POST", path, 429, 0.5, 10, 50)
+    metrics.record_ratelimited("POST", path, "abc:1", 1.0, False)
+    metrics.record_retry("POST", path, 429)
+
+    assert metrics.latency_histogram("POST", path) == [
+        (0.1, 1),
+        (1.0, 2),
+        (float("inf"), 2),
+    ]
+    text = metrics.to_prometheus()
+    assert (
+        'pycord_http_requests_total{method="POST",'
+        'route="/channels/{channel_id}/messages",status="429"} 1'
+    ) in text
+    assert (
+        'pycord_http_bytes_sent_total{method="POST",'
+        'route="/channels/{channel_id}/messages"} 20'
+    ) in text
+    assert "pycord_http_global_wait_seconds_total 0.0" in text
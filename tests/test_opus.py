@@ -0,0 +1,276 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import socket
+import struct
+import threading
+import time
+from types import SimpleNamespace
+
+from discord.opus import DecodeManager, _JitterBuffer
+from discord.sinks import RawData
+from discord.voice_client import VoiceClient
+
+
+class FakeDecoder:
+    def decode(self, data: bytes) -> bytes:
+        return data * 2
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.received = []
+        self.threads = set()
+
+    def recv_decoded_audio(self, data: RawData) -> None:
+        self.received.append((data.ssrc, data.sequence, data.decoded_data))
+        self.threads.add(threading.current_thread().name)
+
+
+def _frame(ssrc: int, sequence: int) -> RawData:
+    frame = RawData.__new__(RawData)
+    frame.ssrc = ssrc
+    frame.sequence = sequence
+    frame.decrypted_data = bytes([sequence % 256])
+    frame.decoded_data = None
+    return frame
+
+
+def _manager(client: FakeClient, **kwargs) -> DecodeManager:
+    manager = DecodeManager(client, **kwargs)
+    decoders = {}
+    manager.get_decoder = lambda ssrc: decoders.setdefault(ssrc, FakeDecoder())
+    return manager
+
+
+def test_decode_manager_keeps_order_per_ssrc() -> None:
+    client = FakeClient()
+    manager = _manager(client, workers=2)
+    manager.start()
+    for sequence in range(50):
+        manager.decode(_frame(1, sequence))
+        manager.decode(_frame(2, sequence))
+    manager.stop()
+
+    assert not manager.is_alive()
+    assert len(client.received) == 100
+    for ssrc in (1, 2):
+        frames = [r for r in client.received if r[0] == ssrc]
+        assert [r[1] for r in frames] == list(range(50))
+        assert frames[3][2] == bytes([3, 3])
+    assert client.threads == {"DecodeManager-0", "DecodeManager-1"}
+
+
+def test_decode_manager_drops_when_full() -> None:
+    client = FakeClient()
+    manager = _manager(client, workers=1, max_queue=3)
+    # not started, so nothing is consumed
+    for sequence in range(5):
+        manager.decode(_frame(7, sequence))
+
+    assert manager.dropped == {7: 2}
+    assert manager.dropped_total == 2
+    manager.start()
+    manager.stop()
+    assert [r[1] for r in client.received] == [0, 1, 2]
+
+
+def test_decode_manager_reorders_frames() -> None:
+    client = FakeClient()
+    manager = _manager(client, workers=1, jitter_delay=10)
+    manager.start()
+    for sequence in (0, 2, 1, 3, 5, 4, 6):
+        manager.decode(_frame(1, sequence))
+    manager.stop()
+
+    assert [r[1] for r in client.received] == list(range(7))
+    assert manager.late == {1: 0}
+
+
+def test_jitter_buffer_wraps_and_drops_late_frames() -> None:
+    buffer = _JitterBuffer(depth=2, delay=10)
+    released = []
+    for sequence in (65534, 0, 65535, 1, 2, 3):
+        buffer.push(_frame(1, sequence), 0)
+        released += [f.sequence for f in buffer.pop(0)]
+    # 65533 is older than frames that were already released
+    buffer.push(_frame(1, 65533), 0)
+    buffer.push(_frame(1, 2), 0)
+    released += [f.sequence for f in buffer.drain()]
+
+    assert released == [65534, 65535, 0, 1, 2, 3]
+    assert buffer.late == 2
+
+
+def test_jitter_buffer_releases_after_delay() -> None:
+    buffer = _JitterBuffer(depth=3, delay=0.05)
+    buffer.push(_frame(1, 4), 1.0)
+    buffer.push(_frame(1, 6), 1.01)
+    assert buffer.pop(1.02) == []
+    assert buffer.deadline() == 1.05
+
+    assert [f.sequence for f in buffer.pop(1.05)] == [4]
+    assert [f.sequence for f in buffer.pop(1.06)] == [6]
+    assert not buffer
+
+
+class FakeSink:
+    def __init__(self) -> None:
+        self.written = {}
+
+    def write(self, data, user: int) -> None:
+        self.written[user] = self.written.get(user, b"") + bytes(data)
+
+
+def test_audio_of_unknown_ssrc_waits_for_its_user() -> None:
+    vc = VoiceClient.__new__(VoiceClient)
+    vc.ws = type("FakeWebSocket", (), {"ssrc_map": {}})()
+    vc.sink = FakeSink()
+    vc.sync_start = False
+    vc.user_timestamps = {}
+    vc._timestamp_lock = threading.Lock()
+    vc._pending_audio = {}
+
+    first = _frame(1, 0)
+    first.timestamp, first.receive_time = 0, 1.0
+    first.decoded_data = b"\x01" * 4
+    vc.recv_decoded_audio(first)
+    assert vc.sink.written == {}
+
+    vc.ws.ssrc_map[1] = {"user_id": 42, "speaking": True}
+    second = _frame(1, 1)
+    # one frame of audio was lost, so 960 samples of silence are added
+    second.timestamp, second.receive_time = 1920, 1.04
+    second.decoded_data = b"\x02" * 4
+    vc.recv_decoded_audio(second)
+
+    assert vc.sink.written == {42: b"\x01" * 4 + bytes(960 * 4) + b"\x02" * 4}
+    assert vc._pending_audio == {}
+
+
+def _packet(sequence: int, payload: bytes) -> bytes:
+    return struct.pack(">BBHII", 0x80, 0x78, sequence, 960 * sequence, 7) + payload
+
+
+def test_raw_data_uses_the_given_decryptor() -> None:
+    calls = []
+
+    def decrypt(header, data):
+        calls.append((header, bytes(data)))
+        return bytes(data)[::-1]
+
+    frame = RawData(_packet(3, b"abc"), None, decrypt)
+
+    assert (frame.sequence, frame.timestamp, frame.ssrc) == (3, 2880, 7)
+    assert isinstance(frame.data, memoryview)
+    assert frame.decrypted_data == b"cba"
+    assert calls == [(_packet(3, b""), b"abc")]
+
+
+def _voice_client() -> VoiceClient:
+    vc = VoiceClient.__new__(VoiceClient)
+    vc._decryptor_mode = None
+    vc._decrypt_nonce = bytearray(24)
+    vc.mode = "plain"
+    vc._decrypt_plain = lambda header, data: bytes(data)
+    return vc
+
+
+def test_decryptor_is_resolved_once_per_mode() -> None:
+    vc = _voice_client()
+    decrypt = vc._get_decryptor()
+    assert vc._get_decryptor() is decrypt
+
+    vc._decrypt_other = lambda header, data: b""
+    vc.mode = "other"
+    assert vc._get_decryptor() is vc._decrypt_other
+
+
+async def test_recv_audio_reads_every_waiting_datagram() -> None:
+    vc = _voice_client()
+    vc.socket, remote = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    vc.socket.setblocking(False)
+    vc.loop = asyncio.get_running_loop()
+    vc.ws = SimpleNamespace(ssrc_map={})
+    vc._pending_audio = {}
+    vc.paused = False
+    vc.recording = True
+
+    sequences = []
+
+    class Decoder:
+        def decode(self, frame: RawData) -> None:
+            sequences.append(frame.sequence)
+            if len(sequences) == 3:
+                vc.recording = False
+
+    vc.decoder = Decoder()
+    vc.sink = SimpleNamespace(cleanup=lambda: None)
+    for sequence in range(3):
+        remote.send(_packet(sequence, b"\x01"))
+
+    finished = []
+
+    async def callback(sink) -> None:
+        finished.append(sink)
+
+    try:
+        await asyncio.to_thread(vc.recv_audio, vc.sink, callback)
+    finally:
+        vc.socket.close()
+        remote.close()
+
+    assert sequences == [0, 1, 2]
+    assert finished == [vc.sink]
+
+
+def test_sync_start_aligns_to_the_first_received_packet() -> None:
+    vc = _voice_client()
+    vc.ws = SimpleNamespace(ssrc_map={7: {"user_id": 10}, 8: {"user_id": 20}})
+    vc.sink = FakeSink()
+    vc.sync_start = True
+    vc.paused = False
+    vc.user_timestamps = {}
+    vc.first_packet_timestamp = None
+    vc._timestamp_lock = threading.Lock()
+    vc._pending_audio = {}
+    received = []
+    vc.decoder = SimpleNamespace(decode=received.append)
+
+    vc.unpack_audio(_packet(0, b"\x01"))
+    time.sleep(0.05)
+    second = _packet(0, b"\x02")
+    vc.unpack_audio(second[:8] + struct.pack(">I", 8) + second[12:])
+    first, second = received
+    assert vc.first_packet_timestamp == first.receive_time
+
+    # the later packet is decoded first, it still starts after the silence
+    # since the first packet
+    for frame in (second, first):
+        frame.decoded_data = b""
+        vc.recv_decoded_audio(frame)
+    silence = int((second.receive_time - first.receive_time) * 48000) - 960
+    assert len(vc.sink.written[20]) == silence * 4
+    assert vc.sink.written[10] == b""
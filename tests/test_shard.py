@@ -0,0 +1,50 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+
+import discord
+
+
+async def test_launch_shards_respects_max_concurrency() -> None:
+    client = discord.AutoShardedClient(intents=discord.Intents.none(), shard_count=6)
+    launched = []
+
+    async def get_bot_gateway_info(**kwargs):
+        return 6, "wss://gateway", {"max_concurrency": 2}
+
+    async def launch_shard(gateway, shard_id, *, initial=False):
+        launched.append((shard_id, initial))
+        await asyncio.sleep(0)
+
+    client.http.get_bot_gateway_info = get_bot_gateway_info
+    client.launch_shard = launch_shard
+    await client.launch_shards()
+
+    # both rate limit keys start at the same time, each one in order
+    assert launched[:2] == [(0, True), (1, True)]
+    assert [s for s, _ in launched if s % 2 == 0] == [0, 2, 4]
+    assert [s for s, _ in launched if s % 2 == 1] == [1, 3, 5]
+    assert sum(initial for _, initial in launched) == 2
+    assert client._connection.shards_launched.is_set()
@@ -0,0 +1,197 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import array
+import threading
+import time
+import wave
+from types import SimpleNamespace
+
+import pytest
+
+from discord.sinks import (
+    MixingSink,
+    StreamingAudioData,
+    StreamingSink,
+    StreamingSinkError,
+)
+from discord.sinks.stream import BYTES_PER_SECOND
+
+SECOND = b"\x01\x00" * 2 * 48000
+
+
+def test_streaming_sink_writes_while_recording(tmp_path) -> None:
+    sink = StreamingSink(directory=str(tmp_path / "rec"), encoding="wav")
+    sink.init(SimpleNamespace(recording=True))
+    sink.write(SECOND, 1)
+    sink.write(SECOND, 2)
+    sink.write(SECOND, 1)
+
+    audio = sink.audio_data[1]
+    assert audio.paths == [str(tmp_path / "rec" / "1.wav")]
+    assert audio._written == 2 * len(SECOND)
+
+    sink.cleanup()
+    with wave.open(audio.file) as f:
+        assert f.getnframes() == 2 * 48000
+    assert audio.finished
+
+
+def test_streaming_sink_segments(tmp_path) -> None:
+    sink = StreamingSink(directory=str(tmp_path), encoding="pcm", segment_duration=1)
+    sink.init(SimpleNamespace(recording=True))
+    for _ in range(3):
+        sink.write(SECOND[: len(SECOND) // 2], 5)
+    sink.cleanup()
+
+    audio = sink.audio_data[5]
+    assert [p.rsplit("/", 1)[-1] for p in audio.paths] == ["5-0.pcm", "5-1.pcm"]
+    assert audio.file is None
+    assert (tmp_path / "5-1.pcm").stat().st_size == len(SECOND) // 2
+
+
+class BrokenWriter:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        raise StreamingSinkError("ffmpeg exited while recording.")
+
+    def close(self) -> None:
+        self.closed = True
+        raise StreamingSinkError(f"could not finish {self.path}.")
+
+
+def test_streaming_sink_stops_recording_on_write_errors(tmp_path) -> None:
+    sink = StreamingSink(directory=str(tmp_path), encoding="mp3")
+    writers = []
+
+    def _open(user, index):
+        writers.append(BrokenWriter(f"{user}.mp3"))
+        return writers[-1]
+
+    def stop_recording():
+        vc.recording = False
+
+    vc = SimpleNamespace(recording=True, stop_recording=stop_recording)
+    sink._open = _open
+    sink.init(vc)
+    sink.write(SECOND, 1)
+    sink.write(SECOND, 2)
+
+    assert not vc.recording
+    assert len(writers) == 1
+
+    # a user whose file only fails when it is closed
+    sink.audio_data[2] = StreamingAudioData(sink, 2)
+    sink.audio_data[2]._writer = BrokenWriter("2.mp3")
+    with pytest.raises(StreamingSinkError) as exc_info:
+        sink.cleanup()
+    assert "1.mp3" in str(exc_info.value) and "2.mp3" in str(exc_info.value)
+    assert writers[0].closed and sink.audio_data[2].finished
+
+
+def test_mixing_sink_sums_and_clips(tmp_path) -> None:
+    sink = MixingSink(directory=str(tmp_path), encoding="pcm", latency=60)
+    vc = SimpleNamespace(recording=True, sync_start=False)
+    sink.init(vc)
+    assert vc.sync_start
+
+    quiet = array.array("h", [1000] * 960 * 2).tobytes()
+    loud = array.array("h", [32000] * 960 * 2).tobytes()
+    silence = bytes(len(quiet))
+    sink.write(quiet + quiet, 1)
+    # the second user started speaking 20ms later
+    sink.write(silence + loud, 2)
+    sink.write(quiet, 2)
+    # stopped before the audio was due to be written
+    vc.stopping_time = sink._started
+    sink.cleanup()
+
+    mixed = array.array("h", sink.mixed.file.read())
+    assert len(mixed) == 3 * 960 * 2
+    assert set(mixed[: 960 * 2]) == {1000}
+    assert set(mixed[960 * 2 : 2 * 960 * 2]) == {32767}
+    assert set(mixed[2 * 960 * 2 :]) == {1000}
+    assert sink.get_all_audio() == [sink.mixed.file]
+
+
+def test_mixing_sink_drops_late_audio(tmp_path) -> None:
+    sink = MixingSink(directory=str(tmp_path), encoding="pcm", latency=0)
+    sink.init(SimpleNamespace(recording=True, sync_start=False))
+    frame = bytes(3840)
+    sink.write(frame * 50, 1)
+    sink._flush(sink._base + len(frame) * 50)
+    sink.write(frame, 2)
+    assert sink.dropped == len(frame)
+    sink.cleanup()
+
+
+def test_mixing_sink_keeps_time_while_silent(tmp_path) -> None:
+    sink = MixingSink(directory=str(tmp_path), encoding="pcm", latency=0)
+    vc = SimpleNamespace(recording=True, sync_start=False)
+    sink.init(vc)
+    frame = array.array("h", [1000] * 960 * 2).tobytes()
+    sink.write(frame, 1)
+    time.sleep(0.1)
+    # the clock wrote the silence after the frame without any new writes
+    assert sink.mixed._written > len(frame)
+
+    vc.stopping_time = sink._started + 1
+    sink.cleanup()
+    mixed = sink.mixed.file.read()
+    assert len(mixed) == BYTES_PER_SECOND
+    assert mixed[: len(frame)] == frame
+    assert mixed[len(frame) :] == bytes(BYTES_PER_SECOND - len(frame))
+
+
+def test_mixing_sink_stops_recording_outside_of_the_lock(tmp_path) -> None:
+    sink = MixingSink(directory=str(tmp_path), encoding="mp3", latency=0)
+    frame = bytes(3840)
+    waiting = threading.Thread(target=sink.write, args=(frame, 2))
+
+    class FailingWriter(BrokenWriter):
+        def write(self, data: bytes) -> None:
+            # another decoder thread gets stuck on the lock meanwhile
+            waiting.start()
+            time.sleep(0.05)
+            super().write(data)
+
+    joined = []
+
+    def stop_recording():
+        # like DecodeManager.stop, which joins the other decoder threads
+        waiting.join(timeout=2)
+        joined.append(not waiting.is_alive())
+        vc.recording = False
+
+    vc = SimpleNamespace(recording=True, stop_recording=stop_recording)
+    sink.vc = vc
+    sink._open = lambda user, index: FailingWriter(f"{user}.mp3")
+    sink._started = time.perf_counter() - 1
+    sink.write(frame, 1)
+
+    assert joined == [True]
+    assert not vc.recording
@@ -0,0 +1,487 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2021-present Pycord Development
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import zlib
+from types import SimpleNamespace
+
+import pytest
+
+import discord
+from discord import snapshot
+from discord.state import ChunkScheduler
+
+
+class FakeState:
+    shard_count = None
+
+    def __init__(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.requested = []
+        self.dispatched = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def chunk_guild(self, guild):
+        self.requested.append(guild.id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+    def dispatch(self, event, *args):
+        self.dispatched.append((event, *args))
+
+
+def _guild(guild_id: int, member_count: int, voice: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=guild_id,
+        shard_id=0,
+        _member_count=member_count,
+        _voice_states={1: None} if voice else {},
+    )
+
+
+async def test_chunk_scheduler_pipelines_small_guilds_first() -> None:
+    state = FakeState()
+    scheduler = ChunkScheduler(state, window=2)
+    guilds = [_guild(1, 5000), _guild(2, 10), _guild(3, 100), _guild(4, 9000, True)]
+    futures = [scheduler.add(guild) for guild in guilds]
+    await asyncio.gather(*futures)
+
+    assert state.requested == [4, 2, 3, 1]
+    assert state.max_in_flight == 2
+    assert state.dispatched[-1] == ("chunk_progress", 0, 4, 4)
+
+
+async def test_chunk_scheduler_window_outlives_sender() -> None:
+    state = FakeState()
+    scheduler = ChunkScheduler(state, window=1)
+    first = scheduler.add(_guild(1, 10))
+    # the sender ends once its queue is empty, with the request in flight
+    await asyncio.sleep(0)
+    second = scheduler.add(_guild(2, 10))
+    await asyncio.gather(first, second)
+
+    assert state.requested == [1, 2]
+    assert state.max_in_flight == 1
+
+
+async def test_chunk_scheduler_cancel() -> None:
+    state = FakeState()
+    scheduler = ChunkScheduler(state, window=1)
+    futures = [scheduler.add(_guild(i, 10)) for i in range(3)]
+    await asyncio.sleep(0)
+    scheduler.cancel()
+    done, pending = await asyncio.wait(futures, timeout=1)
+
+    assert not pending
+
+
+async def test_lazy_chunking_is_coalesced() -> None:
+    intents = discord.Intents.none()
+    intents.members = True
+    client = discord.Client(intents=intents, lazy_chunking=True)
+    state = client._connection
+    assert state._chunk_guilds is False
+
+    requests = []
+
+    async def chunk_guild(guild, **kwargs):
+        requests.append(guild.id)
+        await asyncio.sleep(0.01)
+
+    guild = SimpleNamespace(id=1, chunked=False)
+    state.chunk_guild = chunk_guild
+    state._get_guild = lambda guild_id: guild
+    state._chunk_lazily(guild)
+    state._chunk_lazily(guild)
+    await asyncio.sleep(0.02)
+
+    assert requests == [1]
+    assert not state._lazy_chunk_tasks
+
+    # a bounded member cache never marks the guild as chunked
+    state._chunk_lazily(guild)
+    await asyncio.sleep(0.02)
+    assert requests == [1]
+
+
+def _member_payload(user_id: int, roles: list[int]) -> dict:
+    return {
+        "user": {
+            "id": str(user_id),
+            "username": f"user{user_id}",
+            "discriminator": "0",
+            "avatar": None,
+        },
+        "roles": [str(role_id) for role_id in roles],
+        "joined_at": None,
+    }
+
+
+def test_role_members_index() -> None:
+    intents = discord.Intents.none()
+    intents.members = True
+    client = discord.Client(intents=intents)
+    state = client._connection
+    guild = discord.Guild(
+        data={
+            "id": "1",
+            "name": "guild",
+            "roles": [
+                {"id": "1", "name": "@everyone", "position": 0, "permissions": "0"},
+                {"id": "10", "name": "a", "position": 1, "permissions": "0"},
+                {"id": "20", "name": "b", "position": 2, "permissions": "0"},
+            ],
+            "members": [
+                _member_payload(100, [10]),
+                _member_payload(101, [10, 20]),
+                _member_payload(102, []),
+            ],
+        },
+        state=state,
+    )
+    state._add_guild(guild)
+    role_a = guild.get_role(10)
+    role_b = guild.get_role(20)
+    assert sorted(m.id for m in role_a.members) == [100, 101]
+
+    state.parse_guild_member_update({"guild_id": "1", **_member_payload(102, [20])})
+    state.parse_guild_member_update({"guild_id": "1", **_member_payload(101, [])})
+    assert [m.id for m in role_a.members] == [100]
+    assert [m.id for m in role_b.members] == [102]
+
+    # copies made for events must not be indexed
+    copy = discord.Member._copy(guild.get_member(100))
+    copy._update(_member_payload(100, [20]))
+    assert [m.id for m in role_b.members] == [102]
+
+    guild._remove_member(guild.get_member(100))
+    assert role_a.members == []
+    guild._remove_role(20)
+    assert 20 not in guild._role_members
+
+
+def test_member_name_index() -> None:
+    intents = discord.Intents.none()
+    intents.members = True
+    client = discord.Client(
+        intents=intents,
+        cache_policy=discord.CachePolicy(index_member_names=True),
+    )
+    state = client._connection
+    members = [_member_payload(100, []), _member_payload(101, [])]
+    members[1]["nick"] = "Alpha"
+    guild = discord.Guild(
+        data={"id": "1", "name": "guild", "roles": [], "members": members},
+        state=state,
+    )
+    state._add_guild(guild)
+
+    assert guild.get_member_named("user100").id == 100
+    assert guild.get_member_named("USER100") is None
+    assert guild.get_member_named("Alpha").id == 101
+    assert [m.id for m in guild.search_members("al")] == [101]
+    assert [m.id for m in guild.search_members("USER")] == [100, 101]
+
+    payload = {"guild_id": "1", **_member_payload(101, [])}
+    payload["nick"] = "beta"
+    payload["user"]["username"] = "renamed"
+    state.parse_guild_member_update(payload)
+    assert guild.get_member_named("Alpha") is None
+    assert guild.get_member_named("beta").id == 101
+    assert guild.get_member_named("renamed").id == 101
+    assert [m.id for m in guild.search_members("user")] == [100]
+
+    guild._remove_member(guild.get_member(100))
+    assert guild.search_members("") == [guild.get_member(101)]
+
+
+def test_member_name_index_tracks_user_guilds() -> None:
+    intents = discord.Intents.none()
+    intents.members = True
+    client = discord.Client(
+        intents=intents,
+        cache_policy=discord.CachePolicy(index_member_names=True),
+    )
+    state = client._connection
+    first, second = (
+        discord.Guild(
+            data={
+                "id": str(guild_id),
+                "name": "guild",
+                "roles": [],
+                "members": members,
+            },
+            state=state,
+        )
+        for guild_id, members in (
+            (1, [_member_payload(100, []), _member_payload(101, [])]),
+            (2, [_member_payload(100, [])]),
+        )
+    )
+    state._add_guild(first)
+    state._add_guild(second)
+    assert state._user_name_guilds == {100: {1, 2}, 101: {1}}
+
+    payload = {"guild_id": "1", **_member_payload(100, [])}
+    payload["user"]["username"] = "renamed"
+    state.parse_guild_member_update(payload)
+    assert second.get_member_named("renamed").id == 100
+
+    # copies of a member must not touch the index
+    copy = discord.Member._copy(first.get_member(101))
+    copy.nick = "copy"
+    first._update_member_name(copy)
+    assert first.get_member_named("copy") is None
+
+    state._remove_guild(second)
+    assert state._user_name_guilds == {100: {1}, 101: {1}}
+    first._remove_member(first.get_member(101))
+    assert 101 not in state._user_name_guilds
+
+
+def test_member_name_index_forgets_evicted_members() -> None:
+    intents = discord.Intents.none()
+    intents.members = True
+    client = discord.Client(
+        intents=intents,
+        cache_policy=discord.CachePolicy(
+            members=discord.CacheBackend(maxsize=2), index_member_names=True
+        ),
+    )
+    state = client._connection
+    guild = discord.Guild(
+        data={"id": "1", "name": "guild", "roles": [], "members": []},
+        state=state,
+    )
+    for user_id in (103, 101, 102):
+        guild._add_member(
+            discord.Member(data=_member_payload(user_id, []), guild=guild, state=state)
+        )
+
+    assert 103 not in guild._name_index
+    assert guild.get_member_named("user103") is None
+    assert [m.id for m in guild.search_members("user")] == [101, 102]
+
+
+def test_permission_cache() -> None:
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.members = True
+    client = discord.Client(
+        intents=intents,
+        cache_policy=discord.CachePolicy(cache_permissions=True),
+    )
+    state = client._connection
+    send = discord.Permissions(send_messages=True, read_messages=True).value
+    channel = {
+        "id": "50",
+        "type": 0,
+        "name": "general",
+        "position": 0,
+        "permission_overwrites": [],
+    }
+    guild = discord.Guild(
+        data={
+            "id": "1",
+            "name": "guild",
+            "owner_id": "999",
+            "roles": [
+                {"id": "1", "name": "@everyone", "position": 0, "permissions": "0"},
+                {"id": "10", "name": "a", "position": 1, "permissions": str(send)},
+            ],
+            "members": [_member_payload(100, [10])],
+            "channels": [channel],
+        },
+        state=state,
+    )
+    state._add_guild(guild)
+    cache = client.permission_cache
+    text = guild.get_channel(50)
+    member = guild.get_member(100)
+
+    assert text.permissions_for(member).send_messages
+    assert text.permissions_for(member).send_messages
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    role = {"id": "10", "name": "a", "position": 1, "permissions": "0"}
+    state.parse_guild_role_update({"guild_id": "1", "role": role})
+    assert not text.permissions_for(member).send_messages
+
+    state.parse_guild_member_update({"guild_id": "1", **_member_payload(100, [])})
+    overwrite = {"id": "100", "type": 1, "allow": str(send), "deny": "0"}
+    state.parse_channel_update(
+        {**channel, "guild_id": "1", "permission_overwrites": [overwrite]}
+    )
+    assert text.permissions_for(member).send_messages
+    assert cache.misses == 3
+
+
+_SNAPSHOT_ROLES = [
+    {"id": "1", "name": "@everyone", "position": 0, "permissions": "0"},
+    {"id": "10", "name": "a", "position": 1, "permissions": "8"},
+]
+
+
+def _snapshot_channel(channel_id: int) -> dict:
+    return {
+        "id": str(channel_id),
+        "type": 0,
+        "name": f"channel{channel_id}",
+        "position": 0,
+        "permission_overwrites": [{"id": "1", "type": 0, "allow": "0", "deny": "1024"}],
+    }
+
+
+async def _restore_snapshot(tmp_path) -> discord.Client:
+    path = str(tmp_path / "cache.snapshot")
+    me = {"id": "999", "username": "bot", "discriminator": "0", "avatar": None}
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.members = True
+
+    client = discord.Client(intents=intents, cache_snapshot=path)
+    state = client._connection
+    state.user = discord.ClientUser(state=state, data=me)
+    guild = discord.Guild(
+        data={
+            "id": "1",
+            "name": "guild",
+            "member_count": 2,
+            "roles": _SNAPSHOT_ROLES,
+            "members": [_member_payload(100, [10]), _member_payload(101, [])],
+            "channels": [_snapshot_channel(50), _snapshot_channel(51)],
+        },
+        state=state,
+    )
+    state._add_guild(guild)
+    await client.save_snapshot()
+
+    client = discord.Client(intents=intents, cache_snapshot=path)
+    state = client._connection
+    state.user = discord.ClientUser(state=state, data=me)
+    state.chunk_nonces = []
+
+    async def chunker(guild_id, query="", limit=0, presences=False, *, nonce=None):
+        state.chunk_nonces.append(nonce)
+
+    state.chunker = chunker
+    await state._load_snapshot()
+    state.parse_ready({"user": me, "guilds": [{"id": "1", "unavailable": True}]})
+    return client
+
+
+async def test_cache_snapshot_round_trip(tmp_path) -> None:
+    client = await _restore_snapshot(tmp_path)
+    state = client._connection
+    restored = client.get_guild(1)
+    assert not restored.unavailable
+    assert restored.get_member(100).roles[1].id == 10
+    assert (
+        restored.get_channel(51).overwrites_for(restored.default_role).view_channel
+        is False
+    )
+
+    state.parse_guild_create(
+        {
+            "id": "1",
+            "name": "renamed",
+            "member_count": 2,
+            "channels": [_snapshot_channel(50)],
+        }
+    )
+    assert restored.name == "renamed"
+    assert restored.get_channel(51) is None
+    assert not state._restored_guilds
+    # the restored members are kept until the chunks replace them
+    assert restored.get_member(101) is not None
+    state._ready_task.cancel()
+    state._refresh_tasks[1].cancel()
+
+
+@pytest.mark.parametrize("member_count", [2, 3])
+async def test_restored_members_are_replaced_by_chunks(
+    tmp_path, member_count: int
+) -> None:
+    client = await _restore_snapshot(tmp_path)
+    state = client._connection
+    restored = client.get_guild(1)
+    stale = restored.get_member(100)
+
+    state.parse_guild_create(
+        {
+            "id": "1",
+            "name": "guild",
+            "member_count": member_count,
+            "roles": _SNAPSHOT_ROLES,
+            "channels": [_snapshot_channel(50)],
+        }
+    )
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert state.chunk_nonces
+    # member 100 lost its role and was renamed while the bot was offline,
+    # 101 left and 102 joined
+    renamed = _member_payload(100, [])
+    renamed["user"]["username"] = "renamed"
+    state.parse_guild_members_chunk(
+        {
+            "guild_id": "1",
+            "members": [renamed, _member_payload(102, [10])],
+            "chunk_index": 0,
+            "chunk_count": 1,
+            "nonce": state.chunk_nonces[0],
+        }
+    )
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    member = restored.get_member(100)
+    assert member is not stale
+    assert [role.id for role in member.roles] == [1]
+    assert member.name == "renamed"
+    assert restored.get_member_named("renamed") is member
+    assert restored.get_member(101) is None
+    assert restored.get_member(102) is not None
+    assert not state._provisional_members
+    state._ready_task.cancel()
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        b"garbage",
+        snapshot.MAGIC + b"J" + zlib.compress(b"{not json"),
+        snapshot.MAGIC + b"J" + zlib.compress(b"[1, 2]"),
+        snapshot.MAGIC + b"J" + zlib.compress(b'{"version": 1, "guilds": [{}]}'),
+    ],
+)
+def test_bad_cache_snapshot_is_ignored(tmp_path, raw: bytes) -> None:
+    path = tmp_path / "cache.snapshot"
+    path.write_bytes(raw)
+    assert snapshot.read(str(path)) is None